@@ -0,0 +1,177 @@
+"""
+Adaptive (AIMD) concurrency limits for calls to external backends.
+
+Each backend (Jira, every LLM provider) has a limiter that caps in-flight
+calls. While calls succeed with normal latency the limit grows by about one
+per window of completed calls (additive increase); a 429, a timeout or a
+latency spike cuts it in half (multiplicative decrease), at most once per
+typical call duration. A Retry-After from the server also pauses new calls
+until it has passed. Limits are shared by everything in the process that
+talks to the same backend, so reports and snapshots settle near what each
+backend can sustain.
+
+Per-backend bounds can be set with LIMIT_<NAME>_INITIAL / _MIN / _MAX, where
+NAME is the limiter name upper-cased with non-alphanumerics as "_"
+(e.g. LIMIT_JIRA_MAX, LIMIT_LLM_CAMBRIAN_MAX).
+"""
+import os
+import re
+import time
+import threading
+from contextlib import contextmanager
+
+# A call this many times slower than the baseline latency counts as overload
+LATENCY_SPIKE_FACTOR = float(os.getenv("LIMIT_LATENCY_SPIKE_FACTOR", "3.0"))
+DECREASE_FACTOR = 0.5
+# Successes needed before latency spikes are judged against the baseline
+MIN_SAMPLES = 5
+
+def is_overload_error(e):
+    """True for rate limiting (HTTP 429) and timeouts from requests, httpx or the OpenAI SDK."""
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    return any("timeout" in cls.__name__.lower() for cls in type(e).__mro__)
+
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+class CallTracker:
+    """Handle yielded by AdaptiveLimiter.track() to report the outcome of a call."""
+
+    def __init__(self):
+        self.overload = False
+        self.retry_after = None
+
+    def overloaded(self, retry_after=None):
+        """Mark the call as rejected for overload (e.g. a 429 response that didn't raise)."""
+        self.overload = True
+        self.retry_after = parse_retry_after(retry_after)
+
+class AdaptiveLimiter:
+    def __init__(self, name, initial=4, min_limit=1, max_limit=32):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.inflight = 0
+        self.baseline = None
+        self.samples = 0
+        self.successes = 0
+        self.overloads = 0
+        self.last_decrease = 0.0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.inflight < int(self.limit):
+                    self.inflight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, latency, overload=False, retry_after=None):
+        with self._cond:
+            saturated = self.inflight >= int(self.limit)
+            self.inflight -= 1
+            now = time.monotonic()
+            spike = (not overload and self.samples >= MIN_SAMPLES
+                     and latency > self.baseline * LATENCY_SPIKE_FACTOR)
+
+            if overload or spike:
+                self.overloads += 1
+                # Calls that were in flight together fail together: cut once per window
+                if now - self.last_decrease >= (self.baseline or 1.0):
+                    self.limit = max(self.min_limit, self.limit * DECREASE_FACTOR)
+                    self.last_decrease = now
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            else:
+                self.successes += 1
+                self.samples += 1
+                self.baseline = latency if self.baseline is None else 0.9 * self.baseline + 0.1 * latency
+                # Only grow when the current limit is actually being used
+                if saturated:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    @contextmanager
+    def track(self):
+        """
+        Hold one slot for the duration of a call:
+
+            with limiter.track() as call:
+                resp = session.get(...)
+                if resp.status_code == 429:
+                    call.overloaded(resp.headers.get("Retry-After"))
+
+        Overload errors raised inside the block (429s, timeouts) are recorded too.
+        Other errors release the slot without changing the limit.
+        """
+        self.acquire()
+        call = CallTracker()
+        start = time.monotonic()
+        try:
+            yield call
+        except Exception as e:
+            self._release_error(e, start)
+            raise
+        self.release(time.monotonic() - start, overload=call.overload, retry_after=call.retry_after)
+
+    def _release_error(self, e, start):
+        if is_overload_error(e):
+            response = getattr(e, "response", None)
+            headers = getattr(response, "headers", None) or {}
+            self.release(time.monotonic() - start, overload=True, retry_after=parse_retry_after(headers.get("Retry-After")))
+        else:
+            self._release_neutral()
+
+    def _release_neutral(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.inflight,
+                "min": self.min_limit,
+                "max": self.max_limit,
+                "baseline_latency_seconds": round(self.baseline, 3) if self.baseline is not None else None,
+                "successes": self.successes,
+                "overloads": self.overloads,
+                "paused_seconds": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            }
+
+_limiters = {}
+_registry_lock = threading.Lock()
+
+def _env_int(name, suffix, default):
+    value = os.getenv(f"LIMIT_{re.sub(r'[^A-Za-z0-9]', '_', name).upper()}_{suffix}")
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+def get_limiter(name, initial=4, min_limit=1, max_limit=32):
+    """Process-wide limiter for a backend; the arguments only apply on first use."""
+    with _registry_lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveLimiter(
+                name,
+                initial=_env_int(name, "INITIAL", initial),
+                min_limit=_env_int(name, "MIN", min_limit),
+                max_limit=_env_int(name, "MAX", max_limit),
+            )
+        return _limiters[name]
+
+def all_limits():
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in sorted(limiters.items())}
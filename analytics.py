@@ -0,0 +1,308 @@
+"""
+Bug aging, time-to-resolution and time-in-status percentiles.
+
+Every metric is kept as a mergeable quantile sketch per dimension value
+(overall, per priority, per component), stored in analytics_sketches and
+updated as each snapshot is saved, in one pass over that snapshot's bugs:
+
+- age: days since creation of the bugs open in the latest snapshot
+  (replaced with every snapshot)
+- time_to_resolution: days from creation to resolution, counted once when a
+  bug first shows up resolved (cumulative)
+- time_in_status: days a bug stayed in a status, counted when a later snapshot
+  shows it in another status (cumulative; measured at snapshot granularity)
+- status_age: days the open bugs have been in their current status so far
+  (replaced with every snapshot)
+
+Percentile queries read one sketch row per dimension value, whatever the
+length of the history. `python analytics.py --rebuild` replays all snapshots.
+"""
+import json
+import math
+import sqlite3
+import argparse
+from datetime import datetime, timezone
+
+DB_NAME = "dashboard.db"
+
+CLOSED_STATUSES = ('Closed', 'Done', 'Resolved')
+
+# Sketch relative accuracy: reported percentiles are within 1% of the true value
+RELATIVE_ACCURACY = 0.01
+# Durations below this many days are counted as zero
+MIN_DAYS = 1e-3
+
+CUMULATIVE_METRICS = ("time_to_resolution", "time_in_status")
+SNAPSHOT_METRICS = ("age", "status_age")
+DIMENSIONS = ("all", "priority", "component")
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram with relative error guarantees (DDSketch style).
+
+    Sketches of the same accuracy merge by adding bucket counts, so per-snapshot
+    updates fold into a cumulative sketch without keeping the raw values.
+    """
+
+    def __init__(self, bins=None, zero_count=0, count=0):
+        self.gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = bins or {}
+        self.zero_count = zero_count
+        self.count = count
+
+    def add(self, value):
+        self.count += 1
+        if value <= MIN_DAYS:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def merge(self, other):
+        for index, n in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        """Value at quantile q (0-1), or None when empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_json(self):
+        return json.dumps({"count": self.count, "zero": self.zero_count, "bins": self.bins})
+
+    @classmethod
+    def from_json(cls, data):
+        data = json.loads(data)
+        return cls({int(k): v for k, v in data["bins"].items()}, data["zero"], data["count"])
+
+
+def _parse_date(value):
+    """Jira ('2025-10-01T01:00:00.000+0000') or SQLite ('2025-10-01 01:00:00', UTC) timestamp."""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return parsed.astimezone(timezone.utc) if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return None
+
+
+def _days(start, end):
+    return max(0.0, (end - start).total_seconds() / 86400)
+
+
+def _dimension_values(row):
+    values = [("all", "all"), ("priority", row["priority"] or "None")]
+    components = [c.strip() for c in (row["component"] or "").split(",") if c.strip()]
+    values.extend(("component", c) for c in components or ["(none)"])
+    return values
+
+
+# --- Incremental update ---
+
+def update_snapshot(conn, snapshot_id, rows):
+    """
+    Fold one snapshot into the sketches (part of the caller's transaction).
+
+    Args:
+        snapshot_id: The snapshot just written
+        rows: Iterable of dicts with key, status, priority, component, created,
+            resolution_date and type for every issue of the snapshot
+    """
+    taken_at = _parse_date(conn.execute("SELECT timestamp FROM snapshots WHERE snapshot_id=?",
+                                        (snapshot_id,)).fetchone()[0])
+    state = {row[0]: row[1:] for row in
+             conn.execute("SELECT key, status, since, resolution_date, priority, component FROM analytics_issue_state")}
+
+    updates = {}  # (metric, dimension, value) -> sketch of this snapshot's new values
+
+    def add(metric, row, value, status=None):
+        for dimension, dim_value in _dimension_values(row):
+            if status is not None:
+                # time-in-status sketches are per status within each dimension value
+                dim_value = f"{dim_value}|{status}"
+            sketch = updates.setdefault((metric, dimension, dim_value), QuantileSketch())
+            sketch.add(value)
+
+    new_state = []
+    for row in rows:
+        if row["type"] != 'Bug':
+            continue
+        key = row["key"]
+        created = _parse_date(row["created"])
+        previous = state.get(key)
+        since = taken_at
+
+        if previous is not None:
+            old_status, old_since, old_resolution, old_priority, old_component = previous
+            if old_status == row["status"]:
+                since = _parse_date(old_since) or taken_at
+            else:
+                # Counted under the priority and component the bug had while in that status
+                # (state rows written before these were kept fall back to the current ones)
+                held = row
+                if old_priority is not None or old_component is not None:
+                    held = {"priority": old_priority, "component": old_component}
+                add("time_in_status", held, _days(_parse_date(old_since) or taken_at, taken_at), old_status)
+        else:
+            old_resolution = None
+
+        resolved = _parse_date(row["resolution_date"])
+        if resolved and created and row["resolution_date"] != old_resolution:
+            add("time_to_resolution", row, _days(created, resolved))
+
+        if row["status"] not in CLOSED_STATUSES:
+            if created:
+                add("age", row, _days(created, taken_at))
+            add("status_age", row, _days(since, taken_at), row["status"])
+
+        new_state.append((key, row["status"], since.strftime("%Y-%m-%d %H:%M:%S"), row["resolution_date"],
+                          row["priority"], row["component"]))
+
+    conn.executemany('''
+        INSERT OR REPLACE INTO analytics_issue_state (key, status, since, resolution_date, priority, component)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', new_state)
+
+    # Point-in-time metrics describe this snapshot only
+    conn.execute(f"DELETE FROM analytics_sketches WHERE metric IN ({', '.join('?' for _ in SNAPSHOT_METRICS)})",
+                 SNAPSHOT_METRICS)
+    for (metric, dimension, value), sketch in updates.items():
+        if metric in CUMULATIVE_METRICS:
+            row = conn.execute("SELECT sketch FROM analytics_sketches WHERE metric=? AND dimension=? AND value=?",
+                               (metric, dimension, value)).fetchone()
+            if row:
+                merged = QuantileSketch.from_json(row[0])
+                merged.merge(sketch)
+                sketch = merged
+        conn.execute('''
+            INSERT OR REPLACE INTO analytics_sketches (metric, dimension, value, snapshot_id, sketch)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (metric, dimension, value, snapshot_id, sketch.to_json()))
+    conn.execute("INSERT OR REPLACE INTO analytics_progress (id, snapshot_id) VALUES (1, ?)", (snapshot_id,))
+
+
+def _snapshot_rows(conn, snapshot_id):
+    cursor = conn.execute('''
+        SELECT key, status, priority, component, created_date, resolution_date, type
+        FROM issues WHERE snapshot_id=?
+    ''', (snapshot_id,))
+    for key, status, priority, component, created, resolution, issue_type in cursor:
+        yield {"key": key, "status": status, "priority": priority, "component": component,
+               "created": created, "resolution_date": resolution, "type": issue_type}
+
+
+def pending_snapshots(conn):
+    """
+    Ids of the snapshots not folded in yet, oldest first, or None when the
+    analytics tables do not exist (database created before analytics).
+    """
+    try:
+        row = conn.execute("SELECT snapshot_id FROM analytics_progress WHERE id=1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    processed = None
+    if row:
+        found = conn.execute("SELECT timestamp, snapshot_id FROM snapshots WHERE snapshot_id=?", (row[0],)).fetchone()
+        processed = tuple(found) if found else None
+    sql = "SELECT snapshot_id FROM snapshots"
+    params = []
+    if processed is not None:
+        # Snapshots after the last one processed in (timestamp, snapshot_id) order, so
+        # one saved with the same timestamp (second resolution) is not skipped
+        sql += " WHERE timestamp > ? OR (timestamp = ? AND snapshot_id > ?)"
+        params.extend([processed[0], *processed])
+    return [snapshot_id for (snapshot_id,) in conn.execute(sql + " ORDER BY timestamp, snapshot_id", params)]
+
+
+def catch_up(conn):
+    """
+    Fold in every snapshot not processed yet, oldest first (part of the caller's transaction).
+
+    On a database that predates analytics (or after a rebuild) this replays the
+    whole history, so it runs at startup (services.ensure_schema) rather than
+    while a snapshot is being saved.
+    """
+    pending = pending_snapshots(conn)
+    if pending is None:
+        return False
+    for snapshot_id in pending:
+        update_snapshot(conn, snapshot_id, _snapshot_rows(conn, snapshot_id))
+    return True
+
+
+def update_latest(conn, snapshot_id):
+    """
+    Fold in the snapshot just saved (part of the caller's transaction).
+
+    Skipped when earlier snapshots are still pending: catch_up folds them in
+    order, this one included. Returns True if the snapshot was folded in.
+    """
+    if pending_snapshots(conn) != [snapshot_id]:
+        return False
+    update_snapshot(conn, snapshot_id, _snapshot_rows(conn, snapshot_id))
+    return True
+
+
+def rebuild(conn):
+    """Recompute all sketches by replaying every snapshot in time order."""
+    for table in ("analytics_sketches", "analytics_issue_state", "analytics_progress"):
+        conn.execute(f"DELETE FROM {table}")
+    catch_up(conn)
+    conn.commit()
+
+
+# --- Queries ---
+
+def percentiles(conn, metric, dimension="all", quantiles=(0.5, 0.9)):
+    """
+    {dimension value: {"count", "p50", "p90", ...}} in days for one metric.
+
+    For time_in_status and status_age the values are "<dimension value>|<status>".
+    """
+    result = {}
+    for value, sketch in conn.execute("SELECT value, sketch FROM analytics_sketches WHERE metric=? AND dimension=?",
+                                      (metric, dimension)):
+        sketch = QuantileSketch.from_json(sketch)
+        entry = {"count": sketch.count}
+        for q in quantiles:
+            estimate = sketch.quantile(q)
+            entry[f"p{round(q * 100):g}"] = round(estimate, 2) if estimate is not None else None
+        result[value] = entry
+    return dict(sorted(result.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bug aging and cycle-time percentiles (days).")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute sketches from all snapshots")
+    parser.add_argument("--dimension", default="priority", choices=DIMENSIONS)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_NAME)
+    if args.rebuild:
+        rebuild(conn)
+        print("Analytics rebuilt.")
+    for metric in SNAPSHOT_METRICS + CUMULATIVE_METRICS:
+        print(f"\n{metric} by {args.dimension}")
+        for value, entry in percentiles(conn, metric, args.dimension).items():
+            print(f"  {value:<30} n={entry['count']:<6} P50 {entry['p50']:>8}  P90 {entry['p90']:>8}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+In-process publish/subscribe for server-sent event streams.
+
+Publishers (job worker threads, snapshot listeners) call publish(topic, message)
+from any thread; each subscriber is an asyncio queue drained by an SSE
+generator on the event loop. Messages are wake-up hints: streams re-read the
+authoritative state (job_events, jobs, snapshots) from the database, so a
+dropped message or a publisher in another worker process only delays delivery
+until the stream's next poll.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+# Message of a publish() without a payload; Subscription.get() returns None only on timeout
+WAKEUP = "wakeup"
+
+
+class Subscription:
+    def __init__(self, broker, topic, maxsize=100):
+        self.broker = broker
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def _put(self, message):
+        if self.queue.full():
+            # Slow consumer: it re-reads the database anyway, so drop the oldest hint
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def clear(self):
+        """Drop pending messages (the caller is about to re-read the database)."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic):
+        """Subscribe the calling event loop to a topic (call from async code)."""
+        subscription = Subscription(self, topic)
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def subscriber_count(self, topic):
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
+
+    def publish(self, topic, message=WAKEUP):
+        """Deliver a message to every subscriber of a topic (thread-safe)."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, message)
+            except RuntimeError:
+                # Event loop already closed (shutdown)
+                self._unsubscribe(subscription)
+
+
+broker = EventBroker()
@@ -0,0 +1,138 @@
+"""
+Changes between two snapshots.
+
+Both snapshots are joined on issue key inside SQLite using the
+(snapshot_id, key) index, and only rows whose tracked fields differ (or that
+exist on one side only) leave the database, so a diff costs about as much as
+the changes it reports rather than two full bug lists.
+"""
+from .read_model import OPEN_STATUSES, PRIORITY_RANK, DEFAULT_PRIORITY_RANK
+
+# Fields compared between snapshots
+TRACKED_FIELDS = ("status", "priority", "assignee")
+
+CHANGE_CATEGORIES = ("new", "removed", "closed", "reopened", "priority", "reassigned", "status")
+
+DEFAULT_DIFF_DAYS = 7
+
+_NAMES = ("key", "summary", "status", "priority", "assignee", "labels", "type")
+_COLUMNS = ", ".join(_NAMES)
+
+# Issues of the older snapshot, with their state in the newer one (NULLs if gone),
+# where something tracked changed
+CHANGED_SQL = f'''
+    SELECT a.key, a.summary, a.status, a.priority, a.assignee, a.labels, a.type,
+           b.key, b.summary, b.status, b.priority, b.assignee, b.labels, b.type
+    FROM issues a
+    LEFT JOIN issues b ON b.snapshot_id = :to_id AND b.key = a.key
+    WHERE a.snapshot_id = :from_id
+      AND (b.key IS NULL OR {" OR ".join(f"a.{f} IS NOT b.{f}" for f in TRACKED_FIELDS)})
+'''
+
+NEW_SQL = f'''
+    SELECT {_COLUMNS} FROM issues b
+    WHERE b.snapshot_id = :to_id
+      AND NOT EXISTS (SELECT 1 FROM issues a WHERE a.snapshot_id = :from_id AND a.key = b.key)
+'''
+
+
+def _matches(row, label_filter, bugs_only):
+    if bugs_only and row["type"] != 'Bug':
+        return False
+    if label_filter and label_filter.lower() not in (row["labels"] or "").lower():
+        return False
+    return True
+
+
+def _entry(row, jira_base, changes=None):
+    entry = {
+        "key": row["key"],
+        "summary": row["summary"],
+        "status": row["status"],
+        "priority": row["priority"],
+        "assignee": row["assignee"],
+        "link": f"{jira_base}/browse/{row['key']}" if jira_base else "",
+    }
+    if changes:
+        entry["changes"] = changes
+    return entry
+
+
+def categorize(before, after):
+    """Change categories of one issue present in both snapshots, plus its {field: [old, new]}."""
+    changes = {f: [before[f], after[f]] for f in TRACKED_FIELDS if before[f] != after[f]}
+    categories = []
+    if "status" in changes:
+        was_open = before["status"] in OPEN_STATUSES
+        is_open = after["status"] in OPEN_STATUSES
+        if was_open and not is_open:
+            categories.append("closed")
+        elif is_open and not was_open:
+            categories.append("reopened")
+        else:
+            categories.append("status")
+    if "priority" in changes:
+        old_rank = PRIORITY_RANK.get(before["priority"], DEFAULT_PRIORITY_RANK)
+        new_rank = PRIORITY_RANK.get(after["priority"], DEFAULT_PRIORITY_RANK)
+        changes["escalated"] = new_rank < old_rank
+        categories.append("priority")
+    if "assignee" in changes:
+        categories.append("reassigned")
+    return categories, changes
+
+
+def diff_snapshots(conn, from_id, to_id, label_filter=None, bugs_only=True, jira_base=""):
+    """
+    Categorized changes from snapshot from_id to snapshot to_id.
+
+    An issue appears in every category that applies (e.g. closed and reassigned).
+    'closed'/'reopened' are moves out of/into OPEN_STATUSES; 'status' is any other
+    status move. Priority entries carry changes["escalated"].
+
+    Returns:
+        {category: [issue dicts]} for every name in CHANGE_CATEGORIES, sorted by key
+    """
+    params = {"from_id": from_id, "to_id": to_id}
+    result = {category: [] for category in CHANGE_CATEGORIES}
+
+    for row in conn.execute(NEW_SQL, params):
+        row = dict(zip(_NAMES, row))
+        if _matches(row, label_filter, bugs_only):
+            result["new"].append(_entry(row, jira_base))
+
+    for row in conn.execute(CHANGED_SQL, params):
+        before = dict(zip(_NAMES, row[:7]))
+        if row[7] is None:
+            if _matches(before, label_filter, bugs_only):
+                result["removed"].append(_entry(before, jira_base))
+            continue
+        after = dict(zip(_NAMES, row[7:]))
+        # In scope if it is in scope on either side (e.g. a label added this week)
+        if not (_matches(after, label_filter, bugs_only) or _matches(before, label_filter, bugs_only)):
+            continue
+        categories, changes = categorize(before, after)
+        entry = _entry(after, jira_base, changes)
+        for category in categories:
+            result[category].append(entry)
+
+    for entries in result.values():
+        entries.sort(key=lambda e: e["key"])
+    return result
+
+
+def snapshot_before(conn, to_id, days=DEFAULT_DIFF_DAYS):
+    """Latest snapshot taken at least `days` before snapshot to_id (else the oldest one before it)."""
+    row = conn.execute('''
+        SELECT s.snapshot_id FROM snapshots s, snapshots t
+        WHERE t.snapshot_id = ? AND s.snapshot_id != t.snapshot_id
+          AND s.timestamp <= datetime(t.timestamp, ?)
+        ORDER BY s.timestamp DESC, s.snapshot_id DESC LIMIT 1
+    ''', (to_id, f"-{float(days)} days")).fetchone()
+    if row:
+        return row[0]
+    row = conn.execute('''
+        SELECT s.snapshot_id FROM snapshots s, snapshots t
+        WHERE t.snapshot_id = ? AND s.snapshot_id != t.snapshot_id AND s.timestamp <= t.timestamp
+        ORDER BY s.timestamp, s.snapshot_id LIMIT 1
+    ''', (to_id,)).fetchone()
+    return row[0] if row else None
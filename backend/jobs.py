@@ -0,0 +1,369 @@
+"""
+Persistent background job queue backed by the `jobs` table.
+
+Jobs are enqueued by the API and executed by one worker thread per job kind.
+Enqueueing with a dedupe_key is single-flight: while a job with the same key is
+queued or running, further requests get that job back instead of a new one.
+Claiming and deduplication happen inside SQLite transactions, so several
+uvicorn workers can share the queue safely.
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+# Running jobs refresh their heartbeat this often, whether or not they report progress
+HEARTBEAT_INTERVAL_SECONDS = 30
+# A running job whose heartbeat is older than this is assumed to be orphaned
+# (its process died) and is put back in the queue by the workers' periodic sweep
+# or by the next enqueue that would otherwise coalesce into it.
+STALE_AFTER_SECONDS = 4 * HEARTBEAT_INTERVAL_SECONDS
+
+REQUEUE_STALE_SQL = f'''
+    UPDATE jobs SET status='queued', message='Requeued after interruption'
+    WHERE status='running'
+      AND (heartbeat_at IS NULL OR heartbeat_at < datetime('now', '-{int(STALE_AFTER_SECONDS)} seconds'))
+'''
+
+
+def job_to_dict(row):
+    if row is None:
+        return None
+    job = dict(row)
+    for field in ('params', 'result'):
+        job[field] = json.loads(job[field]) if job.get(field) else None
+    return job
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+class JobContext:
+    """Handle passed to job handlers for progress reporting and cancellation checks."""
+
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.job_id = job['job_id']
+        self.params = job['params'] or {}
+
+    def update(self, progress=None, total=None, message=None):
+        self.queue.update_progress(self.job_id, progress, total, message)
+
+    def is_cancelled(self):
+        job = self.queue.get(self.job_id)
+        return job is None or job['status'] == 'cancelled'
+
+    def check_cancelled(self):
+        if self.is_cancelled():
+            raise JobCancelled()
+
+
+class JobQueue:
+    def __init__(self, connect, poll_interval=2.0):
+        """
+        Args:
+            connect: Function returning a new sqlite3 connection (row_factory=sqlite3.Row)
+            poll_interval: Seconds between queue polls (picks up jobs enqueued by other processes)
+        """
+        self.connect = connect
+        self.poll_interval = poll_interval
+        self.handlers = {}
+        # Callbacks run when a job reaches a final state: listener(job_dict)
+        self.listeners = []
+        self._wakeup = {}
+        self._threads = []
+        self._stop = threading.Event()
+
+    def register(self, kind, handler):
+        """handler(context: JobContext) -> JSON-serialisable result."""
+        self.handlers[kind] = handler
+        self._wakeup[kind] = threading.Event()
+
+    # --- Queue operations ---
+
+    def enqueue(self, kind, params=None, dedupe_key=None):
+        """
+        Queue a job, or return the active job with the same dedupe_key.
+
+        Returns:
+            (job dict, created) - created is False when coalesced into an existing job
+        """
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if dedupe_key:
+                # Never coalesce into a job whose worker died: requeue it first
+                requeued = conn.execute(REQUEUE_STALE_SQL).rowcount
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key=? AND status IN ('queued', 'running') ORDER BY job_id LIMIT 1",
+                    (dedupe_key,)).fetchone()
+                if row:
+                    conn.commit()
+                    if requeued:
+                        self._wake_all()
+                    return job_to_dict(row), False
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, dedupe_key, params, status, message) VALUES (?, ?, ?, 'queued', 'Queued')",
+                (kind, dedupe_key, json.dumps(params) if params is not None else None))
+            job_id = cursor.lastrowid
+            conn.commit()
+            row = conn.execute("SELECT * FROM jobs WHERE job_id=?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if kind in self._wakeup:
+            self._wakeup[kind].set()
+        return job_to_dict(row), True
+
+    def get(self, job_id):
+        conn = self.connect()
+        try:
+            return job_to_dict(conn.execute("SELECT * FROM jobs WHERE job_id=?", (job_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def list(self, kind=None, limit=20):
+        conn = self.connect()
+        try:
+            if kind:
+                rows = conn.execute("SELECT * FROM jobs WHERE kind=? ORDER BY job_id DESC LIMIT ?", (kind, limit)).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY job_id DESC LIMIT ?", (limit,)).fetchall()
+            return [job_to_dict(r) for r in rows]
+        finally:
+            conn.close()
+
+    def update_progress(self, job_id, progress=None, total=None, message=None):
+        conn = self.connect()
+        try:
+            conn.execute('''
+                UPDATE jobs SET
+                    progress = COALESCE(?, progress),
+                    total = COALESCE(?, total),
+                    message = COALESCE(?, message),
+                    heartbeat_at = CURRENT_TIMESTAMP
+                WHERE job_id=?
+            ''', (progress, total, message, job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def cancel(self, job_id):
+        """Mark an active job cancelled; running handlers stop at their next check."""
+        conn = self.connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status='cancelled', message='Cancelled', finished_at=CURRENT_TIMESTAMP "
+                "WHERE job_id=? AND status IN ('queued', 'running')", (job_id,))
+            conn.commit()
+            cancelled = cursor.rowcount > 0
+        finally:
+            conn.close()
+        if cancelled:
+            self._notify(self.get(job_id))
+        return cancelled
+
+    def retry(self, job_id, on_requeue=None):
+        """
+        Queue a cancelled or failed job again (its handler can pick up where it stopped).
+
+        Single-flight like enqueue: if another job with the same dedupe_key has become
+        active meanwhile, that job is returned and this one is left as it is.
+
+        Args:
+            on_requeue: Optional function(conn, job_id) run inside the requeue transaction
+
+        Returns:
+            The job that will do the work, or None if job_id is not cancelled or failed
+        """
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM jobs WHERE job_id=? AND status IN ('cancelled', 'failed')",
+                               (job_id,)).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            if row['dedupe_key']:
+                conn.execute(REQUEUE_STALE_SQL)
+                active = conn.execute(
+                    "SELECT * FROM jobs WHERE dedupe_key=? AND status IN ('queued', 'running') ORDER BY job_id LIMIT 1",
+                    (row['dedupe_key'],)).fetchone()
+                if active:
+                    conn.commit()
+                    return job_to_dict(active)
+            conn.execute('''
+                UPDATE jobs SET status='queued', message='Resumed', error=NULL, finished_at=NULL
+                WHERE job_id=?
+            ''', (job_id,))
+            if on_requeue:
+                on_requeue(conn, job_id)
+            conn.commit()
+            job = job_to_dict(conn.execute("SELECT * FROM jobs WHERE job_id=?", (job_id,)).fetchone())
+        finally:
+            conn.close()
+        if job['kind'] in self._wakeup:
+            self._wakeup[job['kind']].set()
+        return job
+
+    def _claim(self, kind):
+        conn = self.connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE kind=? AND status='queued' ORDER BY job_id LIMIT 1", (kind,)).fetchone()
+            if not row:
+                conn.rollback()
+                return None
+            conn.execute('''
+                UPDATE jobs SET status='running', message='Started',
+                    started_at=CURRENT_TIMESTAMP, heartbeat_at=CURRENT_TIMESTAMP
+                WHERE job_id=?
+            ''', (row['job_id'],))
+            conn.commit()
+            return job_to_dict(conn.execute("SELECT * FROM jobs WHERE job_id=?", (row['job_id'],)).fetchone())
+        finally:
+            conn.close()
+
+    def _finish(self, job_id, status, result=None, error=None, message=None):
+        conn = self.connect()
+        try:
+            # Never overwrite a cancellation that happened while the handler ran
+            conn.execute('''
+                UPDATE jobs SET status=?, result=?, error=?, message=COALESCE(?, message),
+                    finished_at=CURRENT_TIMESTAMP, heartbeat_at=CURRENT_TIMESTAMP
+                WHERE job_id=? AND status='running'
+            ''', (status, json.dumps(result) if result is not None else None, error, message, job_id))
+            conn.commit()
+        finally:
+            conn.close()
+        self._notify(self.get(job_id))
+
+    def _notify(self, job):
+        for listener in self.listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logging.error(f"Job listener failed: {e}")
+
+    def requeue_stale(self):
+        """Put jobs orphaned by a crashed process back in the queue."""
+        conn = self.connect()
+        try:
+            cursor = conn.execute(REQUEUE_STALE_SQL)
+            conn.commit()
+            requeued = cursor.rowcount
+        finally:
+            conn.close()
+        if requeued:
+            logging.info(f"Requeued {requeued} interrupted job(s)")
+            self._wake_all()
+        return requeued
+
+    def heartbeat(self, job_id):
+        conn = self.connect()
+        try:
+            conn.execute("UPDATE jobs SET heartbeat_at=CURRENT_TIMESTAMP WHERE job_id=? AND status='running'", (job_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _wake_all(self):
+        for event in self._wakeup.values():
+            event.set()
+
+    # --- Workers ---
+
+    def start(self):
+        self.requeue_stale()
+        for kind in self.handlers:
+            thread = threading.Thread(target=self._worker, args=(kind,), name=f"job-worker-{kind}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._wake_all()
+
+    @property
+    def stopping(self):
+        """True once stop() was called."""
+        return self._stop.is_set()
+
+    def wait_stop(self, timeout):
+        """Wait up to timeout seconds for stop(); True if the queue is stopping."""
+        return self._stop.wait(timeout)
+
+    def _worker(self, kind):
+        wakeup = self._wakeup[kind]
+        last_sweep = 0.0
+        while not self._stop.is_set():
+            try:
+                # Jobs of a process that died (or hung) since startup
+                if time.monotonic() - last_sweep >= HEARTBEAT_INTERVAL_SECONDS:
+                    last_sweep = time.monotonic()
+                    self.requeue_stale()
+                job = self._claim(kind)
+            except Exception as e:
+                logging.error(f"Error claiming {kind} job: {e}")
+                job = None
+
+            if job is None:
+                wakeup.wait(self.poll_interval)
+                wakeup.clear()
+                continue
+
+            self._run(job)
+
+    def _run(self, job):
+        handler = self.handlers[job['kind']]
+        done = threading.Event()
+
+        def beat():
+            # Keeps a job that is busy without reporting progress (slow Jira or LLM call) from looking orphaned
+            while not done.wait(HEARTBEAT_INTERVAL_SECONDS):
+                try:
+                    self.heartbeat(job['job_id'])
+                except Exception as e:
+                    logging.error(f"Job {job['job_id']} heartbeat failed: {e}")
+
+        heartbeat = threading.Thread(target=beat, name=f"job-heartbeat-{job['job_id']}", daemon=True)
+        heartbeat.start()
+        try:
+            result = handler(JobContext(self, job))
+            self._finish(job['job_id'], 'succeeded', result=result, message='Completed')
+        except JobCancelled:
+            logging.info(f"Job {job['job_id']} cancelled")
+        except Exception as e:
+            logging.error(f"Job {job['job_id']} ({job['kind']}) failed: {e}")
+            self._finish(job['job_id'], 'failed', error=str(e), message='Failed')
+        finally:
+            done.set()
+
+
+def start_scheduler(queue, kind, interval_seconds, jitter_seconds=0, params=None):
+    """
+    Periodically enqueue `kind` jobs (coalesced with any active one).
+
+    Each wait is interval_seconds +/- a random jitter so several instances
+    don't hit Jira at the same moment.
+    """
+    def loop():
+        while not queue.stopping:
+            delay = max(60.0, interval_seconds + random.uniform(-jitter_seconds, jitter_seconds))
+            if queue.wait_stop(delay):
+                break
+            try:
+                job, created = queue.enqueue(kind, params, dedupe_key=kind)
+                logging.info(f"Scheduled {kind} job {job['job_id']} ({'queued' if created else 'already active'})")
+            except Exception as e:
+                logging.error(f"Scheduler failed to enqueue {kind}: {e}")
+
+    thread = threading.Thread(target=loop, name=f"job-scheduler-{kind}", daemon=True)
+    thread.start()
+    return thread
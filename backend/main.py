@@ -1,9 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Query
+from typing import Optional
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 from . import services
+from .response_cache import response_cache
+from .jobs import start_scheduler
+from .broker import broker
+from .notifications import DASHBOARD_TOPIC
+import asyncio
 import logging
 import json
+import time
 import sys
 import os
 
@@ -19,127 +26,486 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-Total-Count", "X-Next-Cursor", "X-Status-Counts"],
 )
 
+@app.on_event("startup")
+def on_startup():
+    try:
+        services.ensure_schema()
+    except Exception as e:
+        logging.error(f"Error applying database schema: {e}")
+    services.add_snapshot_listener(response_cache.clear)
+    services.add_snapshot_listener(services.dashboard_notifier.poke)
+    services.job_queue.start()
+
+    # Optional periodic snapshots, e.g. SNAPSHOT_SCHEDULE_MINUTES=1440
+    interval = float(os.getenv("SNAPSHOT_SCHEDULE_MINUTES", "0") or 0)
+    if interval > 0:
+        jitter = float(os.getenv("SNAPSHOT_SCHEDULE_JITTER_MINUTES", "5") or 0)
+        start_scheduler(services.job_queue, "snapshot", interval * 60, jitter * 60)
+
+@app.on_event("startup")
+async def start_notifier():
+    # Runs on the event loop: one change check per process, shared by all /api/events streams
+    services.dashboard_notifier.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    services.dashboard_notifier.stop()
+    services.job_queue.stop()
+    # Close pooled LLM connections if any provider was used
+    if "llm_service" in sys.modules:
+        sys.modules["llm_service"].llm_service.close()
+
+def cached_json(request: Request, endpoint, params, compute, with_headers=False):
+    """Serve compute() through the snapshot-keyed response cache, honouring ETag/If-None-Match."""
+    entry = response_cache.get_or_compute(endpoint, params, services.get_latest_snapshot(), compute, with_headers)
+    headers = entry.headers()
+    if entry.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 @app.get("/")
 def read_root():
     return {"message": "Jira Dashboard API is running"}
 
 @app.get("/api/history")
-def get_history():
+def get_history(request: Request):
     try:
-        data = services.get_history()
-        return data
+        return cached_json(request, "history", (), services.get_history)
     except Exception as e:
         logging.error(f"Error fetching history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/breakdown")
-def get_breakdown():
+def get_breakdown(request: Request):
     try:
-        data = services.get_breakdown()
-        return data
+        return cached_json(request, "breakdown", (), services.get_breakdown)
     except Exception as e:
         logging.error(f"Error fetching breakdown: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def split_values(value):
+    return tuple(v.strip() for v in value.split(",") if v.strip()) if value else None
+
+def bugs_response(request, label_filter, include_closed, status, priority, assignee, label, q, sort, order, cursor, limit):
+    """
+    One page of the filtered bug list. The cursor of the next page (absent on the
+    last one), the matching row count and the view's status counts go in
+    X-Next-Cursor, X-Total-Count and X-Status-Counts.
+    """
+    params = (label_filter, include_closed, split_values(status), split_values(priority), split_values(assignee),
+              label, q, sort, order, cursor, limit)
+
+    def compute():
+        bugs, next_cursor, total = services.get_bugs_page(
+            label_filter, include_closed, params[2], params[3], params[4], label, q,
+            sort, order == "desc", cursor, limit)
+        # Status counts of the whole view (not just this page) for the list's summary cards
+        status_counts = services.get_bug_status_counts(label_filter, include_closed)
+        headers = {"X-Total-Count": str(total), "X-Status-Counts": json.dumps(status_counts, separators=(",", ":"))}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return bugs, headers
+
+    try:
+        return cached_json(request, "bugs", params, compute, with_headers=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/api/bugs")
-def get_bugs():
+def get_bugs(request: Request,
+             status: Optional[str] = None, priority: Optional[str] = None, assignee: Optional[str] = None,
+             label: Optional[str] = None, q: Optional[str] = None,
+             sort: str = "priority", order: str = Query("asc", pattern="^(asc|desc)$"),
+             cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000),
+             include_closed: bool = False):
     try:
-        data = services.get_bugs_list()
-        return data
+        return bugs_response(request, None, include_closed, status, priority, assignee, label, q, sort, order, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching bugs list: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/dashboard")
+def get_dashboard(request: Request, views: str = "main", fields: str = ",".join(services.DASHBOARD_FIELDS)):
+    """All panels (history, breakdown, bugs) for one or more views in one round trip."""
+    view_list = tuple(v.strip() for v in views.split(",") if v.strip())
+    field_list = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [v for v in view_list if v not in services.VIEWS] + [f for f in field_list if f not in services.DASHBOARD_FIELDS]
+    if not view_list or unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown or missing views/fields: {', '.join(unknown)}")
+    try:
+        return cached_json(request, "dashboard", (view_list, field_list),
+                           lambda: services.get_dashboard(view_list, field_list))
+    except Exception as e:
+        logging.error(f"Error fetching dashboard: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Gate (Mass Production) Endpoints - 'OS_FCS'
 @app.get("/api/gate/history")
-def get_gate_history():
+def get_gate_history(request: Request):
     try:
-        data = services.get_history(label_filter="OS_FCS")
-        return data
+        return cached_json(request, "history", ("OS_FCS",),
+                           lambda: services.get_history(label_filter="OS_FCS"))
     except Exception as e:
         logging.error(f"Error fetching gate history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/gate/breakdown")
-def get_gate_breakdown():
+def get_gate_breakdown(request: Request):
     try:
-        data = services.get_breakdown(label_filter="OS_FCS")
-        return data
+        return cached_json(request, "breakdown", ("OS_FCS",),
+                           lambda: services.get_breakdown(label_filter="OS_FCS"))
     except Exception as e:
         logging.error(f"Error fetching gate breakdown: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/gate/bugs")
-def get_gate_bugs():
+def get_gate_bugs(request: Request,
+                  status: Optional[str] = None, priority: Optional[str] = None, assignee: Optional[str] = None,
+                  label: Optional[str] = None, q: Optional[str] = None,
+                  sort: str = "priority", order: str = Query("asc", pattern="^(asc|desc)$"),
+                  cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=1000),
+                  include_closed: bool = False):
     try:
-        data = services.get_bugs_list(label_filter="OS_FCS", include_closed=True)
-        return data
+        return bugs_response(request, "OS_FCS", include_closed, status, priority, assignee, label, q, sort, order, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching gate bugs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/snapshot")
+@app.get("/api/diff")
+def get_snapshot_diff(request: Request,
+                      from_snapshot: Optional[int] = Query(None, alias="from"),
+                      to_snapshot: Optional[int] = Query(None, alias="to"),
+                      days: float = Query(7, gt=0), label: Optional[str] = None, bugs_only: bool = True):
+    """
+    What changed between two snapshots: new, removed, closed, reopened, priority,
+    reassigned and status changes. Defaults to the latest snapshot against the one
+    from `days` (7) days earlier; label limits it to one view (e.g. OS_FCS).
+    """
+    try:
+        return cached_json(request, "diff", (from_snapshot, to_snapshot, days, label, bugs_only),
+                           lambda: services.get_snapshot_diff(from_snapshot, to_snapshot, days, label, bugs_only))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error computing snapshot diff: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/issues/{key}/timeline")
+def get_issue_timeline(request: Request, key: str):
+    """One issue's status, priority and assignee over time, as run-length compressed intervals."""
+    def compute():
+        timeline = services.get_issue_timeline(key)
+        if timeline is None:
+            raise LookupError(f"Issue {key} is not in any snapshot")
+        return timeline
+
+    try:
+        return cached_json(request, "timeline", (key,), compute)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error fetching issue timeline: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/search")
+def search_issues(request: Request, q: str = Query(..., min_length=1), snapshot: Optional[int] = None,
+                  status: Optional[str] = None, label: Optional[str] = None,
+                  limit: int = Query(50, ge=1, le=500), history: bool = False):
+    """
+    Full-text search over summaries, latest comments and LLM summaries, ranked by relevance.
+    Searches the latest snapshot unless snapshot is given, or all snapshots (each issue once)
+    with history=true; a trailing * matches prefixes.
+    """
+    params = (q, snapshot, split_values(status), label, limit, history)
+    try:
+        return cached_json(request, "search", params, lambda: services.search(*params))
+    except services.SearchUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error searching issues: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/duplicates")
+def get_duplicates(request: Request, key: Optional[str] = None, threshold: float = Query(0.6, gt=0, le=1),
+                   label: Optional[str] = None, include_closed: bool = True):
+    """Clusters of likely duplicate bugs in the latest snapshot, or the likely duplicates of one issue (key)."""
+    try:
+        return cached_json(request, "duplicates", (key, threshold, label, include_closed),
+                           lambda: services.get_duplicates(key, threshold, label, include_closed))
+    except Exception as e:
+        logging.error(f"Error finding duplicates: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/forecast")
+def get_forecast(request: Request, label: Optional[str] = None,
+                 simulations: int = Query(10000, ge=100, le=20000),
+                 history_weeks: int = Query(12, ge=2, le=104)):
+    """P50/P85/P95 dates for reaching zero open Critical/High bugs, from Monte Carlo simulation of weekly history."""
+    try:
+        return cached_json(request, "forecast", (label, simulations, history_weeks),
+                           lambda: services.get_forecast(label, simulations, history_weeks))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error computing forecast: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/analytics")
+def get_analytics(request: Request, dimension: str = Query("all", pattern="^(all|priority|component)$"),
+                  percentiles: str = "50,90"):
+    """P50/P90 (or any percentiles) of bug age, time to resolution and time in each status, in days."""
+    try:
+        quantiles = tuple(float(p) / 100 for p in split_values(percentiles) or ())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="percentiles must be numbers, e.g. 50,90")
+    if not quantiles or any(not 0 <= q <= 1 for q in quantiles):
+        raise HTTPException(status_code=400, detail="percentiles must be between 0 and 100")
+    try:
+        return cached_json(request, "analytics", (dimension, quantiles),
+                           lambda: services.get_analytics(dimension, quantiles))
+    except Exception as e:
+        logging.error(f"Error fetching analytics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/drilldown")
+def get_drilldown(request: Request, group_by: Optional[str] = Query(None, pattern="^(assignee|component|priority)$"),
+                  assignee: Optional[str] = None, component: Optional[str] = None, priority: Optional[str] = None,
+                  label: Optional[str] = None, snapshot: Optional[int] = None):
+    """Open/total bugs of an assignee x component x priority slice, optionally broken down by one of them."""
+    params = (group_by, assignee, component, priority, label, snapshot)
+    try:
+        return cached_json(request, "drilldown", params, lambda: services.get_drilldown(*params))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error fetching drilldown: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/drilldown/trend")
+def get_drilldown_trend(request: Request, assignee: Optional[str] = None, component: Optional[str] = None,
+                        priority: Optional[str] = None, label: Optional[str] = None,
+                        limit: Optional[int] = Query(None, ge=1, le=1000)):
+    """Open/total bugs of one slice for each snapshot (last `limit` snapshots), oldest first."""
+    params = (assignee, component, priority, label, limit)
+    try:
+        return cached_json(request, "drilldown_trend", params, lambda: services.get_drilldown_trend(*params))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error fetching drilldown trend: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/snapshot", status_code=202)
 def trigger_snapshot():
+    """Queue a snapshot job and return it immediately; poll /api/jobs/{job_id} for progress."""
     try:
-        result = services.trigger_snapshot()
-        if "error" in result:
-             raise HTTPException(status_code=400, detail=result["error"])
-        return result
+        job, created = services.enqueue_snapshot()
+        return {**job, "coalesced": not created}
     except Exception as e:
-        logging.error(f"Error processing snapshot: {e}")
+        logging.error(f"Error queueing snapshot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# Store last generated report for download
-last_generated_report = {"content": None, "filename": None}
+@app.get("/api/jobs")
+def list_jobs(kind: Optional[str] = None, limit: int = Query(20, ge=1, le=200)):
+    return services.job_queue.list(kind, limit)
 
-@app.get("/api/weekly-report/stream")
-def stream_weekly_report(provider: str = "openai"):
-    """Stream weekly report generation with progress updates via SSE."""
-    def event_generator():
-        global last_generated_report
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: int):
+    job = services.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/llm/providers")
+def llm_providers():
+    """Circuit state and hedge delays of the LLM providers used so far."""
+    from llm_service import llm_service
+    return {
+        "primary": llm_service.provider,
+        "fallbacks": llm_service.router.fallbacks,
+        "providers": llm_service.router.stats(),
+    }
+
+@app.get("/api/limits")
+def adaptive_limits():
+    """Current adaptive concurrency limits per backend (Jira, LLM providers)."""
+    from adaptive_limiter import all_limits
+    return all_limits()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"  # Disable nginx buffering
+}
+
+def parse_last_event_id(value):
+    """SSE ids are "<job_id>:<event_id>"; returns (job_id, event_id) or (None, 0)."""
+    try:
+        job_id, event_id = (value or "").split(":")
+        return int(job_id), int(event_id)
+    except ValueError:
+        return None, 0
+
+# Comment line sent on idle streams so proxies and browsers keep the connection open
+SSE_HEARTBEAT_SECONDS = 15
+
+# A viewer-started report whose streams have all disconnected is cancelled after
+# this many seconds (<= 0 never cancels); it can be resumed later
+REPORT_DETACH_GRACE_SECONDS = float(os.getenv("REPORT_DETACH_GRACE_SECONDS", "60"))
+
+# Keeps pending detach checks referenced until they run
+detach_tasks = set()
+
+async def cancel_if_detached(job_id):
+    await asyncio.sleep(REPORT_DETACH_GRACE_SECONDS)
+    if broker.subscriber_count(f"job:{job_id}") == 0:
+        job = await asyncio.to_thread(services.job_queue.get, job_id)
+        if job and job['status'] in ('queued', 'running') and (job['params'] or {}).get("cancel_when_detached"):
+            logging.info(f"Cancelling report job {job_id}: no viewers left")
+            await asyncio.to_thread(services.job_queue.cancel, job_id)
+
+def report_event_stream(request: Request, job_id, after=0):
+    async def event_generator():
+        wakeups = broker.subscribe(f"job:{job_id}")
+        last_sent = time.monotonic()
         try:
-            from report_service import generate_realtime_report
-            
-            for update in generate_realtime_report(provider=provider):
-                if update.get("type") == "complete":
-                    # Store for download endpoint
-                    last_generated_report["content"] = update.get("content")
-                    last_generated_report["filename"] = update.get("filename")
-                yield f"data: {json.dumps(update)}\n\n"
+            # Woken by this process's broker; other workers' jobs are polled at the heartbeat interval
+            events = services.report_store.follow(job_id, after, wakeups, poll_interval=SSE_HEARTBEAT_SECONDS)
+            async for event_id, event in events:
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    if time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+                        last_sent = time.monotonic()
+                        yield ": heartbeat\n\n"
+                    continue
+                prefix = f"id: {job_id}:{event_id}\n" if event_id is not None else ""
+                last_sent = time.monotonic()
+                yield f"{prefix}data: {json.dumps(event)}\n\n"
         except Exception as e:
             logging.error(f"Error in report stream: {e}")
             yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-    
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"  # Disable nginx buffering
-        }
-    )
+        finally:
+            wakeups.close()
+            if REPORT_DETACH_GRACE_SECONDS > 0:
+                task = asyncio.get_running_loop().create_task(cancel_if_detached(job_id))
+                detach_tasks.add(task)
+                task.add_done_callback(detach_tasks.discard)
 
-@app.get("/api/weekly-report/download")
-def download_weekly_report():
-    """Download the last generated weekly report as a file."""
-    from fastapi.responses import Response
-    
-    if not last_generated_report["content"]:
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/api/events")
+async def dashboard_events(request: Request):
+    """
+    SSE stream of dashboard changes, so clients re-query only when something changed:
+    'hello' (current snapshot) on connect, then 'snapshot' when a new snapshot is
+    saved and 'job' when a snapshot or report job finishes.
+    """
+    async def event_generator():
+        updates = broker.subscribe(DASHBOARD_TOPIC)
+        try:
+            latest = await asyncio.to_thread(services.get_latest_snapshot)
+            hello = {"type": "hello", "snapshot_id": latest[0] if latest else None,
+                     "timestamp": latest[1] if latest else None}
+            yield f"data: {json.dumps(hello)}\n\n"
+            while not await request.is_disconnected():
+                message = await updates.get(SSE_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": heartbeat\n\n"
+                else:
+                    yield f"data: {json.dumps(message)}\n\n"
+        finally:
+            updates.close()
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/api/weekly-report/stream")
+async def stream_weekly_report(request: Request, provider: str = "openai", stream_tokens: bool = False,
+                         project: Optional[str] = None, jql: Optional[str] = None):
+    """
+    Start (or join) a weekly report job and stream its progress via SSE.
+    With stream_tokens=true, partial LLM output is sent as 'token' events tagged with the issue key.
+    project/jql override REPORT_PROJECT/REPORT_JQL; a custom jql is always fetched in full.
+
+    The report runs as a background job and survives disconnects: a reconnecting
+    EventSource (Last-Event-ID) continues the same job where it left off.
+    """
+    job_id, after = parse_last_event_id(request.headers.get("last-event-id"))
+    if job_id is None:
+        job, _ = await asyncio.to_thread(services.enqueue_report, provider, stream_tokens, project, jql, True)
+        job_id = job['job_id']
+    return report_event_stream(request, job_id, after)
+
+@app.post("/api/weekly-report/jobs", status_code=202)
+def start_weekly_report(provider: str = "openai", stream_tokens: bool = False,
+                        project: Optional[str] = None, jql: Optional[str] = None):
+    """Queue a weekly report job; follow it with /api/weekly-report/jobs/{job_id}/events."""
+    job, created = services.enqueue_report(provider, stream_tokens, project, jql)
+    return {**job, "coalesced": not created}
+
+@app.get("/api/weekly-report/jobs/{job_id}/events")
+async def weekly_report_events(request: Request, job_id: int, after: int = 0):
+    """(Re)attach to a report job's event stream, replaying events after `after` (or Last-Event-ID)."""
+    if await asyncio.to_thread(services.job_queue.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    last_job_id, last_event_id = parse_last_event_id(request.headers.get("last-event-id"))
+    if last_job_id == job_id:
+        after = max(after, last_event_id)
+    return report_event_stream(request, job_id, after)
+
+@app.post("/api/weekly-report/jobs/{job_id}/cancel")
+def cancel_weekly_report(job_id: int):
+    if not services.job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not queued or running")
+    return services.job_queue.get(job_id)
+
+@app.post("/api/weekly-report/jobs/{job_id}/resume")
+def resume_weekly_report(job_id: int):
+    """
+    Requeue a cancelled or failed report job; already summarized issues are kept.
+    If the same report has been started again since, that job is returned instead.
+    """
+    job = services.report_store.resume(job_id)
+    if job is None:
+        raise HTTPException(status_code=409, detail="Only cancelled or failed jobs can be resumed")
+    return {**job, "coalesced": job['job_id'] != job_id}
+
+@app.get("/api/reports")
+def list_reports(limit: int = Query(20, ge=1, le=200)):
+    return services.report_store.list_reports(limit)
+
+def report_download(report):
+    if report is None:
         raise HTTPException(status_code=404, detail="No report generated yet. Please generate first.")
-    
-    filename = last_generated_report["filename"] or "weekly_report.md"
-    
+    filename = report["filename"] or "weekly_report.md"
     return Response(
-        content=last_generated_report["content"],
+        content=report["content"],
         media_type="text/markdown",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"'
         }
     )
 
+@app.get("/api/reports/{report_id}/download")
+def download_report(report_id: int):
+    return report_download(services.report_store.get_report(report_id))
+
+@app.get("/api/weekly-report/download")
+def download_weekly_report():
+    """Download the latest generated weekly report as a file."""
+    return report_download(services.report_store.get_report())
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
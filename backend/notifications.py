@@ -0,0 +1,100 @@
+"""
+Dashboard change notifications for the /api/events stream.
+
+One DashboardNotifier per process watches for new snapshots and finished jobs
+and publishes them on the broker's "dashboard" topic, so connected clients
+only re-query when something actually changed. Changes made by this process
+(snapshot listeners, job listeners) poke it for immediate delivery; changes
+made by other workers are found by a cheap periodic check of the latest
+snapshot id and recently finished jobs, shared by all connected clients and
+skipped while none is connected (changes meanwhile are announced on the first
+check after one connects).
+"""
+import asyncio
+import logging
+
+from . import read_model
+
+DASHBOARD_TOPIC = "dashboard"
+
+# Finished jobs are looked for this far back (must exceed the poll interval)
+RECENT_JOBS_SQL = '''
+    SELECT job_id, kind, status, finished_at FROM jobs
+    WHERE status IN ('succeeded', 'failed', 'cancelled')
+      AND finished_at >= datetime('now', '-10 minutes')
+'''
+
+
+class DashboardNotifier:
+    def __init__(self, connect, broker, poll_interval=5.0):
+        self.connect = connect
+        self.broker = broker
+        self.poll_interval = poll_interval
+        self.snapshot = None
+        self.announced_jobs = set()
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+
+    def _read_state(self):
+        conn = self.connect()
+        try:
+            row = conn.execute(read_model.LATEST_SNAPSHOT_SQL).fetchone()
+            jobs = [dict(r) for r in conn.execute(RECENT_JOBS_SQL).fetchall()]
+        finally:
+            conn.close()
+        snapshot = {"snapshot_id": row['snapshot_id'], "timestamp": row['timestamp']} if row else None
+        return snapshot, jobs
+
+    def start(self):
+        """Start watching (call from the event loop, e.g. on startup)."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def poke(self, *args):
+        """Check for changes now (thread-safe; usable directly as a snapshot or job listener)."""
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass
+
+    async def _run(self):
+        try:
+            self.snapshot, jobs = await asyncio.to_thread(self._read_state)
+            # Don't announce jobs that finished before we started
+            self.announced_jobs = {(job['job_id'], job['finished_at']) for job in jobs}
+        except Exception as e:
+            logging.error(f"Dashboard notifier failed to start: {e}")
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self.broker.subscriber_count(DASHBOARD_TOPIC):
+                continue
+            try:
+                await self.check()
+            except Exception as e:
+                logging.error(f"Dashboard notifier check failed: {e}")
+
+    async def check(self):
+        snapshot, jobs = await asyncio.to_thread(self._read_state)
+        if snapshot and snapshot != self.snapshot:
+            self.snapshot = snapshot
+            self.broker.publish(DASHBOARD_TOPIC, {"type": "snapshot", **snapshot})
+
+        # Keyed by finish time too: a resumed job is announced again when it finishes
+        for job in jobs:
+            if (job['job_id'], job['finished_at']) in self.announced_jobs:
+                continue
+            self.broker.publish(DASHBOARD_TOPIC, {
+                "type": "job", "job_id": job['job_id'], "kind": job['kind'], "status": job['status']
+            })
+        self.announced_jobs = {(job['job_id'], job['finished_at']) for job in jobs}
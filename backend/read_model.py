@@ -0,0 +1,310 @@
+"""
+In-memory read model of the latest snapshot.
+
+The latest snapshot is loaded once, sorted into display order (priority rank,
+then status rank) and stored column-wise. Every filter (bug type, open status,
+priority, status, label) is an int bitset over row positions, so breakdowns are
+popcounts and filtered bug lists are a walk over set bits in display order.
+
+A new model is built when a newer snapshot shows up and swapped in with a single
+reference assignment; readers holding the old model keep a consistent view.
+"""
+import base64
+import json
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+OPEN_STATUSES = ('New', 'Open', 'In Progress')
+
+PRIORITY_RANK = {
+    'Critical': 1,
+    'Blocker': 1,
+    'High': 2,
+    'Medium': 3,
+    'Low': 4,
+}
+DEFAULT_PRIORITY_RANK = 5
+
+STATUS_RANK = {
+    'New': 1,
+    'Open': 2,
+    'In Progress': 3,
+    'Ready for Test': 4,
+    'In Test': 5,
+    'Resolved': 6,
+    'Closed': 7,
+    'Done': 8,
+}
+DEFAULT_STATUS_RANK = 9
+
+LATEST_SNAPSHOT_SQL = "SELECT snapshot_id, timestamp FROM snapshots ORDER BY timestamp DESC, snapshot_id DESC LIMIT 1"
+
+
+def _key_parts(key):
+    """Natural sort parts for an issue key: THRPI-9 sorts before THRPI-10."""
+    project, _, number = (key or "").rpartition("-")
+    return (project, int(number)) if number.isdigit() else (key or "", 0)
+
+
+# Sort key name -> function(model, row) returning a flat, JSON-serialisable tuple.
+# Every tuple ends with the issue key parts so positions are unique (keyset cursors).
+SORT_KEYS = {
+    "priority": lambda m, i: (m.priority_ranks[i], m.status_ranks[i]) + _key_parts(m.keys[i]),
+    "status": lambda m, i: (m.status_ranks[i], m.priority_ranks[i]) + _key_parts(m.keys[i]),
+    "key": lambda m, i: _key_parts(m.keys[i]),
+    "created": lambda m, i: (m.created[i] or "",) + _key_parts(m.keys[i]),
+    "updated": lambda m, i: (m.updated[i] or "",) + _key_parts(m.keys[i]),
+    "assignee": lambda m, i: ((m.assignees[i] or "").lower(),) + _key_parts(m.keys[i]),
+}
+
+
+def encode_cursor(sort, descending, values):
+    raw = json.dumps([sort, descending, list(values)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (sort, descending, values); raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, descending, values = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if sort not in SORT_KEYS or not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return sort, bool(descending), tuple(values)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def iter_bits(mask):
+    """Yield the positions of set bits in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class SnapshotReadModel:
+    __slots__ = (
+        "snapshot_id", "timestamp", "size",
+        "keys", "summaries", "priorities", "statuses", "assignees",
+        "created", "reporters", "updated", "labels",
+        "priority_ranks", "status_ranks",
+        "all_mask", "bug_mask", "open_mask",
+        "priority_masks", "status_masks", "assignee_masks", "label_masks",
+        "_label_filter_cache", "_sort_indexes", "_search_text",
+    )
+
+    def __init__(self, snapshot_id, timestamp, rows):
+        """rows: sequence of (key, summary, priority, status, assignee, created,
+        reporter, updated, labels, type) tuples in any order."""
+        rows = sorted(rows, key=lambda r: (
+            PRIORITY_RANK.get(r[2], DEFAULT_PRIORITY_RANK),
+            STATUS_RANK.get(r[3], DEFAULT_STATUS_RANK),
+        ))
+
+        self.snapshot_id = snapshot_id
+        self.timestamp = timestamp
+        self.size = len(rows)
+
+        self.keys = tuple(r[0] for r in rows)
+        self.summaries = tuple(r[1] for r in rows)
+        self.priorities = tuple(_intern(r[2]) for r in rows)
+        self.statuses = tuple(_intern(r[3]) for r in rows)
+        self.assignees = tuple(_intern(r[4]) for r in rows)
+        self.created = tuple(r[5] for r in rows)
+        self.reporters = tuple(_intern(r[6]) for r in rows)
+        self.updated = tuple(r[7] for r in rows)
+        self.labels = tuple(r[8] for r in rows)
+
+        self.priority_ranks = array('B', (PRIORITY_RANK.get(p, DEFAULT_PRIORITY_RANK) for p in self.priorities))
+        self.status_ranks = array('B', (STATUS_RANK.get(s, DEFAULT_STATUS_RANK) for s in self.statuses))
+
+        self.all_mask = (1 << self.size) - 1
+        bug_mask = 0
+        open_mask = 0
+        priority_masks = {}
+        status_masks = {}
+        assignee_masks = {}
+        label_masks = {}
+        for i, r in enumerate(rows):
+            bit = 1 << i
+            if r[9] == 'Bug':
+                bug_mask |= bit
+            if r[3] in OPEN_STATUSES:
+                open_mask |= bit
+            priority_masks[self.priorities[i]] = priority_masks.get(self.priorities[i], 0) | bit
+            status_masks[self.statuses[i]] = status_masks.get(self.statuses[i], 0) | bit
+            assignee_masks[self.assignees[i]] = assignee_masks.get(self.assignees[i], 0) | bit
+            if r[8]:
+                for label in r[8].split(", "):
+                    label = _intern(label)
+                    label_masks[label] = label_masks.get(label, 0) | bit
+
+        self.bug_mask = bug_mask
+        self.open_mask = open_mask
+        self.priority_masks = priority_masks
+        self.status_masks = status_masks
+        self.assignee_masks = assignee_masks
+        self.label_masks = label_masks
+        self._label_filter_cache = {}
+        self._sort_indexes = {}
+        self._search_text = None
+
+    def label_mask(self, label_filter):
+        """Rows whose labels contain label_filter (same semantics as LIKE '%x%')."""
+        if not label_filter:
+            return self.all_mask
+        mask = self._label_filter_cache.get(label_filter)
+        if mask is None:
+            needle = label_filter.lower()
+            mask = 0
+            for label, label_bits in self.label_masks.items():
+                if needle in label.lower():
+                    mask |= label_bits
+            self._label_filter_cache[label_filter] = mask
+        return mask
+
+    def bug_filter_mask(self, label_filter=None, include_closed=False):
+        mask = self.bug_mask & self.label_mask(label_filter)
+        if not include_closed:
+            mask &= self.open_mask
+        return mask
+
+    def breakdown(self, label_filter=None):
+        mask = self.bug_filter_mask(label_filter)
+
+        def counts(masks):
+            data = [{"name": name, "value": (bits & mask).bit_count()} for name, bits in masks.items()]
+            data = [d for d in data if d["value"]]
+            data.sort(key=lambda d: (d["name"] is not None, d["name"] or ""))
+            return data
+
+        return {"priority": counts(self.priority_masks), "status": counts(self.status_masks)}
+
+    def values_mask(self, masks, values):
+        """Union of the bitsets for the given column values (None/empty = no filter)."""
+        if not values:
+            return self.all_mask
+        mask = 0
+        for value in values:
+            mask |= masks.get(value, 0)
+        return mask
+
+    def text_mask(self, query, candidates):
+        """Rows among candidates whose key/summary/assignee/reporter/labels contain query."""
+        if self._search_text is None:
+            self._search_text = tuple(
+                " ".join(v for v in (self.keys[i], self.summaries[i], self.assignees[i], self.reporters[i], self.labels[i]) if v).lower()
+                for i in range(self.size)
+            )
+        needle = query.lower()
+        mask = 0
+        for i in iter_bits(candidates):
+            if needle in self._search_text[i]:
+                mask |= 1 << i
+        return mask
+
+    def sort_index(self, sort):
+        """(row order, sort values) for a sort key, built once per snapshot."""
+        index = self._sort_indexes.get(sort)
+        if index is None:
+            sort_fn = SORT_KEYS[sort]
+            values = [sort_fn(self, i) for i in range(self.size)]
+            order = array('I', sorted(range(self.size), key=values.__getitem__))
+            index = (order, [values[i] for i in order])
+            self._sort_indexes[sort] = index
+        return index
+
+    def page(self, mask, sort="priority", descending=False, cursor=None, limit=None):
+        """
+        Keyset pagination over the rows in mask.
+
+        Args:
+            mask: Bitset of candidate rows
+            sort: Name from SORT_KEYS
+            descending: Reverse sort direction
+            cursor: Sort values of the last row of the previous page
+            limit: Page size (None = everything after the cursor)
+
+        Returns:
+            (row indices, sort values of the last returned row or None when exhausted)
+        """
+        order, values = self.sort_index(sort)
+        n = len(order)
+        if cursor is None:
+            start = 0
+        elif descending:
+            # Resume strictly after the cursor; values need not belong to this snapshot
+            start = n - bisect_left(values, cursor)
+        else:
+            start = bisect_right(values, cursor)
+
+        # Collect one extra row to know whether another page exists
+        rows = []
+        for position in range(start, n):
+            i = order[n - 1 - position] if descending else order[position]
+            if mask >> i & 1:
+                rows.append(i)
+                if limit is not None and len(rows) > limit:
+                    rows.pop()
+                    return rows, SORT_KEYS[sort](self, rows[-1])
+        return rows, None
+
+    def bug_dict(self, i, jira_base=""):
+        key = self.keys[i]
+        return {
+            "key": key,
+            "summary": self.summaries[i],
+            "priority": self.priorities[i],
+            "status": self.statuses[i],
+            "assignee": self.assignees[i],
+            "created": self.created[i],
+            "reporter": self.reporters[i],
+            "updated": self.updated[i],
+            "labels": self.labels[i],
+            "link": f"{jira_base}/browse/{key}" if jira_base else "",
+        }
+
+    def bugs(self, label_filter=None, include_closed=False, jira_base=""):
+        mask = self.bug_filter_mask(label_filter, include_closed)
+        rows, _ = self.page(mask)
+        return [self.bug_dict(i, jira_base) for i in rows]
+
+
+_current = None
+_load_lock = threading.Lock()
+
+
+def _load(conn, snapshot_id, timestamp):
+    rows = conn.execute('''
+        SELECT key, summary, priority, status, assignee, created_date, reporter, updated_date, labels, type
+        FROM issues
+        WHERE snapshot_id=?
+        ORDER BY id
+    ''', (snapshot_id,)).fetchall()
+    return SnapshotReadModel(snapshot_id, timestamp, [tuple(r) for r in rows])
+
+
+def get_read_model(conn):
+    """Return the read model for the latest snapshot, (re)building it if a newer snapshot landed."""
+    global _current
+    latest = conn.execute(LATEST_SNAPSHOT_SQL).fetchone()
+    if not latest:
+        return None
+
+    model = _current
+    if model is not None and model.snapshot_id == latest[0]:
+        return model
+
+    with _load_lock:
+        model = _current
+        if model is None or model.snapshot_id != latest[0]:
+            model = _load(conn, latest[0], latest[1])
+            _current = model
+    return model
@@ -0,0 +1,321 @@
+"""
+Weekly report jobs: checkpointed generation, event log and report history.
+
+A report runs as a 'report' job. Every finished summary is checkpointed in
+report_checkpoints, so a job that is requeued after a crash (or resumed after
+being cancelled) only summarizes the issues it had not finished. The job's
+events are appended to job_events; clients follow a job by reading the events
+after the last id they saw, so they can detach and reattach at any time, from
+any worker. Finished reports are kept in the reports table.
+"""
+import json
+import time
+import asyncio
+import logging
+
+from .jobs import FINISHED_STATUSES
+
+# Token deltas are buffered and stored at most this often per job
+TOKEN_FLUSH_SECONDS = 0.5
+
+# Seconds between cancellation checks while a report runs
+CANCEL_CHECK_SECONDS = 1.0
+
+# Event logs of finished jobs are kept this long
+EVENT_RETENTION_DAYS = 7
+
+# Marks where a new attempt of a job starts in its event log
+RESUMED_EVENT = {"type": "resumed", "status": "Resumed"}
+
+
+def report_dedupe_key(provider, project, jql):
+    return f"report:{provider}:{project or ''}:{jql or ''}"
+
+
+class ReportStore:
+    def __init__(self, queue):
+        """
+        Args:
+            queue: The JobQueue report jobs run on (its connect() is used for storage)
+        """
+        self.queue = queue
+        self.connect = queue.connect
+        # Callbacks run after an event is stored: listener(job_id, event_id, event)
+        self.listeners = []
+
+    # --- Event log ---
+
+    def append_event(self, job_id, event):
+        conn = self.connect()
+        try:
+            cursor = conn.execute("INSERT INTO job_events (job_id, type, data) VALUES (?, ?, ?)",
+                                  (job_id, event.get("type"), json.dumps(event)))
+            conn.commit()
+            event_id = cursor.lastrowid
+        finally:
+            conn.close()
+        for listener in self.listeners:
+            try:
+                listener(job_id, event_id, event)
+            except Exception as e:
+                logging.error(f"Job event listener failed: {e}")
+        return event_id
+
+    def events_after(self, job_id, after=0, limit=500):
+        """[(event_id, event dict)] of a job after the given event id."""
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                "SELECT event_id, data FROM job_events WHERE job_id=? AND event_id>? ORDER BY event_id LIMIT ?",
+                (job_id, after, limit)).fetchall()
+        finally:
+            conn.close()
+        return [(row['event_id'], json.loads(row['data'])) for row in rows]
+
+    def attempt_start(self, job_id):
+        """Event id to replay from so a follower starting at 0 sees only the latest attempt."""
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT MAX(event_id) FROM job_events WHERE job_id=? AND type='resumed'",
+                               (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] - 1 if row[0] else 0
+
+    def start_attempt(self, job_id):
+        """
+        Mark the start of a new attempt when the job already has events (it was
+        requeued after a crash, or resumed), unless the last event is the marker.
+        """
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT type FROM job_events WHERE job_id=? ORDER BY event_id DESC LIMIT 1",
+                               (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is not None and row['type'] != 'resumed':
+            self.append_event(job_id, dict(RESUMED_EVENT))
+
+    def resume(self, job_id):
+        """
+        Requeue a cancelled or failed report job (see JobQueue.retry).
+
+        A 'resumed' event marks where the new attempt's events start; the previous
+        attempt's progress and error stay in the log but are not replayed from 0.
+        """
+        def mark(conn, job_id):
+            conn.execute("INSERT INTO job_events (job_id, type, data) VALUES (?, 'resumed', ?)",
+                         (job_id, json.dumps(RESUMED_EVENT)))
+
+        job = self.queue.retry(job_id, on_requeue=mark)
+        if job is not None and job['job_id'] == job_id:
+            for listener in self.listeners:
+                try:
+                    listener(job_id, None, {"type": "resumed"})
+                except Exception as e:
+                    logging.error(f"Job event listener failed: {e}")
+        return job
+
+    # --- Checkpoints ---
+
+    def checkpoints(self, job_id):
+        conn = self.connect()
+        try:
+            rows = conn.execute("SELECT issue_key, llm_summary FROM report_checkpoints WHERE job_id=?", (job_id,)).fetchall()
+        finally:
+            conn.close()
+        return {row['issue_key']: row['llm_summary'] for row in rows}
+
+    def save_checkpoint(self, job_id, issue_key, llm_summary):
+        conn = self.connect()
+        try:
+            conn.execute("INSERT OR REPLACE INTO report_checkpoints (job_id, issue_key, llm_summary) VALUES (?, ?, ?)",
+                         (job_id, issue_key, llm_summary))
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Reports ---
+
+    def save_report(self, job_id, content, filename, issue_count, provider=None, project=None):
+        conn = self.connect()
+        try:
+            cursor = conn.execute('''
+                INSERT INTO reports (job_id, filename, content, issue_count, provider, project)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (job_id, filename, content, issue_count, provider, project))
+            # The report is complete: its checkpoints are no longer needed
+            conn.execute("DELETE FROM report_checkpoints WHERE job_id=?", (job_id,))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def list_reports(self, limit=20):
+        conn = self.connect()
+        try:
+            rows = conn.execute('''
+                SELECT report_id, job_id, filename, issue_count, provider, project, created_at
+                FROM reports ORDER BY report_id DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def get_report(self, report_id=None):
+        """A stored report with its content; the latest one without report_id."""
+        conn = self.connect()
+        try:
+            if report_id is None:
+                row = conn.execute("SELECT * FROM reports ORDER BY report_id DESC LIMIT 1").fetchone()
+            else:
+                row = conn.execute("SELECT * FROM reports WHERE report_id=?", (report_id,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def prune(self):
+        """Drop event logs and leftover checkpoints of jobs finished long ago."""
+        conn = self.connect()
+        try:
+            for table in ("job_events", "report_checkpoints"):
+                conn.execute(f'''
+                    DELETE FROM {table} WHERE job_id IN (
+                        SELECT job_id FROM jobs
+                        WHERE status IN ('succeeded', 'failed', 'cancelled')
+                          AND finished_at < datetime('now', '-{int(EVENT_RETENTION_DAYS)} days')
+                    )
+                ''')
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Job handler ---
+
+    def run_job(self, job):
+        """'report' job handler: generate the report, checkpointing and logging as it goes."""
+        from report_service import generate_realtime_report
+
+        params = job.params
+        # Followers starting from 0 skip what an earlier (crashed or cancelled) attempt logged
+        self.start_attempt(job.job_id)
+        resume = self.checkpoints(job.job_id)
+        if resume:
+            self.append_event(job.job_id, {"type": "progress", "current": len(resume), "total": 0,
+                                           "status": f"Resuming: {len(resume)} issues already summarized",
+                                           "issue_key": None})
+
+        tokens = {}
+        last_flush = time.monotonic()
+        last_check = time.monotonic()
+
+        def flush_tokens():
+            for issue_key, delta in tokens.items():
+                self.append_event(job.job_id, {"type": "token", "issue_key": issue_key, "delta": delta})
+            tokens.clear()
+
+        updates = generate_realtime_report(
+            provider=params.get("provider"),
+            stream_tokens=params.get("stream_tokens", False),
+            project=params.get("project"),
+            jql=params.get("jql"),
+            resume=resume,
+            on_summary=lambda issue_key, summary: self.save_checkpoint(job.job_id, issue_key, summary),
+        )
+        result = None
+        try:
+            for update in updates:
+                if update.get("type") == "token":
+                    tokens[update["issue_key"]] = tokens.get(update["issue_key"], "") + update["delta"]
+                    if time.monotonic() - last_flush >= TOKEN_FLUSH_SECONDS:
+                        flush_tokens()
+                        last_flush = time.monotonic()
+                else:
+                    flush_tokens()
+
+                if update.get("type") == "complete":
+                    report_id = self.save_report(job.job_id, update["content"], update["filename"],
+                                                 update.get("issue_count", 0), params.get("provider"), params.get("project"))
+                    result = {"report_id": report_id, "filename": update["filename"], "issue_count": update.get("issue_count", 0)}
+                    # The content lives in the reports table; followers load it from there
+                    self.append_event(job.job_id, {"type": "complete", **result})
+                elif update.get("type") != "token":
+                    self.append_event(job.job_id, update)
+                    if update.get("type") == "progress":
+                        job.update(update.get("current"), update.get("total"), update.get("status"))
+
+                if time.monotonic() - last_check >= CANCEL_CHECK_SECONDS:
+                    job.check_cancelled()
+                    last_check = time.monotonic()
+        finally:
+            # Stops the summary pool when the job is cancelled or fails
+            updates.close()
+
+        try:
+            self.prune()
+        except Exception as e:
+            logging.error(f"Failed to prune report job data: {e}")
+        return result
+
+    # --- Followers ---
+
+    def _final_event(self, job):
+        """Closing event for a finished job whose event log has been read completely."""
+        result = job.get('result') or {}
+        if job['status'] == 'succeeded' and result.get('report_id'):
+            report = self.get_report(result['report_id'])
+            return {"type": "complete", **result, "content": report["content"] if report else ""}
+        if job['status'] == 'cancelled':
+            return {"type": "error", "message": "Report job was cancelled"}
+        return {"type": "error", "message": job.get('error') or "Report job ended without a report"}
+
+    async def follow(self, job_id, after=0, wakeups=None, poll_interval=1.0):
+        """
+        Async generator of (event_id, event) for a job after `after`, until it finishes.
+
+        The 'complete' event carries the report content; a job that ends without
+        one yields a final error event (event_id None). Following from 0 starts at
+        the latest 'resumed' marker.
+
+        Without wakeups the database is polled every poll_interval. wakeups is an
+        optional broker Subscription notified when this process appends an event
+        or the job changes state: the database is then read on each wakeup, and
+        polled only every poll_interval as a fallback for jobs running in other
+        workers. Each poll_interval that passes yields (None, None) so the
+        caller can send heartbeats.
+        """
+        if not after:
+            after = await asyncio.to_thread(self.attempt_start, job_id)
+        next_poll = time.monotonic() + poll_interval
+        while True:
+            rows = await asyncio.to_thread(self.events_after, job_id, after)
+            for event_id, event in rows:
+                after = event_id
+                if event.get("type") == "complete":
+                    report = await asyncio.to_thread(self.get_report, event["report_id"])
+                    yield event_id, {**event, "content": report["content"] if report else ""}
+                    return
+                yield event_id, event
+            if rows:
+                continue
+
+            job = await asyncio.to_thread(self.queue.get, job_id)
+            if job is None:
+                yield None, {"type": "error", "message": "Report job not found"}
+                return
+            if job['status'] in FINISHED_STATUSES:
+                # Events written just before the job finished
+                if await asyncio.to_thread(self.events_after, job_id, after, 1):
+                    continue
+                yield None, await asyncio.to_thread(self._final_event, job)
+                return
+
+            if wakeups is None:
+                await asyncio.sleep(poll_interval)
+                yield None, None
+                continue
+            if await wakeups.get(max(0.0, next_poll - time.monotonic())) is None:
+                next_poll = time.monotonic() + poll_interval
+                yield None, None
+            # Hints queued meanwhile are covered by the read that follows
+            wakeups.clear()
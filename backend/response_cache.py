@@ -0,0 +1,113 @@
+"""
+Response cache for the dashboard endpoints.
+
+Entries are keyed by (endpoint, filters, latest snapshot id): data only changes
+when a snapshot is saved, so a new snapshot id naturally misses the cache and
+save_snapshot additionally clears it in-process. Each entry keeps the encoded
+JSON body with its ETag and Last-Modified values so repeat requests can be
+answered with 304 Not Modified.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "last_modified", "extra_headers")
+
+    def __init__(self, body, etag, last_modified, extra_headers=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.extra_headers = extra_headers or {}
+
+    def headers(self):
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache", **self.extra_headers}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified(self, if_none_match=None, if_modified_since=None):
+        """Evaluate conditional request headers (If-None-Match takes precedence)."""
+        if if_none_match:
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            if "*" in candidates:
+                return True
+            bare = self.etag[2:] if self.etag.startswith("W/") else self.etag
+            return any((tag[2:] if tag.startswith("W/") else tag) == bare for tag in candidates)
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+
+def snapshot_datetime(timestamp):
+    """Parse a snapshots.timestamp value (SQLite CURRENT_TIMESTAMP is UTC)."""
+    if not timestamp:
+        return None
+    try:
+        return datetime.strptime(timestamp[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def encode_json(data):
+    # Same encoding as starlette's JSONResponse
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, endpoint, params, snapshot, compute, with_headers=False):
+        """
+        Return the CachedResponse for endpoint/params at the given snapshot.
+
+        Args:
+            endpoint: Endpoint name used in the cache key
+            params: Hashable tuple of the request filters
+            snapshot: (snapshot_id, timestamp) of the latest snapshot, or None
+            compute: Zero-argument function returning the JSON-serialisable payload
+            with_headers: compute returns (payload, extra response headers) instead
+        """
+        snapshot_id, timestamp = snapshot if snapshot else (None, None)
+        key = (endpoint, params, snapshot_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        extra_headers = None
+        payload = compute()
+        if with_headers:
+            payload, extra_headers = payload
+        body = encode_json(payload)
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        entry = CachedResponse(body, etag, snapshot_datetime(timestamp), extra_headers)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self, snapshot_id=None):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
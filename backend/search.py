@@ -0,0 +1,106 @@
+"""
+Full-text search over issue summaries, latest comments and LLM summaries.
+
+Backed by the issues_fts FTS5 index (see init_db.ensure_search_index), which
+covers every snapshot. Searches the latest snapshot by default. Matches are ranked by bm25 with summary hits weighted
+highest, and each result carries a highlighted snippet of the best-matching
+column.
+"""
+import re
+
+# Marks the matched terms in snippets
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+SNIPPET_TOKENS = 16
+
+_TERM_RE = re.compile(r'\S+')
+
+
+class SearchUnavailable(Exception):
+    """The database has no full-text index (SQLite built without FTS5)."""
+
+
+def to_match_query(text):
+    """
+    FTS5 MATCH expression for free text: every word must match, in any column.
+
+    Words are quoted so punctuation (THRPI-123, "it's", C++) never causes a
+    syntax error; a trailing * keeps prefix matching (e.g. "crash*").
+    """
+    terms = []
+    for term in _TERM_RE.findall(text or ""):
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search_issues(conn, query, snapshot_id=None, statuses=None, label=None, limit=50, jira_base="", history=False):
+    """
+    Ranked issue matches for a free-text query.
+
+    Args:
+        query: Words to search for (see to_match_query)
+        snapshot_id: Snapshot to search; None means the latest one
+        statuses: Accepted statuses (None = any)
+        label: Label substring filter
+        limit: Maximum number of results
+        history: Search all snapshots instead (snapshot_id ignored), returning
+            each issue once, from its best-ranked snapshot
+
+    Returns:
+        List of issue dicts with snapshot_id, timestamp, snippet and score (lower is better)
+    """
+    match = to_match_query(query)
+    if not match:
+        return []
+
+    filters = ""
+    params = [match]
+    if snapshot_id is not None and not history:
+        filters += " AND i.snapshot_id = ?"
+        params.append(snapshot_id)
+    elif not history:
+        filters += " AND i.snapshot_id = (SELECT snapshot_id FROM snapshots ORDER BY timestamp DESC, snapshot_id DESC LIMIT 1)"
+    if statuses:
+        filters += f" AND i.status IN ({', '.join('?' for _ in statuses)})"
+        params.extend(statuses)
+    if label:
+        filters += " AND i.labels LIKE ?"
+        params.append(f"%{label}%")
+
+    # With history the same issue matches once per snapshot: rank without
+    # snippets, keep each issue's best hit (unchanged text ranks the same in
+    # every snapshot, so prefer its latest state) and build snippets only for
+    # the `limit` results
+    sql = f'''
+        WITH hits AS (
+            SELECT i.id, i.key, issues_fts.rank AS score, s.timestamp,
+                   ROW_NUMBER() OVER (PARTITION BY i.key ORDER BY issues_fts.rank, s.timestamp DESC) AS n
+            FROM issues_fts
+            JOIN issues i ON i.id = issues_fts.rowid
+            JOIN snapshots s ON s.snapshot_id = i.snapshot_id
+            WHERE issues_fts MATCH ?{filters}
+        ), best AS (
+            SELECT id FROM hits WHERE n = 1 ORDER BY score, timestamp DESC, key LIMIT ?
+        )
+        SELECT i.key, i.summary, i.status, i.priority, i.assignee, i.labels,
+               i.snapshot_id, s.timestamp,
+               snippet(issues_fts, -1, ?, ?, '...', {SNIPPET_TOKENS}) AS snippet,
+               issues_fts.rank AS score
+        FROM issues_fts
+        JOIN issues i ON i.id = issues_fts.rowid
+        JOIN snapshots s ON s.snapshot_id = i.snapshot_id
+        WHERE issues_fts MATCH ? AND issues_fts.rowid IN (SELECT id FROM best)
+        ORDER BY issues_fts.rank, s.timestamp DESC, i.key
+    '''
+    params += [limit, SNIPPET_START, SNIPPET_END, match]
+
+    results = []
+    for row in conn.execute(sql, params):
+        result = dict(row)
+        result["score"] = round(result["score"], 3)
+        result["link"] = f"{jira_base}/browse/{row['key']}" if jira_base else ""
+        results.append(result)
+    return results
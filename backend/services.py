@@ -17,33 +17,74 @@ except Exception as e:
     snapshot_jira_data = None
     fetch_jira_data = None
 
+import init_db
+import duplicates
+import analytics
+import rollup
+from . import read_model
+from .jobs import JobQueue, FINISHED_STATUSES
+from .reports import ReportStore, report_dedupe_key
+from . import diff
+from .timeline import issue_timeline
+from .search import search_issues, SearchUnavailable
+from .broker import broker
+from .notifications import DashboardNotifier
+
 DB_NAME = "dashboard.db"
 
 def get_db_connection():
     # DB is in the root directory relative to backend/
     db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DB_NAME)
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, timeout=30.0)
     conn.row_factory = sqlite3.Row
     return conn
 
-def get_history(label_filter=None):
+def ensure_schema():
+    # Bring older databases up to date (new indexes/tables); no-op when current
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get snapshots sorted by date
-    cursor.execute("SELECT snapshot_id, timestamp FROM snapshots ORDER BY timestamp ASC")
-    snapshots = cursor.fetchall()
+    try:
+        init_db.apply_schema(conn)
+        # Roll up snapshots taken before the rollup table existed, and fold
+        # snapshots not yet in the analytics sketches into them (whole history
+        # on first run), outside of any snapshot save
+        rollup.catch_up(conn)
+        analytics.catch_up(conn)
+        conn.commit()
+    finally:
+        conn.close()
 
-    # Sort snapshots by timestamp just in case
-    snapshots.sort(key=lambda x: x['timestamp'])
+def get_latest_snapshot():
+    """Return (snapshot_id, timestamp) of the latest snapshot, or None."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute(read_model.LATEST_SNAPSHOT_SQL).fetchone()
+    finally:
+        conn.close()
+    return (row['snapshot_id'], row['timestamp']) if row else None
+
+def add_snapshot_listener(callback):
+    # Called with the new snapshot_id after save_snapshot commits (in this process)
+    if snapshot_jira_data is not None:
+        snapshot_jira_data.snapshot_listeners.append(callback)
+
+OPEN_STATUS_SQL = "('New', 'Open', 'In Progress')"
 
-    history = []
+# Dashboard views served by /api/dashboard
+VIEWS = {
+    "main": {"label_filter": None, "include_closed": False},
+    "gate": {"label_filter": "OS_FCS", "include_closed": True},
+}
+DASHBOARD_FIELDS = ("history", "breakdown", "bugs")
+
+def _select_history_snapshots(snapshots):
+    """Pick the snapshots shown in history: weekly cadence, latest of each day, always the latest."""
+    selected = []
     last_date = None
     
     # Identify the very last available snapshot ID to ensure it's included
     latest_sid = snapshots[-1]['snapshot_id'] if snapshots else None
 
-    for i, snap in enumerate(snapshots):
+    for snap in snapshots:
         sid = snap['snapshot_id']
         ts_str = snap['timestamp']
         date_full = ts_str.split(' ')[0]
@@ -73,82 +114,120 @@ def get_history(label_filter=None):
 
         # If same day, remove the previous one to replace it
         if is_same_day:
-            history.pop()
-
-        # Construct label clause
-        label_clause = f" AND labels LIKE '%{label_filter}%' " if label_filter else ""
+            selected.pop()
 
-        # 1. Open Bugs (Explicit Statuses)
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND type='Bug'{label_clause}", (sid,))
-        open_count = cursor.fetchone()[0]
-        
-        # 2. Critical & High (Explicit Statuses)
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND priority IN ('Critical', 'Blocker') AND type='Bug'{label_clause}", (sid,))
-        critical = cursor.fetchone()[0]
-
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND priority = 'High' AND type='Bug'{label_clause}", (sid,))
-        high = cursor.fetchone()[0]
-
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND priority = 'Medium' AND type='Bug'{label_clause}", (sid,))
-        medium = cursor.fetchone()[0]
-
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND priority = 'Low' AND type='Bug'{label_clause}", (sid,))
-        low = cursor.fetchone()[0]
-
-        # 3. Velocity (Weekly)
-        cursor.execute("SELECT date(?, '-6 days')", (date_full,))
-        week_start = cursor.fetchone()[0]
-
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND date(substr(created_date,1,10)) BETWEEN ? AND ? AND type='Bug'{label_clause}", (sid, week_start, date_full))
-        new_count = cursor.fetchone()[0]
-
-        cursor.execute(f"SELECT COUNT(*) FROM issues WHERE snapshot_id=? AND date(substr(resolution_date,1,10)) BETWEEN ? AND ? AND type='Bug'{label_clause}", (sid, week_start, date_full))
-        fixed_count = cursor.fetchone()[0]
-
-        history.append({
-            "date": date_full,
-            "open": open_count,
-            "critical": critical,
-            "high": high,
-            "medium": medium,
-            "low": low,
-            "new_bugs": new_count,
-            "fixed_bugs": fixed_count
-        })
-        
+        selected.append((sid, date_full))
         last_date = date_full
 
-    conn.close()
-    return history
+    return selected
 
-def get_breakdown(label_filter=None):
-    conn = get_db_connection()
+def get_histories(label_filters, conn=None):
+    """
+    Compute the history series for several label filters in one pass.
+
+    All metrics for all filters come from a single grouped query per chunk of
+    snapshots instead of one COUNT query per metric, snapshot and filter.
+
+    Returns:
+        dict mapping each label filter to its list of history points
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
     cursor = conn.cursor()
     
+    # Get snapshots sorted by date
+    cursor.execute("SELECT snapshot_id, timestamp FROM snapshots ORDER BY timestamp ASC")
+    snapshots = cursor.fetchall()
+
+    # Sort snapshots by timestamp just in case
+    snapshots.sort(key=lambda x: x['timestamp'])
+    selected = _select_history_snapshots(snapshots)
+
+    # Weekly velocity window: [snapshot date - 6 days, snapshot date]
+    snap_date = "substr(s.timestamp, 1, 10)"
+    week_clause = f"BETWEEN date({snap_date}, '-6 days') AND {snap_date}"
+
+    columns = []
+    params = []
+    for label_filter in label_filters:
+        # Construct label clause
+        label_clause = " AND i.labels LIKE ?" if label_filter else ""
+        label_params = [f"%{label_filter}%"] if label_filter else []
+        open_clause = f"i.status IN {OPEN_STATUS_SQL}{label_clause}"
+        for condition in (
+            open_clause,
+            f"{open_clause} AND i.priority IN ('Critical', 'Blocker')",
+            f"{open_clause} AND i.priority = 'High'",
+            f"{open_clause} AND i.priority = 'Medium'",
+            f"{open_clause} AND i.priority = 'Low'",
+        ):
+            columns.append(f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)")
+            params.extend(label_params)
+        for date_column in ("created_date", "resolution_date"):
+            columns.append(f"SUM(CASE WHEN date(substr(i.{date_column},1,10)) {week_clause}{label_clause} THEN 1 ELSE 0 END)")
+            params.extend(label_params)
+
+    counts = {}
+    sids = [sid for sid, _ in selected]
+    for start in range(0, len(sids), 500):
+        chunk = sids[start:start + 500]
+        cursor.execute(f"""
+            SELECT i.snapshot_id, {', '.join(columns)}
+            FROM issues i JOIN snapshots s ON s.snapshot_id = i.snapshot_id
+            WHERE i.snapshot_id IN ({', '.join('?' * len(chunk))}) AND i.type='Bug'
+            GROUP BY i.snapshot_id
+        """, params + chunk)
+        for row in cursor.fetchall():
+            counts[row[0]] = tuple(v or 0 for v in row[1:])
+
+    if own_conn:
+        conn.close()
+
+    histories = {}
+    for n, label_filter in enumerate(label_filters):
+        history = []
+        for sid, date_full in selected:
+            values = counts.get(sid, (0,) * len(columns))[n * 7:(n + 1) * 7]
+            history.append({
+                "date": date_full,
+                "open": values[0],
+                "critical": values[1],
+                "high": values[2],
+                "medium": values[3],
+                "low": values[4],
+                "new_bugs": values[5],
+                "fixed_bugs": values[6]
+            })
+        histories[label_filter] = history
+    return histories
+
+def get_history(label_filter=None, conn=None):
+    return get_histories([label_filter], conn)[label_filter]
+
+def get_latest_model(conn=None):
     # Use the absolute latest snapshot for the "Current" view
-    cursor.execute("SELECT snapshot_id FROM snapshots ORDER BY timestamp DESC LIMIT 1")
-    row = cursor.fetchone()
-    if not row:
+    if conn is not None:
+        return read_model.get_read_model(conn)
+    conn = get_db_connection()
+    try:
+        return read_model.get_read_model(conn)
+    finally:
         conn.close()
-        return {"priority": [], "status": []}
-    
-    sid = row[0]
 
-    # Construct label clause
-    label_clause = f" AND labels LIKE '%{label_filter}%' " if label_filter else ""
-    
-    # Priority
-    cursor.execute(f"SELECT priority, COUNT(*) as count FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND type='Bug'{label_clause} GROUP BY priority", (sid,))
-    priority_data = [{"name": r['priority'], "value": r['count']} for r in cursor.fetchall()]
-    
-    # Status
-    cursor.execute(f"SELECT status, COUNT(*) as count FROM issues WHERE snapshot_id=? AND status IN ('New', 'Open', 'In Progress') AND type='Bug'{label_clause} GROUP BY status", (sid,))
-    status_data = [{"name": r['status'], "value": r['count']} for r in cursor.fetchall()]
+def get_breakdown(label_filter=None, conn=None):
+    model = get_latest_model(conn)
 
-    conn.close()
-    return {"priority": priority_data, "status": status_data}
+    if model is None:
+        return {"priority": [], "status": []}
+    return model.breakdown(label_filter)
+
+def trigger_snapshot(progress_callback=None):
+    """
+    Fetch from Jira and save a new snapshot (synchronous; normally run as a 'snapshot' job).
 
-def trigger_snapshot():
+    progress_callback: Optional function(progress, total, message)
+    """
     # Reuse the logic from snapshot_jira_data.py
     # We need to load env vars here as well
     load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
@@ -162,102 +241,326 @@ def trigger_snapshot():
         return {"error": "Missing configuration in .env"}
 
     # Fetch
-    issues = fetch_jira_data.fetch_issues(jira_url, jql, email, api_token)
+    on_page = None
+    if progress_callback:
+        on_page = lambda fetched, total: progress_callback(fetched, total, f"Fetched {fetched}/{total} issues from Jira")
+    issues = fetch_jira_data.fetch_issues(jira_url, jql, email, api_token, progress_callback=on_page)
     
     # Save (using the imported module's save function if available, or direct logic)
     # Since snapshot_jira_data.py has the save_snapshot function, we can use it.
-    snapshot_jira_data.save_snapshot(issues)
+    if progress_callback:
+        progress_callback(None, None, f"Saving snapshot of {len(issues)} issues...")
+    snapshot_id = snapshot_jira_data.save_snapshot(issues)
     
-    return {"status": "success", "count": len(issues)}
+    return {"status": "success", "count": len(issues), "snapshot_id": snapshot_id}
 
-def get_bugs_list(label_filter=None, include_closed=False):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Use the absolute latest snapshot for the "Current" view
-    cursor.execute("SELECT snapshot_id FROM snapshots ORDER BY timestamp DESC LIMIT 1")
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return []
-    
-    sid = row[0]
-    
-    label_clause = f" AND labels LIKE '%{label_filter}%' " if label_filter else ""
-    
-    status_clause = " AND status IN ('New', 'Open', 'In Progress') " if not include_closed else ""
-
-    # 2. Query details for this snapshot
-    query = f"""
-        SELECT key, summary, priority, status, assignee, created_date, reporter, updated_date, labels
-        FROM issues 
-        WHERE snapshot_id=? 
-          AND type='Bug' 
-          {status_clause}
-          {label_clause}
-        ORDER BY 
-          CASE priority 
-            WHEN 'Critical' THEN 1 
-            WHEN 'Blocker' THEN 1 
-            WHEN 'High' THEN 2 
-            WHEN 'Medium' THEN 3 
-            WHEN 'Low' THEN 4 
-            ELSE 5 
-          END ASC, 
-          CASE status
-            WHEN 'New' THEN 1
-            WHEN 'Open' THEN 2
-            WHEN 'In Progress' THEN 3
-            WHEN 'Ready for Test' THEN 4
-            WHEN 'In Test' THEN 5
-            WHEN 'Resolved' THEN 6
-            WHEN 'Closed' THEN 7
-            WHEN 'Done' THEN 8
-            ELSE 9
-          END ASC
+def run_snapshot_job(job):
+    result = trigger_snapshot(lambda progress, total, message: job.update(progress, total, message))
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result
+
+job_queue = JobQueue(get_db_connection)
+job_queue.register("snapshot", run_snapshot_job)
+
+report_store = ReportStore(job_queue)
+job_queue.register("report", report_store.run_job)
+
+# Wake up this process's SSE streams of a job when it logs an event or finishes
+report_store.listeners.append(lambda job_id, event_id, event: broker.publish(f"job:{job_id}"))
+job_queue.listeners.append(lambda job: broker.publish(f"job:{job['job_id']}") if job else None)
+
+# Announces new snapshots and finished jobs to /api/events subscribers
+dashboard_notifier = DashboardNotifier(get_db_connection, broker)
+job_queue.listeners.append(lambda job: dashboard_notifier.poke() if job and job['status'] in FINISHED_STATUSES else None)
+
+def enqueue_snapshot():
+    """Queue a snapshot run; concurrent requests coalesce into the active job."""
+    return job_queue.enqueue("snapshot", dedupe_key="snapshot")
+
+def enqueue_report(provider, stream_tokens=False, project=None, jql=None, cancel_when_detached=False):
     """
-    cursor.execute(query, (sid,))
-    rows = cursor.fetchall()
-    
-    bugs = []
-    
+    Queue a weekly report; requests for the same provider and scope share the active job.
+
+    cancel_when_detached: the job was started by a viewer and is cancelled once all
+    its streams have disconnected (it can still be resumed)
+    """
+    params = {"provider": provider, "stream_tokens": stream_tokens, "project": project, "jql": jql,
+              "cancel_when_detached": cancel_when_detached}
+    return job_queue.enqueue("report", params, dedupe_key=report_dedupe_key(provider, project, jql))
+
+def get_jira_base():
     # Reload env to ensure JIRA_URL is available
     if not os.getenv("JIRA_URL"):
         load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env'))
-    jira_base = os.getenv("JIRA_URL", "")
-
-    for r in rows:
-        # Check if reporter/updated/labels are columns (handle transition)
-        try:
-            reporter = r['reporter']
-        except IndexError:
-            reporter = 'N/A'
-            
-        try:
-            updated = r['updated_date']
-        except IndexError:
-            updated = 'N/A'
-            
-        try:
-            labels = r['labels']
-        except IndexError:
-            labels = ''
-            
-        key = r['key']
-        link = f"{jira_base}/browse/{key}" if jira_base else ""
-
-        bugs.append({
-            "key": key,
-            "summary": r['summary'],
-            "priority": r['priority'],
-            "status": r['status'],
-            "assignee": r['assignee'],
-            "created": r['created_date'],
-            "reporter": reporter,
-            "updated": updated,
-            "labels": labels,
-            "link": link
-        })
-        
-    conn.close()
-    return bugs
+    return os.getenv("JIRA_URL", "")
+
+def get_bugs_list(label_filter=None, include_closed=False, conn=None):
+    model = get_latest_model(conn)
+    if model is None:
+        return []
+    return model.bugs(label_filter, include_closed, get_jira_base())
+
+def get_bugs_page(label_filter=None, include_closed=False, statuses=None, priorities=None,
+                  assignees=None, label=None, query=None, sort="priority", descending=False,
+                  cursor=None, limit=None):
+    """
+    Filtered, sorted, keyset-paginated bug list for the latest snapshot.
+
+    Args:
+        label_filter/include_closed: View scope (as in get_bugs_list)
+        statuses/priorities/assignees: Lists of accepted values (None = any)
+        label: Additional label substring filter
+        query: Case-insensitive text match on key, summary, people and labels
+        sort: Sort key from read_model.SORT_KEYS
+        descending: Reverse the sort
+        cursor: Opaque cursor from a previous page (overrides sort/descending)
+        limit: Page size (None = all remaining rows)
+
+    Returns:
+        (bugs, next_cursor or None, total matching rows)
+
+    Raises:
+        ValueError: Unknown sort key or malformed cursor
+    """
+    cursor_values = None
+    if cursor:
+        sort, descending, cursor_values = read_model.decode_cursor(cursor)
+    if sort not in read_model.SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort}")
+
+    model = get_latest_model()
+    if model is None:
+        return [], None, 0
+
+    mask = model.bug_filter_mask(label_filter, include_closed)
+    mask &= model.values_mask(model.status_masks, statuses)
+    mask &= model.values_mask(model.priority_masks, priorities)
+    mask &= model.values_mask(model.assignee_masks, assignees)
+    if label:
+        mask &= model.label_mask(label)
+    if query:
+        mask = model.text_mask(query, mask)
+
+    if cursor_values is not None and model.size:
+        sample = model.sort_index(sort)[1][0]
+        if len(cursor_values) != len(sample) or any(type(a) is not type(b) for a, b in zip(cursor_values, sample)):
+            raise ValueError("Invalid cursor")
+
+    rows, last = model.page(mask, sort, descending, cursor_values, limit)
+    next_cursor = read_model.encode_cursor(sort, descending, last) if last else None
+    jira_base = get_jira_base()
+    return [model.bug_dict(i, jira_base) for i in rows], next_cursor, mask.bit_count()
+
+def get_bug_status_counts(label_filter=None, include_closed=False):
+    """{status: bug count} of a view (as in get_bugs_list) in the latest snapshot."""
+    model = get_latest_model()
+    if model is None:
+        return {}
+    mask = model.bug_filter_mask(label_filter, include_closed)
+    counts = {status: (bits & mask).bit_count() for status, bits in model.status_masks.items()}
+    return {status: n for status, n in counts.items() if n}
+
+def get_snapshot_diff(from_id=None, to_id=None, days=diff.DEFAULT_DIFF_DAYS, label_filter=None, bugs_only=True):
+    """
+    Categorized changes between two snapshots (see diff.diff_snapshots).
+
+    to_id defaults to the latest snapshot, from_id to the latest snapshot taken
+    at least `days` before it.
+
+    Raises:
+        LookupError: Unknown snapshot, or nothing earlier to compare with
+    """
+    conn = get_db_connection()
+    try:
+        if to_id is None:
+            latest = conn.execute(read_model.LATEST_SNAPSHOT_SQL).fetchone()
+            if not latest:
+                raise LookupError("No snapshots yet")
+            to_id = latest['snapshot_id']
+        if from_id is None:
+            from_id = diff.snapshot_before(conn, to_id, days)
+            if from_id is None:
+                raise LookupError("No earlier snapshot to compare with")
+
+        snapshots = {}
+        for snapshot_id in (from_id, to_id):
+            row = conn.execute("SELECT snapshot_id, timestamp FROM snapshots WHERE snapshot_id=?", (snapshot_id,)).fetchone()
+            if row is None:
+                raise LookupError(f"Snapshot {snapshot_id} not found")
+            snapshots[snapshot_id] = dict(row)
+
+        changes = diff.diff_snapshots(conn, from_id, to_id, label_filter, bugs_only, get_jira_base())
+    finally:
+        conn.close()
+
+    return {
+        "from": snapshots[from_id],
+        "to": snapshots[to_id],
+        "counts": {category: len(entries) for category, entries in changes.items()},
+        "changes": changes,
+    }
+
+def get_issue_timeline(key):
+    """Status/priority/assignee intervals of one issue across all snapshots, or None if unknown."""
+    conn = get_db_connection()
+    try:
+        timeline = issue_timeline(conn, key)
+    finally:
+        conn.close()
+    if timeline is not None:
+        jira_base = get_jira_base()
+        timeline["link"] = f"{jira_base}/browse/{key}" if jira_base else ""
+    return timeline
+
+def search(query, snapshot_id=None, statuses=None, label=None, limit=50, history=False):
+    """Ranked full-text matches with snippets (see search.search_issues)."""
+    conn = get_db_connection()
+    try:
+        if not init_db.has_search_index(conn):
+            raise SearchUnavailable("Search is unavailable: this SQLite build has no FTS5 full-text index")
+        return search_issues(conn, query, snapshot_id, statuses, label, limit, get_jira_base(), history)
+    finally:
+        conn.close()
+
+def get_duplicates(key=None, threshold=duplicates.DEFAULT_THRESHOLD, label_filter=None, include_closed=True):
+    """
+    Likely duplicate bugs of the latest snapshot, from the MinHash/LSH index.
+
+    With key: the bugs most similar to that issue. Otherwise: clusters of
+    likely duplicates, largest first.
+    """
+    conn = get_db_connection()
+    try:
+        model = get_latest_model(conn)
+        if model is None:
+            return []
+        mask = model.bug_filter_mask(label_filter, include_closed)
+        rows = {model.keys[i]: i for i in read_model.iter_bits(mask)}
+        jira_base = get_jira_base()
+        if key:
+            return [{**model.bug_dict(rows[other], jira_base), "similarity": round(score, 3)}
+                    for other, score in duplicates.find_similar(conn, key, threshold, rows)]
+        clusters = duplicates.find_clusters(conn, threshold, rows)
+    finally:
+        conn.close()
+    return [{"size": c["size"], "truncated": c["truncated"], "representative": c["representative"],
+             "issues": [model.bug_dict(rows[k], jira_base) for k in c["keys"]], "pairs": c["pairs"]}
+            for c in clusters]
+
+def get_forecast(label_filter=None, simulations=10000, history_weeks=12):
+    """
+    Monte Carlo P50/P85/P95 dates for zero open Critical/High bugs (see forecast.py).
+
+    Seeded with the latest snapshot id, so a snapshot always gets the same answer.
+
+    Raises:
+        LookupError: Fewer than two weekly snapshots
+        ValueError: simulations above forecast.MAX_SIMULATIONS
+    """
+    from forecast import forecast_convergence
+
+    conn = get_db_connection()
+    try:
+        latest = conn.execute(read_model.LATEST_SNAPSHOT_SQL).fetchone()
+        result = forecast_convergence(conn, simulations, history_weeks, label_filter,
+                                      seed=latest['snapshot_id'] if latest else None)
+    finally:
+        conn.close()
+    if result is None:
+        raise LookupError("Not enough weekly snapshots to forecast")
+    return result
+
+def get_analytics(dimension="all", quantiles=(0.5, 0.9)):
+    """
+    Bug age, time-to-resolution and time-in-status percentiles in days (see analytics.py).
+
+    Read from the sketches maintained at ingestion; time_in_status and status_age
+    are keyed "<dimension value>|<status>".
+    """
+    conn = get_db_connection()
+    try:
+        progress = conn.execute("SELECT snapshot_id FROM analytics_progress WHERE id=1").fetchone()
+        metrics = {metric: analytics.percentiles(conn, metric, dimension, quantiles)
+                   for metric in analytics.SNAPSHOT_METRICS + analytics.CUMULATIVE_METRICS}
+    finally:
+        conn.close()
+    return {"snapshot_id": progress['snapshot_id'] if progress else None, "dimension": dimension, **metrics}
+
+def _drilldown_snapshot(conn, snapshot_id):
+    if snapshot_id is None:
+        row = conn.execute(read_model.LATEST_SNAPSHOT_SQL).fetchone()
+    else:
+        row = conn.execute("SELECT snapshot_id, timestamp FROM snapshots WHERE snapshot_id=?", (snapshot_id,)).fetchone()
+    if row is None:
+        raise LookupError(f"Snapshot {snapshot_id} not found" if snapshot_id is not None else "No snapshots yet")
+    return row
+
+def get_drilldown(group_by=None, assignee=None, component=None, priority=None, label_filter=None, snapshot_id=None):
+    """
+    Open/total bugs of an assignee/component/priority slice, from the rollup cube (see rollup.py).
+
+    Raises:
+        LookupError: Unknown snapshot (or no snapshots yet)
+        ValueError: Invalid group_by, a filter on the group_by dimension, or a label without rollups
+    """
+    filters = {"assignee": assignee, "component": component, "priority": priority}
+    conn = get_db_connection()
+    try:
+        snapshot = _drilldown_snapshot(conn, snapshot_id)
+        rows = rollup.slice_counts(conn, snapshot['snapshot_id'], filters, group_by, label_filter or rollup.ALL)
+    finally:
+        conn.close()
+    return {
+        "snapshot_id": snapshot['snapshot_id'],
+        "timestamp": snapshot['timestamp'],
+        "filters": {dim: value for dim, value in filters.items() if value},
+        "label": label_filter,
+        "group_by": group_by,
+        "rows": rows,
+    }
+
+def get_drilldown_trend(assignee=None, component=None, priority=None, label_filter=None, limit=None):
+    """Open/total bugs of one slice for each snapshot, oldest first (see get_drilldown)."""
+    filters = {"assignee": assignee, "component": component, "priority": priority}
+    conn = get_db_connection()
+    try:
+        return rollup.trend(conn, filters, label_filter or rollup.ALL, limit)
+    finally:
+        conn.close()
+
+def get_dashboard(views=("main",), fields=DASHBOARD_FIELDS):
+    """
+    Compute several dashboard panels for one or more views in a single DB session.
+
+    Args:
+        views: Names from VIEWS (e.g. 'main', 'gate')
+        fields: Subset of DASHBOARD_FIELDS to include for each view
+
+    Returns:
+        {"snapshot": {...} | None, "views": {view: {field: data}}}
+    """
+    conn = get_db_connection()
+    try:
+        model = read_model.get_read_model(conn)
+        histories = {}
+        if "history" in fields:
+            histories = get_histories([VIEWS[v]["label_filter"] for v in views], conn)
+    finally:
+        conn.close()
+
+    jira_base = get_jira_base()
+    result = {}
+    for view in views:
+        label_filter = VIEWS[view]["label_filter"]
+        panels = {}
+        if "history" in fields:
+            panels["history"] = histories[label_filter]
+        if "breakdown" in fields:
+            panels["breakdown"] = model.breakdown(label_filter) if model else {"priority": [], "status": []}
+        if "bugs" in fields:
+            panels["bugs"] = model.bugs(label_filter, VIEWS[view]["include_closed"], jira_base) if model else []
+        result[view] = panels
+
+    snapshot = {"id": model.snapshot_id, "timestamp": model.timestamp} if model else None
+    return {"snapshot": snapshot, "views": result}
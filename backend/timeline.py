@@ -0,0 +1,68 @@
+"""
+One issue's history across snapshots.
+
+The issue's rows are read through the (key, snapshot_id) index, so the cost
+depends on how many snapshots it appears in, not on the size of the issues
+table. Consecutive snapshots with the same state are run-length compressed
+into intervals; a snapshot the issue is missing from (e.g. it left the JQL)
+ends the current interval.
+"""
+
+# Fields whose changes start a new interval
+TIMELINE_FIELDS = ("status", "priority", "assignee")
+
+# Snapshots numbered in time order, so gaps in an issue's history can be seen
+TIMELINE_SQL = '''
+    WITH ordered AS (
+        SELECT snapshot_id, timestamp, ROW_NUMBER() OVER (ORDER BY timestamp, snapshot_id) AS position
+        FROM snapshots
+    )
+    SELECT o.position, o.snapshot_id, o.timestamp, i.summary, i.status, i.priority, i.assignee
+    FROM issues i
+    JOIN ordered o ON o.snapshot_id = i.snapshot_id
+    WHERE i.key = ?
+    ORDER BY o.position
+'''
+
+
+def issue_timeline(conn, key):
+    """
+    Run-length compressed state intervals of an issue, oldest first.
+
+    Returns:
+        Dict with the latest summary, first/last snapshot seen and a list of
+        intervals ({start, end, start_snapshot, end_snapshot, snapshots,
+        status, priority, assignee}), or None if the issue is in no snapshot
+    """
+    intervals = []
+    current = None
+    previous_position = None
+    summary = None
+    count = 0
+    for position, snapshot_id, timestamp, summary, *state in conn.execute(TIMELINE_SQL, (key,)):
+        count += 1
+        state = dict(zip(TIMELINE_FIELDS, state))
+        if current is not None and position == previous_position + 1 and \
+                all(current[f] == state[f] for f in TIMELINE_FIELDS):
+            current["end"] = timestamp
+            current["end_snapshot"] = snapshot_id
+            current["snapshots"] += 1
+        else:
+            current = {
+                "start": timestamp, "end": timestamp,
+                "start_snapshot": snapshot_id, "end_snapshot": snapshot_id,
+                "snapshots": 1, **state,
+            }
+            intervals.append(current)
+        previous_position = position
+
+    if not intervals:
+        return None
+    return {
+        "key": key,
+        "summary": summary,
+        "first_seen": intervals[0]["start"],
+        "last_seen": intervals[-1]["end"],
+        "snapshots": count,
+        "intervals": intervals,
+    }
@@ -4,6 +4,9 @@ import datetime
 from datetime import timedelta
 from dotenv import load_dotenv
 from fetch_jira_data import fetch_issues
+import init_db
+import analytics
+import rollup
 
 DB_NAME = "dashboard.db"
 
@@ -131,6 +134,11 @@ def backfill():
         current_date += timedelta(weeks=1)
 
     conn.commit()
+    # Issue rows were replaced wholesale: re-index them for search, analytics and rollups
+    init_db.apply_schema(conn)
+    init_db.rebuild_search_index(conn)
+    analytics.rebuild(conn)
+    rollup.rebuild(conn)
     conn.close()
     print("Backfill complete.")
 
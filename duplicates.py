@@ -0,0 +1,283 @@
+"""
+Near-duplicate issue detection with MinHash signatures and an LSH index.
+
+Each issue's summary and description are reduced to character shingles and a
+MinHash signature of NUM_PERM values; the fraction of equal values between two
+signatures estimates the Jaccard similarity of their shingle sets. Signatures
+are split into BANDS bands, and every band is hashed into a bucket of
+issue_lsh_buckets, so likely duplicates are found by looking up the issues
+sharing a bucket instead of comparing every pair.
+
+Signatures are built during ingestion (save_snapshot) and only recomputed for
+issues whose text changed. Clusters are grouped around a representative issue
+that every member is similar to, so templated reports don't chain into one
+giant cluster. Run `python duplicates.py` to list clusters.
+"""
+import re
+import zlib
+import operator
+import random
+import sqlite3
+import hashlib
+import argparse
+from array import array
+
+import numpy as np
+
+DB_NAME = "dashboard.db"
+
+NUM_PERM = 128
+BANDS = 32  # 4 rows per band: pairs above ~0.45 similarity usually share a bucket
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+# Long descriptions (logs, stack traces) add cost but little signal
+MAX_TEXT_CHARS = 2000
+DEFAULT_THRESHOLD = 0.6
+# Clusters beyond this size are cut to the members most similar to their
+# representative (a large cluster usually means a shared report template)
+MAX_CLUSTER_SIZE = 20
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: stored signatures must stay comparable across runs
+_rng = random.Random(20240607)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# The permutations as uint64 columns; a is split at bit 32 so every product fits 64 bits
+_P = np.uint64(_PRIME)
+_A_HI = np.array([a >> 32 for a, _ in _PERMUTATIONS], dtype=np.uint64)[:, None]
+_A_LO = np.array([a & 0xFFFFFFFF for a, _ in _PERMUTATIONS], dtype=np.uint64)[:, None]
+_B = np.array([b for _, b in _PERMUTATIONS], dtype=np.uint64)[:, None]
+
+_MARKUP_RE = re.compile(r"\{code[^}]*\}.*?\{code\}|\{noformat\}.*?\{noformat\}|https?://\S+", re.S)
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def issue_text(summary, description):
+    return f"{summary or ''} {description or ''}"
+
+
+def normalize(text):
+    """Lowercase words only: code blocks, URLs and punctuation removed."""
+    text = _MARKUP_RE.sub(" ", text or "")[:MAX_TEXT_CHARS].lower()
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def shingles(text):
+    text = normalize(text)
+    if len(text) < SHINGLE_SIZE:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _mod_prime(x):
+    """x mod 2^61 - 1 for uint64 x (Mersenne reduction)."""
+    x = (x & _P) + (x >> np.uint64(61))
+    return np.where(x >= _P, x - _P, x)
+
+
+def signature(text):
+    """
+    MinHash signature (list of NUM_PERM ints), or None for empty text.
+
+    min over shingles of (a * h + b) mod 2^61 - 1 for every permutation, computed
+    for all permutations and shingles at once with exact 64-bit arithmetic:
+    a * h = a_hi * h * 2^32 + a_lo * h, and x * 2^32 is rotated modulo 2^61 - 1.
+    """
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    h = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+    low = _mod_prime(_A_LO * h)
+    high = _A_HI * h  # < 2^61
+    high = (high >> np.uint64(29)) + ((high & np.uint64((1 << 29) - 1)) << np.uint64(32))
+    values = _mod_prime(low + _mod_prime(high) + _B)
+    return values.min(axis=1).tolist()
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(operator.eq, sig_a, sig_b)) / NUM_PERM
+
+
+def band_buckets(sig):
+    """One bucket id per band (signed 64-bit, so it fits an SQLite INTEGER)."""
+    buckets = []
+    for band in range(BANDS):
+        rows = array('Q', sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big", signed=True))
+    return buckets
+
+
+def _pack(sig):
+    return array('Q', sig).tobytes()
+
+
+def _unpack(blob):
+    return array('Q', blob).tolist()
+
+
+# --- Index maintenance ---
+
+def prepare_signatures(conn, texts):
+    """
+    Signatures of the issues whose text changed since they were last indexed.
+
+    Only reads from the database, so the hashing can run before the caller's
+    write transaction starts.
+
+    Args:
+        texts: Iterable of (issue key, summary + description text)
+
+    Returns:
+        [(key, content hash, signature or None)] for store_signatures()
+    """
+    try:
+        known = dict(conn.execute("SELECT key, content_hash FROM issue_signatures").fetchall())
+    except sqlite3.OperationalError:
+        # Database created before duplicate detection existed
+        return []
+    updates = []
+    for key, text in texts:
+        content_hash = hashlib.sha1(normalize(text).encode()).hexdigest()
+        if known.get(key) != content_hash:
+            updates.append((key, content_hash, signature(text)))
+    return updates
+
+
+def store_signatures(conn, updates):
+    """Write prepared signatures and their LSH buckets (part of the caller's transaction)."""
+    for key, content_hash, sig in updates:
+        conn.execute("DELETE FROM issue_lsh_buckets WHERE key=?", (key,))
+        conn.execute('''
+            INSERT OR REPLACE INTO issue_signatures (key, content_hash, signature, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ''', (key, content_hash, _pack(sig) if sig else None))
+        if sig:
+            conn.executemany("INSERT OR IGNORE INTO issue_lsh_buckets (band, bucket, key) VALUES (?, ?, ?)",
+                             [(band, bucket, key) for band, bucket in enumerate(band_buckets(sig))])
+
+
+# --- Queries ---
+
+def _signatures(conn, keys):
+    sigs = {}
+    keys = list(keys)
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows = conn.execute(
+            f"SELECT key, signature FROM issue_signatures WHERE signature IS NOT NULL AND key IN ({', '.join('?' for _ in chunk)})",
+            chunk).fetchall()
+        sigs.update((key, _unpack(blob)) for key, blob in rows)
+    return sigs
+
+
+def find_similar(conn, key, threshold=DEFAULT_THRESHOLD, keys=None):
+    """[(other key, similarity)] for issues likely to duplicate `key`, most similar first."""
+    candidates = {row[0] for row in conn.execute('''
+        SELECT DISTINCT other.key FROM issue_lsh_buckets mine
+        JOIN issue_lsh_buckets other ON other.band = mine.band AND other.bucket = mine.bucket
+        WHERE mine.key = ? AND other.key != ?
+    ''', (key, key))}
+    if keys is not None:
+        candidates &= set(keys)
+    sigs = _signatures(conn, candidates | {key})
+    if key not in sigs:
+        return []
+    matches = [(other, similarity(sigs[key], sigs[other])) for other in candidates if other in sigs]
+    return sorted([m for m in matches if m[1] >= threshold], key=lambda m: (-m[1], m[0]))
+
+
+def find_clusters(conn, threshold=DEFAULT_THRESHOLD, keys=None, max_size=MAX_CLUSTER_SIZE):
+    """
+    Groups of likely duplicates around a representative issue.
+
+    Candidate pairs come from shared LSH buckets and are confirmed against the
+    signatures. The issue with the most confirmed matches becomes a
+    representative and takes its still unclustered matches, and so on; every
+    member is at or above threshold against the representative (no chaining).
+    keys optionally restricts the search (e.g. to the latest snapshot).
+
+    Returns:
+        [{"representative", "keys": [...], "pairs": [[representative, key, similarity], ...],
+          "size", "truncated"}], largest clusters first; clusters above max_size keep the
+        members most similar to the representative ("size" is the full count)
+    """
+    allowed = set(keys) if keys is not None else None
+    pairs = set()
+    for (members,) in conn.execute('''
+        SELECT group_concat(key, ' ') FROM issue_lsh_buckets
+        GROUP BY band, bucket HAVING COUNT(*) > 1
+    '''):
+        members = sorted(k for k in members.split(" ") if allowed is None or k in allowed)
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b))
+
+    sigs = _signatures(conn, {k for pair in pairs for k in pair})
+    matches = {}
+    for a, b in pairs:
+        if a in sigs and b in sigs:
+            score = similarity(sigs[a], sigs[b])
+            if score >= threshold:
+                matches.setdefault(a, {})[b] = score
+                matches.setdefault(b, {})[a] = score
+
+    clustered = set()
+    result = []
+    for representative in sorted(matches, key=lambda k: (-len(matches[k]), k)):
+        if representative in clustered:
+            continue
+        members = sorted(((score, other) for other, score in matches[representative].items() if other not in clustered),
+                         key=lambda m: (-m[0], m[1]))
+        if not members:
+            continue
+        clustered.add(representative)
+        clustered.update(other for _, other in members)
+        kept = members[:max_size - 1]
+        result.append({
+            "representative": representative,
+            "keys": [representative] + sorted(other for _, other in kept),
+            "pairs": [[representative, other, round(score, 3)] for score, other in kept],
+            "size": len(members) + 1,
+            "truncated": len(members) > len(kept),
+        })
+    result.sort(key=lambda c: (-c["size"], c["representative"]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List likely duplicate issues of the latest snapshot.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum estimated similarity (0-1)")
+    parser.add_argument("--key", help="Only show likely duplicates of this issue")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_NAME)
+    latest = conn.execute("SELECT snapshot_id FROM snapshots ORDER BY timestamp DESC, snapshot_id DESC LIMIT 1").fetchone()
+    if not latest:
+        print("No snapshots found.")
+        return
+    summaries = dict(conn.execute("SELECT key, summary FROM issues WHERE snapshot_id=?", latest).fetchall())
+
+    if args.key:
+        matches = find_similar(conn, args.key, args.threshold, summaries)
+        print(f"{args.key}: {summaries.get(args.key, '')}")
+        for other, score in matches:
+            print(f"  {score:.2f}  {other}: {summaries.get(other, '')}")
+        if not matches:
+            print("  No likely duplicates.")
+        return
+
+    clusters = find_clusters(conn, args.threshold, summaries)
+    print(f"{len(clusters)} clusters of likely duplicates (threshold {args.threshold})")
+    for cluster in clusters:
+        print("")
+        if cluster["truncated"]:
+            print(f"  ({cluster['size']} issues, showing the {len(cluster['keys'])} closest; likely a shared template)")
+        for key in cluster["keys"]:
+            print(f"  {key}: {summaries.get(key, '')}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import os
 import json
 import base64
+import time
 import datetime
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from adaptive_limiter import get_limiter
 
 def get_jira_headers(email, match_string, auth_type="basic"):
     if auth_type.lower() == "bearer":
@@ -22,10 +26,81 @@ def get_jira_headers(email, match_string, auth_type="basic"):
         "Accept": "application/json"
     }
 
-def fetch_issues(jira_url, jql, email, api_token, max_results=1000):
+# Fields requested for every issue
+ISSUE_FIELDS = ["summary", "status", "assignee", "created", "priority", "description", "resolutiondate", "issuetype", "reporter", "updated", "labels", "components", "comment"]
+
+# Attempts per page when Jira answers 429 / times out
+PAGE_ATTEMPTS = 5
+
+class JiraQueryError(Exception):
+    """Jira rejected a search (e.g. a JQL error); status_code is the HTTP status."""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"{status_code} - {message}")
+        self.status_code = status_code
+
+def jira_limiter():
+    """Adaptive in-flight limit shared by every Jira search request (see adaptive_limiter.py)."""
+    return get_limiter("jira", initial=4, max_limit=8)
+
+def limited_get(session, url, headers, params, limiter):
+    """One search request under the Jira limiter; a 429 backs it off (honouring Retry-After)."""
+    with limiter.track() as call:
+        response = session.get(url, headers=headers, params=params, timeout=60)
+        if response.status_code == 429:
+            call.overloaded(response.headers.get("Retry-After"))
+    return response
+
+def fetch_page(session, url, headers, jql, start_at, page_size, limiter, validate_query=None):
+    """
+    Fetch one page of search results through the shared Jira limiter.
+
+    Returns:
+        The decoded response, or None on a non-retryable error
+    """
+    params = {
+        "jql": jql,
+        "startAt": start_at,
+        "maxResults": page_size,
+        "fields": ISSUE_FIELDS
+    }
+    if validate_query:
+        params["validateQuery"] = validate_query
+    for attempt in range(PAGE_ATTEMPTS):
+        try:
+            response = limited_get(session, url, headers, params, limiter)
+        except requests.Timeout:
+            print(f"Timeout fetching issues at {start_at} (attempt {attempt + 1})")
+            continue
+        if response.status_code == 429:
+            # With Retry-After the limiter already holds back new requests
+            if not response.headers.get("Retry-After"):
+                time.sleep(2 ** attempt)
+            continue
+        if response.status_code != 200:
+            print(f"Error fetching data: {response.status_code} - {response.text}")
+            return None
+        return response.json()
+    print(f"Giving up on issues at {start_at} after {PAGE_ATTEMPTS} attempts")
+    return None
+
+def fetch_issues(jira_url, jql, email, api_token, max_results=1000, progress_callback=None,
+                 validate_query=None, raise_errors=False):
+    """
+    Fetch all issues matching jql (paged, up to max_results).
+
+    After the first page, the remaining pages are requested concurrently
+    under the adaptive "jira" limit (see adaptive_limiter.py).
+
+    progress_callback: Optional function(fetched, total) called after each page.
+    validate_query: Jira's validateQuery ("warn" turns unknown issue keys into warnings)
+    raise_errors: Raise JiraQueryError when Jira rejects the query instead of returning []
+    """
     url = f"{jira_url}/rest/api/2/search" # Use api/2 for broader compatibility (Server/DC)
-    issues = []
-    start_at = 0
+    limiter = jira_limiter()
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_maxsize=limiter.max_limit))
+    session.mount("http://", HTTPAdapter(pool_maxsize=limiter.max_limit))
     
     print(f"Fetching issues with JQL: {jql}")
     print(f"Request URL: {url}")
@@ -35,46 +110,76 @@ def fetch_issues(jira_url, jql, email, api_token, max_results=1000):
     
     # Test connection and auth type
     test_params = {"jql": jql, "maxResults": 1}
-    response = requests.get(url, headers=headers, params=test_params)
+    if validate_query:
+        test_params["validateQuery"] = validate_query
+    response = limited_get(session, url, headers, test_params, limiter)
     
     if response.status_code == 401:
         print("Basic Auth failed (401). Trying Bearer Auth (PAT) for Data Center...")
         headers = get_jira_headers(email, api_token, "bearer")
-        response = requests.get(url, headers=headers, params=test_params)
+        response = limited_get(session, url, headers, test_params, limiter)
     
     if response.status_code != 200:
         print(f"Error fetching data: {response.status_code} - {response.text}")
+        if raise_errors:
+            raise JiraQueryError(response.status_code, response.text)
         return []
 
     print("Authentication successful.")
 
-    while True:
-        params = {
-            "jql": jql,
-            "startAt": start_at,
-            "maxResults": 100,
-            "fields": ["summary", "status", "assignee", "created", "priority", "description", "resolutiondate", "issuetype", "reporter", "updated", "labels", "comment"]
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code != 200:
-            print(f"Error fetching data: {response.status_code} - {response.text}")
-            break
-            
-        data = response.json()
-        batch = data.get("issues", [])
+    # The first page tells us the total and the page size Jira actually allows
+    data = fetch_page(session, url, headers, jql, 0, 100, limiter, validate_query)
+    issues = data.get("issues", []) if data else []
+    if not issues:
+        return []
+    total = min(data.get("total", 0), max_results)
+    page_size = len(issues)
+    print(f"Fetched {len(issues)} issues (Total: {len(issues)})")
+    if progress_callback:
+        progress_callback(len(issues), total)
+
+    offsets = list(range(page_size, total, page_size))
+    pages = {}
+    fetched = len(issues)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=limiter.max_limit, thread_name_prefix="jira-page") as executor:
+            futures = {executor.submit(fetch_page, session, url, headers, jql, start_at, page_size, limiter, validate_query): start_at
+                       for start_at in offsets}
+            for future in as_completed(futures):
+                page = future.result()
+                batch = page.get("issues", []) if page else []
+                pages[futures[future]] = batch
+                fetched += len(batch)
+                print(f"Fetched {len(batch)} issues (Total: {fetched})")
+                if progress_callback:
+                    progress_callback(min(fetched, total), total)
+
+    # Keep Jira's order; stop at the first missing page like the sequential fetch did
+    for start_at in offsets:
+        batch = pages.get(start_at)
         if not batch:
             break
-            
         issues.extend(batch)
-        print(f"Fetched {len(batch)} issues (Total: {len(issues)})")
-        
-        start_at += len(batch)
-        if start_at >= data.get("total", 0) or len(issues) >= max_results:
-            break
             
-    return issues
+    return issues[:max_results]
+
+def count_issues(jira_url, jql, email, api_token):
+    """Number of issues matching jql (one request, no issues transferred), or None on error."""
+    url = f"{jira_url}/rest/api/2/search"
+    params = {"jql": jql, "maxResults": 0}
+    limiter = jira_limiter()
+    session = requests.Session()
+    try:
+        response = limited_get(session, url, get_jira_headers(email, api_token, "basic"), params, limiter)
+        if response.status_code == 401:
+            response = limited_get(session, url, get_jira_headers(email, api_token, "bearer"), params, limiter)
+    except requests.RequestException as e:
+        print(f"Error counting issues: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"Error counting issues: {response.status_code} - {response.text}")
+        return None
+    return response.json().get("total")
 
 def save_to_json(data, filename):
     with open(filename, 'w', encoding='utf-8') as f:
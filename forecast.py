@@ -0,0 +1,199 @@
+"""
+Monte Carlo forecast of when open Critical/High bugs reach zero.
+
+Weekly arrivals and fixes per priority tier are measured between snapshots
+about a week apart: a bug "arrives" in a tier when it is open in that tier now
+but was not a week earlier (new, escalated or reopened) and is "fixed" when the
+opposite happens. Each simulation replays randomly drawn historical weeks
+(arrivals and fixes of the same week together, and the same week for every
+tier) from today's open counts; the week the running total first reaches zero
+is its convergence week. All simulations run at once as NumPy arrays.
+"""
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+
+DB_NAME = "dashboard.db"
+
+CLOSED_STATUSES = ('Closed', 'Done', 'Resolved')
+
+# Forecast tiers: name -> priorities
+TIERS = {
+    "Critical": ('Critical', 'Blocker'),
+    "High": ('High',),
+}
+COMBINED_TIER = "Critical+High"
+
+PERCENTILES = (50, 85, 95)
+DEFAULT_SIMULATIONS = 10000
+# Upper bound on simulations per request: the paths array is simulations x HORIZON_WEEKS
+MAX_SIMULATIONS = 20000
+DEFAULT_HISTORY_WEEKS = 12
+# Simulations that have not converged by then count as "not within horizon"
+HORIZON_WEEKS = 104
+# Weeks of projected open counts returned for burndown charts
+BURNDOWN_WEEKS = 8
+# Snapshots closer together than this are not treated as separate weeks
+MIN_SNAPSHOT_GAP_DAYS = 6
+
+
+def _parse_timestamp(value):
+    return datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S") if len(value) > 10 else datetime.strptime(value, "%Y-%m-%d")
+
+
+def weekly_snapshots(conn, history_weeks=DEFAULT_HISTORY_WEEKS):
+    """[(snapshot_id, datetime)] about a week apart, oldest first, ending with the latest snapshot."""
+    rows = conn.execute("SELECT snapshot_id, timestamp FROM snapshots ORDER BY timestamp DESC, snapshot_id DESC").fetchall()
+    chosen = []
+    for snapshot_id, timestamp in rows:
+        taken = _parse_timestamp(timestamp)
+        if not chosen or (chosen[-1][1] - taken).total_seconds() >= MIN_SNAPSHOT_GAP_DAYS * 86400:
+            chosen.append((snapshot_id, taken))
+            if len(chosen) > history_weeks:
+                break
+    return chosen[::-1]
+
+
+def _open_tiers(conn, snapshot_id, label_filter=None):
+    """{issue key: tier} of the unresolved bugs in a forecast tier."""
+    tier_of = {p: tier for tier, priorities in TIERS.items() for p in priorities}
+    sql = f'''
+        SELECT key, priority FROM issues
+        WHERE snapshot_id=? AND type='Bug'
+          AND status NOT IN ({', '.join('?' for _ in CLOSED_STATUSES)})
+          AND priority IN ({', '.join('?' for _ in tier_of)})
+    '''
+    params = [snapshot_id, *CLOSED_STATUSES, *tier_of]
+    if label_filter:
+        sql += " AND labels LIKE ?"
+        params.append(f"%{label_filter}%")
+    return {key: tier_of[priority] for key, priority in conn.execute(sql, params)}
+
+
+def weekly_flows(conn, history_weeks=DEFAULT_HISTORY_WEEKS, label_filter=None):
+    """
+    Per-week arrivals and fixes per tier, scaled to 7 days when snapshots are further apart.
+
+    Returns:
+        (weekly snapshots, {tier: open count now}, {tier: arrivals array}, {tier: fixes array})
+    """
+    snapshots = weekly_snapshots(conn, history_weeks)
+    states = [_open_tiers(conn, snapshot_id, label_filter) for snapshot_id, _ in snapshots]
+    arrivals = {tier: [] for tier in TIERS}
+    fixes = {tier: [] for tier in TIERS}
+    for i in range(1, len(snapshots)):
+        before, after = states[i - 1], states[i]
+        scale = 7.0 / max(1.0, (snapshots[i][1] - snapshots[i - 1][1]).total_seconds() / 86400)
+        for tier in TIERS:
+            arrivals[tier].append(scale * sum(1 for k, t in after.items() if t == tier and before.get(k) != tier))
+            fixes[tier].append(scale * sum(1 for k, t in before.items() if t == tier and after.get(k) != tier))
+    current = {tier: sum(1 for t in states[-1].values() if t == tier) for tier in TIERS} if states else {}
+    return (snapshots, current,
+            {tier: np.array(v, dtype=np.float32) for tier, v in arrivals.items()},
+            {tier: np.array(v, dtype=np.float32) for tier, v in fixes.items()})
+
+
+def simulate(open_now, net_by_week, week_draws):
+    """
+    Open counts of every simulation for each future week.
+
+    Args:
+        open_now: Open count today
+        net_by_week: Historical net change (arrivals - fixes) per week
+        week_draws: (simulations, weeks) array of historical week indices
+
+    Returns:
+        (simulations, weeks) array; values can go below zero after convergence
+    """
+    return np.float32(open_now) + np.cumsum(net_by_week[week_draws], axis=1, dtype=np.float32)
+
+
+def convergence_weeks(paths, open_now):
+    """Week each simulation first reaches zero open (0 if already there, inf if never)."""
+    if open_now <= 0:
+        return np.zeros(paths.shape[0])
+    reached = paths <= 0
+    weeks = np.argmax(reached, axis=1).astype(float) + 1
+    weeks[~reached.any(axis=1)] = np.inf
+    return weeks
+
+
+def forecast_convergence(conn, simulations=DEFAULT_SIMULATIONS, history_weeks=DEFAULT_HISTORY_WEEKS,
+                         label_filter=None, seed=None):
+    """
+    P50/P85/P95 dates for zero open bugs per tier (Critical, High, and both together).
+
+    Returns:
+        Dict with the inputs used, per-tier percentiles ({"weeks", "date"}, both None
+        beyond the horizon) and the Critical+High burndown percentiles, or None when
+        there are fewer than two weekly snapshots
+    """
+    if not 0 < simulations <= MAX_SIMULATIONS:
+        raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    snapshots, current, arrivals, fixes = weekly_flows(conn, history_weeks, label_filter)
+    if len(snapshots) < 2:
+        return None
+
+    as_of = snapshots[-1][1]
+    history = len(snapshots) - 1
+    rng = np.random.default_rng(seed)
+    # The same drawn week for every tier keeps their correlation (e.g. escalations)
+    # A week index fits in 16 bits and float32 paths are plenty for bug counts:
+    # at MAX_SIMULATIONS this keeps the arrays at a few MB per tier
+    week_draws = rng.integers(0, history, size=(simulations, HORIZON_WEEKS), dtype=np.int16)
+
+    nets = {tier: arrivals[tier] - fixes[tier] for tier in TIERS}
+    nets[COMBINED_TIER] = sum(nets[tier] for tier in TIERS)
+    open_counts = {**current, COMBINED_TIER: sum(current.values())}
+    weekly_arrivals = {**arrivals, COMBINED_TIER: sum(arrivals.values())}
+    weekly_fixes = {**fixes, COMBINED_TIER: sum(fixes.values())}
+
+    tiers = {}
+    burndown = None
+    for tier, net in nets.items():
+        paths = simulate(open_counts[tier], net, week_draws)
+        weeks = convergence_weeks(paths, open_counts[tier])
+        result = {
+            "open": open_counts[tier],
+            "weekly_arrivals": round(float(weekly_arrivals[tier].mean()), 2),
+            "weekly_fixes": round(float(weekly_fixes[tier].mean()), 2),
+            "probability_within_horizon": round(float(np.isfinite(weeks).mean()), 3),
+        }
+        for pct in PERCENTILES:
+            # An actual simulated week (interpolating next to "never" would give NaN)
+            value = float(np.percentile(weeks, pct, method="inverted_cdf"))
+            if np.isfinite(value):
+                result[f"p{pct}"] = {"weeks": int(value),
+                                     "date": (as_of + timedelta(weeks=value)).strftime("%Y-%m-%d")}
+            else:
+                result[f"p{pct}"] = {"weeks": None, "date": None}
+        tiers[tier] = result
+
+        if tier == COMBINED_TIER:
+            projected = np.maximum(paths[:, :BURNDOWN_WEEKS], 0)
+            burndown = {"weeks": list(range(BURNDOWN_WEEKS + 1))}
+            for pct in PERCENTILES:
+                burndown[f"p{pct}"] = [open_counts[tier]] + [int(round(v)) for v in np.percentile(projected, pct, axis=0)]
+
+    return {
+        "as_of": as_of.strftime("%Y-%m-%d"),
+        "history_weeks": history,
+        "simulations": simulations,
+        "horizon_weeks": HORIZON_WEEKS,
+        "tiers": tiers,
+        "burndown": burndown,
+    }
+
+
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_NAME)
+    result = forecast_convergence(conn)
+    conn.close()
+    if result is None:
+        print("Not enough weekly snapshots to forecast.")
+    else:
+        print(f"Forecast as of {result['as_of']} ({result['history_weeks']} weeks of history, {result['simulations']} simulations)")
+        for tier, data in result["tiers"].items():
+            dates = ", ".join(f"P{p} {data[f'p{p}']['date'] or 'beyond horizon'}" for p in PERCENTILES)
+            print(f"  {tier:<14} open {data['open']:>4}  zero by: {dates}")
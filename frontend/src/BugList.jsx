@@ -1,4 +1,4 @@
-import React, { useEffect, useState, useMemo } from 'react';
+import React, { useEffect, useState, useRef, useCallback } from 'react';
 import axios from 'axios';
 import { ArrowLeft, ArrowUpDown, ArrowUp, ArrowDown, Search, Download } from 'lucide-react';
 
@@ -9,6 +9,7 @@ import { ArrowLeft, ArrowUpDown, ArrowUp, ArrowDown, Search, Download } from 'lu
   // Calculate Status Counts for Summary
 import { Link } from 'react-router-dom';
 import './Dashboard.css';
+import { subscribeSnapshotChanges } from './events';
 
 const API_BASE = '/api';
 
@@ -40,82 +41,99 @@ const STATUS_ORDER = {
   'Done': 8
 };
 
+// Rows per request; further pages are loaded through the X-Next-Cursor header
+const PAGE_SIZE = 100;
+// Export walks every page at the server's maximum page size
+const EXPORT_PAGE_SIZE = 1000;
+// Columns the server can sort by (read_model.SORT_KEYS)
+const SORTABLE = ['key', 'priority', 'status', 'assignee', 'created', 'updated'];
+
 export default function BugList({ isGate = false }) {
   const [bugs, setBugs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(0);
+  const [statusCounts, setStatusCounts] = useState({});
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [sortConfig, setSortConfig] = useState({ key: 'priority', direction: 'ascending' });
   const [searchQuery, setSearchQuery] = useState('');
+  const [query, setQuery] = useState('');
+  // Responses of superseded requests (older sort/search) are ignored
+  const requestId = useRef(0);
+
+  const endpoint = isGate ? `${API_BASE}/gate/bugs` : `${API_BASE}/bugs`;
+  // The Gate list covers all statuses
+  const viewParams = isGate ? { include_closed: true } : {};
+
+  // Search runs on the server once typing pauses
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(searchQuery.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
+
+  const fetchPage = useCallback((cursor, limit = PAGE_SIZE, q = query) => axios.get(endpoint, {
+    params: {
+      ...viewParams,
+      q: q || undefined,
+      limit,
+      // A cursor carries its own sort
+      ...(cursor ? { cursor } : { sort: sortConfig.key, order: sortConfig.direction === 'ascending' ? 'asc' : 'desc' }),
+    },
+  }), [endpoint, isGate, query, sortConfig]);
 
   useEffect(() => {
-    const endpoint = isGate ? `${API_BASE}/gate/bugs` : `${API_BASE}/bugs`;
-    axios.get(endpoint)
+    const loadFirstPage = () => {
+      const id = ++requestId.current;
+      return fetchPage(null)
+        .then(res => {
+          if (id !== requestId.current) return;
+          setBugs(res.data);
+          setNextCursor(res.headers['x-next-cursor'] || null);
+          setTotal(Number(res.headers['x-total-count'] || res.data.length));
+          setStatusCounts(JSON.parse(res.headers['x-status-counts'] || '{}'));
+          setLoading(false);
+        })
+        .catch(err => {
+          console.error(err);
+          setLoading(false);
+        });
+    };
+    loadFirstPage();
+    // Re-query only when a new snapshot is announced
+    return subscribeSnapshotChanges(() => loadFirstPage());
+  }, [fetchPage]);
+
+  const loadMore = () => {
+    if (!nextCursor || loadingMore) return;
+    const id = requestId.current;
+    setLoadingMore(true);
+    fetchPage(nextCursor)
       .then(res => {
-        setBugs(res.data);
-        setLoading(false);
+        if (id !== requestId.current) return;
+        setBugs(prev => [...prev, ...res.data]);
+        setNextCursor(res.headers['x-next-cursor'] || null);
       })
-      .catch(err => {
-        console.error(err);
-        setLoading(false);
-      });
-  }, [isGate]);
-
-  const filteredBugs = useMemo(() => {
-    if (!searchQuery) return bugs;
-    const lowerQuery = searchQuery.toLowerCase();
-    return bugs.filter(bug => 
-      bug.key.toLowerCase().includes(lowerQuery) ||
-      bug.summary.toLowerCase().includes(lowerQuery) ||
-      (bug.assignee && bug.assignee.toLowerCase().includes(lowerQuery)) ||
-      (bug.reporter && bug.reporter.toLowerCase().includes(lowerQuery)) ||
-      (bug.labels && bug.labels.toLowerCase().includes(lowerQuery))
-    );
-  }, [bugs, searchQuery]);
-
-  const sortedBugs = useMemo(() => {
-    let sortableItems = [...filteredBugs];
-    if (sortConfig.key !== null) {
-      sortableItems.sort((a, b) => {
-        let aValue = a[sortConfig.key];
-        let bValue = b[sortConfig.key];
-
-        // Handle nulls
-        if (aValue === null) aValue = '';
-        if (bValue === null) bValue = '';
-
-        // Custom sort for Priority
-        if (sortConfig.key === 'priority') {
-           aValue = PRIORITY_ORDER[aValue] || 99;
-           bValue = PRIORITY_ORDER[bValue] || 99;
-        } else if (sortConfig.key === 'status') {
-           aValue = STATUS_ORDER[aValue] || 99;
-           bValue = STATUS_ORDER[bValue] || 99;
-        }
-
-        if (aValue < bValue) {
-          return sortConfig.direction === 'ascending' ? -1 : 1;
-        }
-        if (aValue > bValue) {
-          return sortConfig.direction === 'ascending' ? 1 : -1;
-        }
-        return 0;
-      });
-    }
-    return sortableItems;
-  }, [filteredBugs, sortConfig]);
+      .catch(err => console.error(err))
+      .finally(() => setLoadingMore(false));
+  };
 
-  // Calculate Status Counts for Summary
-  const statusCounts = useMemo(() => {
-    const counts = {};
-    bugs.forEach(bug => {
-      counts[bug.status] = (counts[bug.status] || 0) + 1;
-    });
-    return counts;
-  }, [bugs]);
+  // Every bug of the view (ignoring the search box), page by page
+  const fetchAllBugs = async () => {
+    const all = [];
+    let cursor = null;
+    do {
+      const res = await fetchPage(cursor, EXPORT_PAGE_SIZE, '');
+      all.push(...res.data);
+      cursor = res.headers['x-next-cursor'] || null;
+    } while (cursor);
+    return all;
+  };
 
   // Export to Markdown
-  const handleExport = () => {
+  const handleExport = async () => {
     try {
         console.log("Export button clicked");
+        const bugs = await fetchAllBugs();
         const dateStr = new Date().toISOString().split('T')[0];
         let content = `# Gate Backlog Report - ${dateStr}\n\n`;
         content += `**Filter**: Label = \`OS_FCS\` (Includes all statuses)\n`;
@@ -190,6 +208,7 @@ export default function BugList({ isGate = false }) {
   };
 
   const requestSort = (key) => {
+    if (!SORTABLE.includes(key)) return;
     let direction = 'ascending';
     if (sortConfig.key === key && sortConfig.direction === 'ascending') {
       direction = 'descending';
@@ -198,6 +217,7 @@ export default function BugList({ isGate = false }) {
   };
 
   const SortIcon = ({ columnKey }) => {
+    if (!SORTABLE.includes(columnKey)) return null;
     if (sortConfig.key !== columnKey) return <ArrowUpDown size={14} style={{marginLeft: 4, opacity: 0.3}} />;
     if (sortConfig.direction === 'ascending') return <ArrowUp size={14} style={{marginLeft: 4, opacity: 1}} />;
     return <ArrowDown size={14} style={{marginLeft: 4, opacity: 1}} />;
@@ -212,7 +232,7 @@ export default function BugList({ isGate = false }) {
         fontSize: '12px', 
         color: '#6b7280', 
         textTransform: 'uppercase', 
-        cursor: 'pointer', 
+        cursor: SORTABLE.includes(columnKey) ? 'pointer' : 'default', 
         userSelect: 'none',
         width: width
       }}
@@ -242,7 +262,7 @@ export default function BugList({ isGate = false }) {
              </Link>
              {isGate ? "Gate Backlog Detail" : "Dev Backlog Detail"}
           </h1>
-          <p className="subtitle">Detailed list of {filteredBugs.length} issues {searchQuery && `(filtered from ${bugs.length})`}</p>
+          <p className="subtitle">Showing {bugs.length} of {total} issues {query && `matching "${query}"`}</p>
         </div>
         
         <div className="header-actions" style={{display: 'flex', flexWrap: 'wrap', alignItems: 'center', flexShrink: 0}}>
@@ -342,8 +362,8 @@ export default function BugList({ isGate = false }) {
             </tr>
           </thead>
           <tbody>
-            {sortedBugs.map((bug, i) => (
-              <tr key={bug.key} style={{borderBottom: i < sortedBugs.length - 1 ? '1px solid #f3f4f6' : 'none'}}>
+            {bugs.map((bug, i) => (
+              <tr key={bug.key} style={{borderBottom: i < bugs.length - 1 ? '1px solid #f3f4f6' : 'none'}}>
                 <td style={{padding: '16px 24px', fontWeight: '500', color: '#2563eb'}}>
                   {bug.link ? (
                     <a href={bug.link} target="_blank" rel="noopener noreferrer" style={{color: '#2563eb', textDecoration: 'none'}}>
@@ -392,6 +412,25 @@ export default function BugList({ isGate = false }) {
             ))}
           </tbody>
         </table>
+        {nextCursor && (
+          <div style={{display: 'flex', justifyContent: 'center', padding: '16px'}}>
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              style={{
+                padding: '8px 16px',
+                borderRadius: '8px',
+                border: '1px solid #e5e7eb',
+                background: 'white',
+                color: '#374151',
+                cursor: loadingMore ? 'default' : 'pointer',
+                fontSize: '14px'
+              }}
+            >
+              {loadingMore ? 'Loading...' : `Load more (${total - bugs.length} remaining)`}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -9,6 +9,8 @@ import {
 } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import './Dashboard.css';
+import { waitForJob } from './jobs';
+import { subscribeSnapshotChanges } from './events';
 
 const API_BASE = '/api';
 
@@ -48,16 +50,18 @@ export default function Dashboard() {
 
   useEffect(() => {
     fetchData();
+    // Re-query only when a new snapshot is announced
+    return subscribeSnapshotChanges(() => fetchData());
   }, []);
 
   const fetchData = async () => {
     try {
-      const [histRes, breakRes] = await Promise.all([
-        axios.get(`${API_BASE}/history`),
-        axios.get(`${API_BASE}/breakdown`)
-      ]);
-      setHistory(histRes.data);
-      setBreakdown(breakRes.data);
+      const res = await axios.get(`${API_BASE}/dashboard`, {
+        params: { views: 'main', fields: 'history,breakdown' }
+      });
+      const panels = res.data.views.main;
+      setHistory(panels.history);
+      setBreakdown(panels.breakdown);
       setLoading(false);
     } catch (err) {
       console.error(err);
@@ -68,7 +72,8 @@ export default function Dashboard() {
   const handleRefresh = async () => {
     setRefreshing(true);
     try {
-      await axios.post(`${API_BASE}/snapshot`);
+      const { data: job } = await axios.post(`${API_BASE}/snapshot`);
+      await waitForJob(job.job_id);
       await fetchData();
     } catch (err) {
       console.error(err);
@@ -81,19 +86,46 @@ export default function Dashboard() {
   const [reportProgress, setReportProgress] = useState({ current: 0, total: 0, status: '', issueKey: null });
   const [reportContent, setReportContent] = useState(null);
   const [reportFilename, setReportFilename] = useState(null);
+  const [liveSummary, setLiveSummary] = useState({ issueKey: null, text: '' });
+  const [partialReport, setPartialReport] = useState(null);
+
+  const downloadMarkdown = (content, filename) => {
+    // Create blob from content and trigger download directly
+    const blob = new Blob([content], { type: 'text/markdown' });
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    
+    // Cleanup
+    window.URL.revokeObjectURL(url);
+    document.body.removeChild(a);
+  };
 
   const handleGenerateReport = () => {
     setGeneratingReport(true);
     setReportProgress({ current: 0, total: 0, status: 'Connecting...', issueKey: null });
     setReportContent(null);
     setReportFilename(null);
+    setLiveSummary({ issueKey: null, text: '' });
+    setPartialReport(null);
 
-    const eventSource = new EventSource(`${API_BASE}/weekly-report/stream?provider=${llmProvider}`);
+    const eventSource = new EventSource(`${API_BASE}/weekly-report/stream?provider=${llmProvider}&stream_tokens=true`);
 
     eventSource.onmessage = (event) => {
       const data = JSON.parse(event.data);
       
-      if (data.type === 'progress') {
+      if (data.type === 'token') {
+        // Partial LLM output; several issues stream concurrently, show the latest one
+        setLiveSummary(prev => prev.issueKey === data.issue_key
+          ? { issueKey: prev.issueKey, text: prev.text + data.delta }
+          : { issueKey: data.issue_key, text: data.delta });
+      } else if (data.type === 'partial') {
+        // Higher-priority tiers are done; readable while the rest is summarized
+        setPartialReport({ tier: data.tier, content: data.content, filename: data.filename });
+      } else if (data.type === 'progress') {
         setReportProgress({
           current: data.current,
           total: data.total,
@@ -106,18 +138,7 @@ export default function Dashboard() {
         setReportFilename(data.filename);
         setReportProgress({ current: data.issue_count || 0, total: data.issue_count || 0, status: 'Complete! Downloading...', issueKey: null });
         
-        // Create blob from content and trigger download directly
-        const blob = new Blob([data.content], { type: 'text/markdown' });
-        const url = window.URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = data.filename || `weekly_report_${new Date().toISOString().split('T')[0]}.md`;
-        document.body.appendChild(a);
-        a.click();
-        
-        // Cleanup
-        window.URL.revokeObjectURL(url);
-        document.body.removeChild(a);
+        downloadMarkdown(data.content, data.filename || `weekly_report_${new Date().toISOString().split('T')[0]}.md`);
         
         setTimeout(() => setGeneratingReport(false), 1500);
       } else if (data.type === 'error') {
@@ -128,9 +149,12 @@ export default function Dashboard() {
     };
 
     eventSource.onerror = () => {
-      eventSource.close();
-      alert('Connection lost. Please try again.');
-      setGeneratingReport(false);
+      // The report keeps running as a server-side job; while the browser retries,
+      // EventSource resumes the same job from its Last-Event-ID
+      if (eventSource.readyState === EventSource.CLOSED) {
+        alert('Connection lost. Please try again.');
+        setGeneratingReport(false);
+      }
     };
   };
 
@@ -210,7 +234,25 @@ export default function Dashboard() {
               📋 {reportProgress.issueKey}
             </p>
           )}
+
+          {liveSummary.issueKey && (
+            <p style={{color: '#374151', fontSize: 13, margin: '0 0 16px', maxHeight: 96, overflow: 'hidden'}}>
+              <strong>{liveSummary.issueKey}:</strong> {liveSummary.text}
+            </p>
+          )}
           
+          {partialReport && (
+            <button
+              onClick={() => downloadMarkdown(partialReport.content, partialReport.filename)}
+              style={{
+                background: '#eff6ff', color: '#2563eb', border: '1px solid #bfdbfe', borderRadius: 8,
+                padding: '6px 12px', fontSize: 13, cursor: 'pointer', margin: '0 0 16px'
+              }}
+            >
+              Download partial report ({partialReport.tier} ready)
+            </button>
+          )}
+
           <div style={{
             background: '#e5e7eb', borderRadius: 8, height: 12, overflow: 'hidden', marginBottom: 12
           }}>
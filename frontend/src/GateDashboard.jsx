@@ -9,6 +9,8 @@ import {
 } from 'lucide-react';
 import { Link, useNavigate } from 'react-router-dom';
 import './Dashboard.css';
+import { waitForJob } from './jobs';
+import { subscribeSnapshotChanges } from './events';
 
 const API_BASE = '/api';
 
@@ -47,16 +49,18 @@ export default function GateDashboard() {
 
   useEffect(() => {
     fetchData();
+    // Re-query only when a new snapshot is announced
+    return subscribeSnapshotChanges(() => fetchData());
   }, []);
 
   const fetchData = async () => {
     try {
-      const [histRes, breakRes] = await Promise.all([
-        axios.get(`${API_BASE}/gate/history`),
-        axios.get(`${API_BASE}/gate/breakdown`)
-      ]);
-      setHistory(histRes.data);
-      setBreakdown(breakRes.data);
+      const res = await axios.get(`${API_BASE}/dashboard`, {
+        params: { views: 'gate', fields: 'history,breakdown' }
+      });
+      const panels = res.data.views.gate;
+      setHistory(panels.history);
+      setBreakdown(panels.breakdown);
       setLoading(false);
     } catch (err) {
       console.error(err);
@@ -67,7 +71,8 @@ export default function GateDashboard() {
   const handleRefresh = async () => {
     setRefreshing(true);
     try {
-      await axios.post(`${API_BASE}/snapshot`);
+      const { data: job } = await axios.post(`${API_BASE}/snapshot`);
+      await waitForJob(job.job_id);
       await fetchData();
     } catch (err) {
       console.error(err);
@@ -0,0 +1,38 @@
+const API_BASE = '/api';
+
+// One EventSource for /api/events, shared by every subscriber in the page
+let source = null;
+const listeners = new Set();
+
+function connect() {
+  source = new EventSource(`${API_BASE}/events`);
+  source.onmessage = (e) => {
+    const event = JSON.parse(e.data);
+    listeners.forEach(listener => listener(event));
+  };
+  // EventSource reconnects by itself; the 'hello' it gets then carries the current snapshot
+}
+
+// Receive dashboard events ('hello', 'snapshot', 'job'); returns an unsubscribe function.
+export function subscribeDashboardEvents(onEvent) {
+  listeners.add(onEvent);
+  if (!source) connect();
+  return () => {
+    listeners.delete(onEvent);
+    if (listeners.size === 0 && source) {
+      source.close();
+      source = null;
+    }
+  };
+}
+
+// Call onChange when a newer snapshot than the one already loaded becomes available,
+// including one saved while the stream was disconnected.
+export function subscribeSnapshotChanges(onChange) {
+  let snapshotId;
+  return subscribeDashboardEvents(event => {
+    if (event.type !== 'hello' && event.type !== 'snapshot') return;
+    if (snapshotId !== undefined && event.snapshot_id !== snapshotId) onChange(event);
+    snapshotId = event.snapshot_id;
+  });
+}
@@ -0,0 +1,42 @@
+import axios from 'axios';
+import { subscribeDashboardEvents } from './events';
+
+const API_BASE = '/api';
+
+// Re-check interval when no progress is shown: the job's 'job' event normally arrives first
+const FALLBACK_POLL_MS = 15000;
+
+// Wait for a background job to finish; resolves with the job, rejects if it failed.
+// With onProgress the job is polled every intervalMs, otherwise it is fetched when
+// /api/events announces that it finished.
+export async function waitForJob(jobId, { intervalMs = 2000, onProgress } = {}) {
+  const pollMs = onProgress ? intervalMs : Math.max(intervalMs, FALLBACK_POLL_MS);
+  let finished = false;
+  let wake = null;
+  const unsubscribe = subscribeDashboardEvents(event => {
+    if (event.type === 'job' && event.job_id === jobId) {
+      finished = true;
+      if (wake) wake();
+    }
+  });
+  try {
+    for (;;) {
+      const { data: job } = await axios.get(`${API_BASE}/jobs/${jobId}`);
+      if (onProgress) onProgress(job);
+      if (job.status === 'succeeded') return job;
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        throw new Error(job.error || `Job ${job.status}`);
+      }
+      if (!finished) {
+        await new Promise(resolve => {
+          wake = resolve;
+          setTimeout(resolve, pollMs);
+        });
+        wake = null;
+      }
+      finished = false;
+    }
+  } finally {
+    unsubscribe();
+  }
+}
@@ -1,6 +1,7 @@
 import sqlite3
 import os
 from datetime import datetime
+from forecast import forecast_convergence, COMBINED_TIER, PERCENTILES
 
 DB_NAME = "dashboard.db"
 OUTPUT_FILE = "dashboard_charts.md"
@@ -93,7 +94,7 @@ def generate_charts():
         f.write("Compares incoming bugs (New) vs resolved bugs (Fixed). Fixed > New is ideal.\n\n")
         f.write("```mermaid\n")
         f.write("xychart-beta\n")
-        f.write(f'    title "Daily Velocity"\n')
+        f.write(f'    title "Weekly Velocity"\n')
         f.write(f'    x-axis {to_mermaid_list(dates)}\n')
         f.write(f'    y-axis "Issues" 0 --> {max(max(new_counts), max(fixed_counts)) + 2}\n')
         f.write(f'    bar {to_mermaid_list(new_counts)}\n')
@@ -114,47 +115,36 @@ def generate_charts():
         f.write(f'    line {to_mermaid_list(high_only_counts)}\n')
         f.write("```\n\n")
 
-        # Chart 4: Convergence Prediction (Linear Forecast)
-        # Simple projection based on last 7 days velocity
-        avg_velocity = 0
-        if len(fixed_counts) >= 7:
-            recent_net = [new_counts[i] - fixed_counts[i] for i in range(-7, 0)]
-            avg_net_change = sum(recent_net) / 7
+        # Chart 4: Convergence Forecast (Monte Carlo over weekly arrival/fix history)
+        result = forecast_convergence(conn)
+        f.write("## 4. Convergence Forecast (Critical + High)\n")
+        if result is None:
+            f.write("> Not enough weekly snapshots to forecast yet.\n\n")
         else:
-            avg_net_change = (sum(new_counts) - sum(fixed_counts)) / len(new_counts) if new_counts else 0
-
-        current_open = open_counts[-1]
-        forecast_dates = [dates[-1]]
-        forecast_counts = [current_open]
-        
-        # Project 4 weeks into future
-        # Note: avg_net_change must be NEGATIVE to converge.
-        prediction_note = ""
-        if avg_net_change >= 0:
-            prediction_note = f"> ⚠️ **Warning:** Backlog is growing (Net: +{avg_net_change:.1f}/day). No convergence in sight."
-        else:
-            days_to_zero = abs(current_open / avg_net_change)
-            prediction_note = f"> 🟢 **Prediction:** At current velocity ({avg_net_change:.1f}/day), backlog will clear in ~{int(days_to_zero)} days."
-
-            # Generate forecast points
-            for i in range(1, 4):
-                 # Weekly steps
-                 future_val = current_open + (avg_net_change * 7 * i)
-                 if future_val < 0: future_val = 0
-                 forecast_counts.append(int(future_val))
-                 forecast_dates.append(f"+{i}W")
-
-        f.write("## 4. Convergence Forecast\n")
-        f.write(f"{prediction_note}\n\n")
-        
-        if avg_net_change < 0:
+            combined = result["tiers"][COMBINED_TIER]
+            f.write(f"Based on {result['history_weeks']} weeks of history ({result['simulations']} simulations). "
+                    f"Net change: {combined['weekly_arrivals'] - combined['weekly_fixes']:+.1f}/week "
+                    f"({combined['weekly_arrivals']:.1f} in, {combined['weekly_fixes']:.1f} out).\n\n")
+            if combined["p85"]["date"] is None:
+                f.write(f"> ⚠️ **Warning:** Only {combined['probability_within_horizon']:.0%} of simulations reach zero open Critical/High bugs within {result['horizon_weeks']} weeks.\n\n")
+            else:
+                f.write(f"> 🟢 **Prediction:** 85% of simulations reach zero open Critical/High bugs by {combined['p85']['date']}.\n\n")
+
+            f.write("| Tier | Open | P50 | P85 | P95 |\n|---|---|---|---|---|\n")
+            for tier, data in result["tiers"].items():
+                dates = " | ".join(data[f"p{p}"]["date"] or "beyond horizon" for p in PERCENTILES)
+                f.write(f"| {tier} | {data['open']} | {dates} |\n")
+            f.write("\n")
+
+            burndown = result["burndown"]
             f.write("```mermaid\n")
             f.write("xychart-beta\n")
-            f.write(f'    title "Burndown Forecast"\n')
-            f.write(f'    x-axis {to_mermaid_list(forecast_dates)}\n')
-            f.write(f'    y-axis "Open Bugs" 0 --> {max(forecast_counts)+10}\n')
-            f.write(f'    line {to_mermaid_list(forecast_counts)}\n')
-        f.write("```\n\n")
+            f.write(f'    title "Critical + High Burndown Forecast (P50 lower, P85 upper)"\n')
+            f.write(f'    x-axis {to_mermaid_list(["Now"] + [f"+{w}W" for w in burndown["weeks"][1:]])}\n')
+            f.write(f'    y-axis "Open Bugs" 0 --> {max(burndown["p85"]) + 5}\n')
+            f.write(f'    line {to_mermaid_list(burndown["p50"])}\n')
+            f.write(f'    line {to_mermaid_list(burndown["p85"])}\n')
+            f.write("```\n\n")
 
         # Chart 5: Priority Breakdown
         cursor.execute("SELECT priority, COUNT(*) FROM issues WHERE snapshot_id=? AND status NOT IN ('Closed', 'Done', 'Resolved') AND type='Bug' GROUP BY priority", (snapshots[-1][0],))
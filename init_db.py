@@ -3,14 +3,8 @@ import os
 
 DB_NAME = "dashboard.db"
 
-def init_db():
-    if os.path.exists(DB_NAME):
-        print(f"Database {DB_NAME} already exists.")
-        # Optional: could check for schema migration here
-    else:
-        print(f"Creating new database: {DB_NAME}")
-
-    conn = sqlite3.connect(DB_NAME)
+def apply_schema(conn):
+    """Create all tables and indexes (idempotent, safe on existing databases)."""
     cursor = conn.cursor()
 
     # Table: Snapshots
@@ -49,7 +43,258 @@ def init_db():
         )
     ''')
 
+    # Table: Jobs
+    # Background work (snapshots, reports) queued by the API
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            dedupe_key TEXT,
+            params TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress INTEGER DEFAULT 0,
+            total INTEGER DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            error TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            started_at DATETIME,
+            finished_at DATETIME,
+            heartbeat_at DATETIME
+        )
+    ''')
+
+    # Table: LLM summary cache
+    # Summaries keyed by issue, provider, model, prompt version and comment-thread hash
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS llm_summary_cache (
+            cache_key TEXT PRIMARY KEY,
+            issue_key TEXT,
+            provider TEXT,
+            model TEXT,
+            prompt_version TEXT,
+            comments_hash TEXT,
+            summary TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Table: Rolling LLM summaries
+    # Latest summary per issue and the last comment it covers (incremental updates)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS llm_rolling_summaries (
+            issue_key TEXT,
+            provider TEXT,
+            model TEXT,
+            prompt_version TEXT,
+            summary TEXT,
+            last_comment_id TEXT,
+            comment_count INTEGER,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (issue_key, provider, model, prompt_version)
+        )
+    ''')
+
+    # Table: Report checkpoints
+    # Per-issue summaries of a running report job, so a resumed job skips them
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_checkpoints (
+            job_id INTEGER,
+            issue_key TEXT,
+            llm_summary TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_id, issue_key)
+        )
+    ''')
+
+    # Table: Reports
+    # Finished weekly reports (history and downloads)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reports (
+            report_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            filename TEXT,
+            content TEXT,
+            issue_count INTEGER,
+            provider TEXT,
+            project TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Table: Job events
+    # Event log of report jobs, replayed to clients that (re)attach to a job
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            type TEXT,
+            data TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Table: Issue signatures
+    # MinHash signature of each issue's summary + description (near-duplicate detection)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS issue_signatures (
+            key TEXT PRIMARY KEY,
+            content_hash TEXT,
+            signature BLOB,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Table: LSH buckets
+    # One row per (signature band, bucket, issue); issues sharing a bucket are duplicate candidates
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS issue_lsh_buckets (
+            band INTEGER,
+            bucket INTEGER,
+            key TEXT,
+            PRIMARY KEY (band, bucket, key)
+        ) WITHOUT ROWID
+    ''')
+
+    # Table: Analytics sketches
+    # Quantile sketch per metric and dimension value (see analytics.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_sketches (
+            metric TEXT,
+            dimension TEXT,
+            value TEXT,
+            snapshot_id INTEGER,
+            sketch TEXT,
+            PRIMARY KEY (metric, dimension, value)
+        )
+    ''')
+
+    # Table: Analytics issue state
+    # Last seen status (and since when), resolution, priority and component of each bug,
+    # for snapshot-to-snapshot transitions
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_issue_state (
+            key TEXT PRIMARY KEY,
+            status TEXT,
+            since DATETIME,
+            resolution_date DATETIME,
+            priority TEXT,
+            component TEXT
+        )
+    ''')
+    _add_missing_columns(cursor, "analytics_issue_state", {"priority": "TEXT", "component": "TEXT"})
+
+    # Table: Analytics progress
+    # Last snapshot folded into the sketches
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_progress (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            snapshot_id INTEGER
+        )
+    ''')
+
+    # Table: Issue rollups
+    # Open/total bug counts per snapshot for every assignee x component x priority
+    # combination and subtotal ('*' = all values), see rollup.py
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS issue_rollups (
+            snapshot_id INTEGER,
+            label TEXT,
+            assignee TEXT,
+            component TEXT,
+            priority TEXT,
+            open_count INTEGER,
+            total_count INTEGER,
+            PRIMARY KEY (snapshot_id, label, assignee, component, priority)
+        ) WITHOUT ROWID
+    ''')
+
+    # Indexes
+    # "Latest snapshot" lookups and per-snapshot issue scans
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON snapshots(timestamp)")
+    # Per-snapshot scans and key lookups within a snapshot (snapshot diffs);
+    # replaces the former snapshot_id-only index, which it covers
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_issues_snapshot_key ON issues(snapshot_id, key)")
+    cursor.execute("DROP INDEX IF EXISTS idx_issues_snapshot")
+    # One issue across all snapshots (issue timelines)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_issues_key_snapshot ON issues(key, snapshot_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_kind_status ON jobs(kind, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_summary_cache(last_used_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_thread ON llm_summary_cache(issue_key, comments_hash)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, event_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_created ON reports(created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_key ON issue_lsh_buckets(key)")
+    # One rollup slice across all snapshots (drill-down trends)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_rollups_slice ON issue_rollups(label, assignee, component, priority, snapshot_id)")
+
     conn.commit()
+    ensure_search_index(conn)
+
+def _add_missing_columns(cursor, table, columns):
+    """Add columns ({name: type}) that a table created by an older version lacks."""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, column_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+def has_search_index(conn):
+    """False when SQLite lacks FTS5 (see ensure_search_index): search is unavailable."""
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name='issues_fts'").fetchone() is not None
+
+def ensure_search_index(conn):
+    """
+    Create the FTS5 index over issue text, building it from existing rows when empty.
+
+    issues_fts is an external-content table: it stores only the index, the text
+    stays in issues. New snapshots are added by index_snapshot(). Skipped (with a
+    message) when SQLite was built without FTS5; search is then unavailable.
+    """
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5(
+                summary, latest_comment, llm_summary,
+                content='issues', content_rowid='id',
+                tokenize='porter unicode61'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable: {e}")
+        return
+
+    # The docsize shadow table holds one row per indexed issue row
+    indexed = conn.execute("SELECT EXISTS (SELECT 1 FROM issues_fts_docsize)").fetchone()[0]
+    if not indexed and conn.execute("SELECT EXISTS (SELECT 1 FROM issues)").fetchone()[0]:
+        print("Building full-text search index...")
+        rebuild_search_index(conn)
+    # Summary matches count most
+    conn.execute("INSERT INTO issues_fts (issues_fts, rank) VALUES ('rank', 'bm25(4.0, 1.0, 2.0)')")
+    conn.commit()
+
+def index_snapshot(conn, snapshot_id):
+    """Add one snapshot's issues to the search index (part of the caller's transaction)."""
+    if has_search_index(conn):
+        conn.execute('''
+            INSERT INTO issues_fts (rowid, summary, latest_comment, llm_summary)
+            SELECT id, summary, latest_comment, llm_summary FROM issues WHERE snapshot_id=?
+        ''', (snapshot_id,))
+
+def rebuild_search_index(conn):
+    """Re-index all issues, e.g. after rows were deleted or rewritten in bulk."""
+    if has_search_index(conn):
+        conn.execute("INSERT INTO issues_fts (issues_fts) VALUES ('rebuild')")
+        conn.commit()
+
+def init_db():
+    if os.path.exists(DB_NAME):
+        print(f"Database {DB_NAME} already exists.")
+        # Optional: could check for schema migration here
+    else:
+        print(f"Creating new database: {DB_NAME}")
+
+    conn = sqlite3.connect(DB_NAME)
+    apply_schema(conn)
     conn.close()
     print("Database initialization complete.")
 
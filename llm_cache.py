@@ -0,0 +1,200 @@
+"""
+Persistent cache of LLM comment summaries.
+
+Entries are keyed by (issue key, provider, model, prompt version, hash of the
+issue title and comment thread), so a summary is reused until the comments
+change or the prompt/model does. Stored in the llm_summary_cache table of
+dashboard.db with TTL and LRU eviction.
+
+RollingSummaryStore keeps the latest summary per issue together with the id of
+the last comment it covers, so later runs only send newer comments to the LLM.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+import logging
+
+DB_NAME = "dashboard.db"
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_NAME)
+
+def comments_hash(summary, comments):
+    """Stable hash of everything from the issue that goes into the prompt."""
+    payload = [summary or ""] + [
+        [c.get('id'), c.get('author', {}).get('displayName', 'User'), c.get('body', ''), c.get('updated')]
+        for c in comments
+    ]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class SummaryCache:
+    def __init__(self, db_path=DB_PATH, ttl_days=None, max_entries=None):
+        self.db_path = db_path
+        self.ttl_days = ttl_days if ttl_days is not None else int(os.getenv("LLM_CACHE_TTL_DAYS", "90"))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        self._writes = 0
+        self._warned = False
+
+    def _connect(self):
+        if not os.path.exists(self.db_path):
+            return None
+        return sqlite3.connect(self.db_path, timeout=30.0)
+
+    def _unavailable(self, e):
+        # Older databases without the table (run update_schema.py): act as a cache miss
+        if not self._warned:
+            logging.warning(f"LLM summary cache unavailable: {e}")
+            self._warned = True
+
+    @staticmethod
+    def make_key(issue_key, provider, model, prompt_version, thread_hash):
+        raw = "\x1f".join([issue_key or "", provider or "", model or "", prompt_version or "", thread_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, issue_key, provider, model, prompt_version, thread_hash):
+        if not self.enabled:
+            return None
+        cache_key = self.make_key(issue_key, provider, model, prompt_version, thread_hash)
+        try:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(f'''
+                    SELECT summary FROM llm_summary_cache
+                    WHERE cache_key=? AND created_at >= datetime('now', '-{int(self.ttl_days)} days')
+                ''', (cache_key,)).fetchone()
+                if row:
+                    conn.execute("UPDATE llm_summary_cache SET last_used_at=CURRENT_TIMESTAMP WHERE cache_key=?", (cache_key,))
+                    conn.commit()
+                return row[0] if row else None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._unavailable(e)
+            return None
+
+    def get_any_provider(self, issue_key, prompt_version, thread_hash):
+        """Most recently used summary of this thread from any provider/model (read-only peek)."""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(f'''
+                    SELECT summary FROM llm_summary_cache
+                    WHERE issue_key=? AND prompt_version=? AND comments_hash=?
+                      AND created_at >= datetime('now', '-{int(self.ttl_days)} days')
+                    ORDER BY last_used_at DESC LIMIT 1
+                ''', (issue_key, prompt_version, thread_hash)).fetchone()
+                return row[0] if row else None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._unavailable(e)
+            return None
+
+    def put(self, issue_key, provider, model, prompt_version, thread_hash, summary):
+        if not self.enabled:
+            return
+        cache_key = self.make_key(issue_key, provider, model, prompt_version, thread_hash)
+        try:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO llm_summary_cache (
+                        cache_key, issue_key, provider, model, prompt_version, comments_hash, summary,
+                        created_at, last_used_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ''', (cache_key, issue_key, provider, model, prompt_version, thread_hash, summary))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._unavailable(e)
+            return
+
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        try:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            try:
+                removed = conn.execute(
+                    f"DELETE FROM llm_summary_cache WHERE created_at < datetime('now', '-{int(self.ttl_days)} days')").rowcount
+                removed += conn.execute('''
+                    DELETE FROM llm_summary_cache WHERE cache_key IN (
+                        SELECT cache_key FROM llm_summary_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (self.max_entries,)).rowcount
+                conn.commit()
+                return removed
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._unavailable(e)
+            return 0
+
+class RollingSummaryStore:
+    """Latest summary per (issue, provider, model) and the last comment id it covers."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._warned = False
+
+    def _connect(self):
+        if not os.path.exists(self.db_path):
+            return None
+        return sqlite3.connect(self.db_path, timeout=30.0)
+
+    def _unavailable(self, e):
+        if not self._warned:
+            logging.warning(f"Rolling summary store unavailable: {e}")
+            self._warned = True
+
+    def get(self, issue_key, provider, model, prompt_version):
+        """Return (summary, last_comment_id) or None."""
+        try:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute('''
+                    SELECT summary, last_comment_id FROM llm_rolling_summaries
+                    WHERE issue_key=? AND provider=? AND model=? AND prompt_version=?
+                ''', (issue_key, provider, model, prompt_version)).fetchone()
+                return (row[0], row[1]) if row else None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._unavailable(e)
+            return None
+
+    def put(self, issue_key, provider, model, prompt_version, summary, last_comment_id, comment_count):
+        try:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO llm_rolling_summaries (
+                        issue_key, provider, model, prompt_version, summary, last_comment_id, comment_count, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (issue_key, provider, model, prompt_version, summary, last_comment_id, comment_count))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self._unavailable(e)
+
+summary_cache = SummaryCache()
+rolling_store = RollingSummaryStore()
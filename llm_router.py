@@ -0,0 +1,224 @@
+"""
+Provider routing for LLM calls: latency-based hedging, failover and circuit breaking.
+
+The primary provider gets the request first. If it has not answered within its
+hedge delay (the configured percentile of its recent latencies, capped by its
+latency SLO), the same request is also sent to the next fallback provider and
+the first successful answer wins. Failures move on to the next provider
+immediately. A provider that keeps failing has its circuit opened and is
+skipped until a cooldown has passed.
+"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Latency SLO per provider in milliseconds (LLM_SLO_MS_<PROVIDER> overrides)
+DEFAULT_SLO_MS = {
+    "openai": 10000,
+    "cambrian": 20000,
+    "ollama": 30000,
+}
+
+class CircuitOpenError(Exception):
+    """No provider is currently accepting requests."""
+
+class NoFailover(Exception):
+    """Wraps an error that must not be retried on another provider (e.g. output already streamed)."""
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open (one trial) after cooldown."""
+
+    def __init__(self, failure_threshold=3, cooldown_seconds=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies (seconds)."""
+
+    def __init__(self, size=100):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct, min_samples=10):
+        with self._lock:
+            if len(self.samples) < min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+class ProviderRouter:
+    def __init__(self, is_available=None):
+        """
+        Args:
+            is_available: Optional function(provider) -> bool; unconfigured providers are skipped
+        """
+        self.is_available = is_available or (lambda provider: True)
+        self.fallbacks = [p.strip().lower() for p in os.getenv("LLM_FALLBACK_PROVIDERS", "").split(",") if p.strip()]
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.failure_threshold = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+        self.cooldown_seconds = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "60"))
+        self.breakers = {}
+        self.latencies = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _breaker(self, provider):
+        with self._lock:
+            if provider not in self.breakers:
+                self.breakers[provider] = CircuitBreaker(self.failure_threshold, self.cooldown_seconds)
+                self.latencies[provider] = LatencyTracker()
+            return self.breakers[provider]
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+            return self._executor
+
+    def slo_seconds(self, provider):
+        value = os.getenv(f"LLM_SLO_MS_{provider.upper()}")
+        return float(value) / 1000.0 if value else DEFAULT_SLO_MS.get(provider, 30000) / 1000.0
+
+    def hedge_delay(self, provider):
+        """Wait this long for a provider before hedging: its recent pN latency, capped by the SLO."""
+        self._breaker(provider)
+        observed = self.latencies[provider].percentile(self.hedge_percentile)
+        slo = self.slo_seconds(provider)
+        return min(observed, slo) if observed is not None else slo
+
+    def candidates(self, primary):
+        ordered = [primary] + [p for p in self.fallbacks if p != primary]
+        return [p for p in ordered if p == primary or self.is_available(p)]
+
+    def _attempt(self, provider, fn):
+        start = time.monotonic()
+        try:
+            result = fn(provider)
+        except Exception:
+            self._breaker(provider).record_failure()
+            raise
+        self._breaker(provider).record_success()
+        self.latencies[provider].add(time.monotonic() - start)
+        return result, provider
+
+    def call(self, primary, fn, hedge=True):
+        """
+        Run fn(provider) against the primary provider with hedging/failover.
+
+        Args:
+            primary: Preferred provider name
+            fn: Function(provider) returning the result or raising
+            hedge: If False, fall back only after a failure (no duplicate requests;
+                used for streaming, where output is forwarded as it arrives)
+
+        Returns:
+            (result, provider that produced it) - not the primary after a hedge or failover
+
+        Raises:
+            The last provider error, or CircuitOpenError if every circuit is open
+        """
+        remaining = self.candidates(primary)
+        last_error = None
+
+        if not hedge:
+            for provider in remaining:
+                if not self._breaker(provider).allow():
+                    continue
+                try:
+                    return self._attempt(provider, fn)
+                except NoFailover as e:
+                    raise e.__cause__ or e
+                except Exception as e:
+                    last_error = e
+            raise last_error or CircuitOpenError(f"All LLM providers unavailable ({', '.join(remaining)})")
+
+        pool = self._pool()
+        running = {}
+        while True:
+            # Launch the next allowed provider when nothing is in flight
+            if not running:
+                launched = False
+                while remaining and not launched:
+                    provider = remaining.pop(0)
+                    if self._breaker(provider).allow():
+                        running[pool.submit(self._attempt, provider, fn)] = provider
+                        launched = True
+                if not launched:
+                    raise last_error or CircuitOpenError("All LLM providers unavailable")
+
+            # Hedge after the slowest in-flight provider's delay if a fallback remains
+            timeout = max(self.hedge_delay(p) for p in running.values()) if remaining else None
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Primary is slow: send a duplicate request to the next provider
+                while remaining:
+                    provider = remaining.pop(0)
+                    if self._breaker(provider).allow():
+                        running[pool.submit(self._attempt, provider, fn)] = provider
+                        break
+                continue
+
+            for future in done:
+                running.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+            if not running and not remaining:
+                raise last_error
+
+    def stats(self):
+        with self._lock:
+            providers = list(self.breakers)
+        return {
+            provider: {
+                "circuit": self.breakers[provider].state,
+                "consecutive_failures": self.breakers[provider].failures,
+                "hedge_delay_seconds": round(self.hedge_delay(provider), 3),
+                "slo_seconds": self.slo_seconds(provider),
+            }
+            for provider in providers
+        }
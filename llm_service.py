@@ -1,11 +1,133 @@
 import os
-import requests
+import json
+import logging
+import threading
+import importlib.util
 import httpx
 from openai import OpenAI
 from dotenv import load_dotenv
+from llm_cache import summary_cache, rolling_store, comments_hash
+from llm_router import ProviderRouter, NoFailover
+from adaptive_limiter import get_limiter
 
 load_dotenv()
 
+# Default number of concurrent summarization calls per provider
+DEFAULT_CONCURRENCY = {
+    "openai": 8,
+    "cambrian": 4,
+    "ollama": 1,
+}
+
+# Request timeouts in seconds (LLM_TIMEOUT_SECONDS_<PROVIDER> overrides)
+DEFAULT_TIMEOUTS = {
+    "openai": 30.0,
+    "cambrian": 60.0,
+    "ollama": 120.0,
+}
+
+# httpx negotiates HTTP/2 over TLS when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Bump when the summarization prompt changes so cached summaries are not reused
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPTS = {
+    "openai": "You are a professional project manager summarizing technical issue progress.",
+    "cambrian": "You are a helpful assistant.",
+}
+
+SUMMARY_PROMPT = """
+Summarize the current progress and key discussion points for the following Jira issue based on its comments.
+Issue: {issue_key} - {summary}
+
+Comments:
+{comment_text}
+
+Provide a concise summary (max 2-3 sentences) focusing on the latest status and any blockers.
+Format: Bullet points or a short paragraph.
+"""
+
+UPDATE_PROMPT = """
+Update the summary of the following Jira issue using the new comments below.
+Issue: {issue_key} - {summary}
+
+Previous summary:
+{previous}
+
+New comments:
+{comment_text}
+
+Provide the updated concise summary (max 2-3 sentences) focusing on the latest status and any blockers.
+Format: Bullet points or a short paragraph.
+"""
+
+BATCH_PROMPT = """
+Summarize the current progress and key discussion points for each of the following Jira issues based on their comments.
+
+{issues_text}
+
+For each issue provide a concise summary (max 2-3 sentences) focusing on the latest status and any blockers.
+Respond with only a JSON object mapping each issue key to its summary string, for example:
+{{"PROJ-1": "Summary of PROJ-1", "PROJ-2": "Summary of PROJ-2"}}
+"""
+
+BATCH_ISSUE_TEMPLATE = """### Issue: {issue_key} - {summary}
+Comments:
+{comment_text}
+"""
+
+# Rough size of the prompt templates themselves, in tokens
+PROMPT_OVERHEAD_TOKENS = 100
+
+# Completion length of a single-issue summary, in tokens
+SUMMARY_MAX_TOKENS = 200
+
+class LLMConfigError(Exception):
+    """Provider not configured or returned an unusable response."""
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for budgeting English/code text
+    return len(text or "") // 4 + 1
+
+def format_comment(comment, max_tokens):
+    """One prompt line per comment, with very long bodies truncated."""
+    body = comment.get('body', '') or ''
+    max_chars = max_tokens * 4
+    if len(body) > max_chars:
+        body = body[:max_chars] + " ...[truncated]"
+    return f"- {comment.get('author', {}).get('displayName', 'User')}: {body}"
+
+def parse_batch_response(text):
+    """Extract the {issue_key: summary} object from a model response (tolerates code fences/prose)."""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def chunk_lines(lines, budget):
+    """Split lines into consecutive chunks of at most `budget` estimated tokens each."""
+    budget = max(budget, 1)
+    chunks = []
+    current = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line)
+        if current and used + cost > budget:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(line)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
 class LLMService:
     def __init__(self):
         self.provider = os.getenv("LLM_PROVIDER", "cambrian").lower()
@@ -13,10 +135,17 @@ class LLMService:
         self.base_url = os.getenv("LLM_BASE_URL") # For Ollama or vLLM
         self.model = os.getenv("LLM_MODEL", "gpt-4o-mini")
 
-        if self.provider == "openai" and self.api_key:
-            self.client = OpenAI(api_key=self.api_key, timeout=30.0)
-        else:
-            self.client = None
+        # "full" re-summarizes the whole thread; "rolling" updates the previous
+        # summary with only the comments added since
+        self.summary_mode = os.getenv("LLM_SUMMARY_MODE", "full").lower()
+        self.prompt_token_budget = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "3000"))
+        self.max_comment_tokens = int(os.getenv("LLM_MAX_COMMENT_TOKENS", "500"))
+        self.max_condense_calls = int(os.getenv("LLM_MAX_CONDENSE_CALLS", "3"))
+
+        # Multi-issue prompt packing (1 = disabled): issues whose threads fit in
+        # LLM_BATCH_ITEM_MAX_TOKENS are packed up to LLM_BATCH_MAX_ISSUES per call
+        self.batch_max_issues = int(os.getenv("LLM_BATCH_MAX_ISSUES", "1"))
+        self.batch_item_max_tokens = int(os.getenv("LLM_BATCH_ITEM_MAX_TOKENS", "600"))
 
         # Cambrian Configuration
         self.cambrian_base_url = os.getenv("CAMBRIAN_BASE_URL")
@@ -28,92 +157,448 @@ class LLMService:
             if not self.cambrian_base_url.rstrip("/").endswith("/v1"):
                 self.cambrian_base_url = f"{self.cambrian_base_url.rstrip('/')}/v1"
 
-            # Use httpx client with verify=False for internal endpoint
-            http_client = httpx.Client(verify=False)
-            self.cambrian_client = OpenAI(
-                base_url=self.cambrian_base_url,
-                api_key=self.cambrian_api_key,
-                http_client=http_client,
-                timeout=60.0
-            )
-        else:
-            self.cambrian_client = None
+        # Provider clients are created on first use and then reused (pooled keep-alive connections)
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+        # Hedging/failover across LLM_FALLBACK_PROVIDERS with per-provider circuit breakers
+        self.router = ProviderRouter(is_available=self._is_configured)
+
+    # --- Provider clients ---
+
+    def timeout_for(self, provider):
+        """Request timeout in seconds (LLM_TIMEOUT_SECONDS_<PROVIDER>)."""
+        value = os.getenv(f"LLM_TIMEOUT_SECONDS_{provider.upper()}")
+        return float(value) if value else DEFAULT_TIMEOUTS.get(provider, 60.0)
+
+    def _http_client(self, provider):
+        # Internal endpoints (Cambrian) use self-signed certificates
+        options = dict(
+            verify=provider != "cambrian",
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(self.timeout_for(provider), connect=10.0),
+            limits=httpx.Limits(max_connections=self.limiter_for(provider).max_limit + 4,
+                                max_keepalive_connections=self.limiter_for(provider).max_limit),
+        )
+        return httpx.Client(**options)
+
+    def _get_client(self, name, factory):
+        client = self._clients.get(name)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = factory()
+        return client
+
+    def _openai_client(self, provider):
+        if provider in self._clients:
+            return self._clients[provider]
+        if provider == "openai" and not self.api_key:
+            return None
+        if provider == "cambrian" and not self.cambrian_base_url:
+            return None
+        options = dict(api_key=self.api_key, timeout=self.timeout_for(provider))
+        if provider == "cambrian":
+            options = dict(base_url=self.cambrian_base_url, api_key=self.cambrian_api_key, timeout=self.timeout_for(provider))
+        return self._get_client(provider, lambda: OpenAI(http_client=self._http_client(provider), **options))
+
+    @property
+    def client(self):
+        return self._openai_client("openai")
+
+    @client.setter
+    def client(self, value):
+        self._clients["openai"] = value
+
+    @property
+    def cambrian_client(self):
+        return self._openai_client("cambrian")
+
+    @cambrian_client.setter
+    def cambrian_client(self, value):
+        self._clients["cambrian"] = value
+
+    @property
+    def ollama_http(self):
+        return self._get_client("ollama", lambda: self._http_client("ollama"))
+
+    def close(self):
+        """Close pooled connections of the clients created so far."""
+        with self._clients_lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+    def concurrency_for(self, provider=None):
+        """Max parallel summarize calls for a provider (LLM_CONCURRENCY_<PROVIDER> or LLM_CONCURRENCY)."""
+        target_provider = (provider or self.provider).lower()
+        value = os.getenv(f"LLM_CONCURRENCY_{target_provider.upper()}") or os.getenv("LLM_CONCURRENCY")
+        try:
+            return max(1, int(value)) if value else DEFAULT_CONCURRENCY.get(target_provider, 1)
+        except ValueError:
+            return DEFAULT_CONCURRENCY.get(target_provider, 1)
+
+    def limiter_for(self, provider=None):
+        """Adaptive in-flight limit for a provider, starting at concurrency_for()."""
+        target_provider = (provider or self.provider).lower()
+        initial = self.concurrency_for(target_provider)
+        return get_limiter(f"llm_{target_provider}", initial=initial, max_limit=initial * 4)
+
+    def model_for(self, provider=None):
+        target_provider = provider if provider else self.provider
+        if target_provider == "cambrian":
+            return self.cambrian_model
+        if target_provider == "ollama":
+            return self.model if self.model != "gpt-4o-mini" else "llama3"
+        return self.model
 
-    def summarize_comments(self, issue_key, summary, comments, provider=None):
+    def cached_summary(self, issue_key, summary, comments, provider=None):
+        """
+        Return the cached summary for this exact comment thread, or None (never calls the LLM).
+        Without a provider, a summary produced by any provider is accepted.
+        """
+        if not comments:
+            return None
+        thread_hash = comments_hash(summary, comments)
+        if provider is None:
+            return summary_cache.get_any_provider(issue_key, PROMPT_VERSION, thread_hash)
+        return self._cached(issue_key, provider, thread_hash)
+
+    def _answering_providers(self, target_provider):
+        """Providers a call for target_provider may be answered by: itself, then its fallbacks."""
+        return [target_provider] + [p for p in self.router.fallbacks if p != target_provider]
+
+    def _cached(self, issue_key, target_provider, thread_hash):
+        """
+        Cached summary of this thread for target_provider.
+
+        Summaries are filed under the provider that wrote them, so after a hedge
+        or failover the one to reuse is under a fallback of target_provider.
+        """
+        for p in self._answering_providers(target_provider):
+            cached = summary_cache.get(issue_key, p, self.model_for(p), PROMPT_VERSION, thread_hash)
+            if cached is not None:
+                return cached
+        return None
+
+    def _rolling_state(self, issue_key, target_provider, comments):
+        """
+        (previous summary, last covered comment id, provider that wrote it) of the
+        stored rolling summary covering the most of comments, or None.
+        """
+        ids = [str(c.get('id', '')) for c in comments]
+        best = None
+        for p in self._answering_providers(target_provider):
+            state = rolling_store.get(issue_key, p, self.model_for(p), PROMPT_VERSION)
+            if state and state[1] and state[1] in ids:
+                if best is None or ids.index(state[1]) > ids.index(best[1]):
+                    best = (*state, p)
+        return best
+
+    def summarize_comments(self, issue_key, summary, comments, provider=None, on_token=None):
+        """
+        Summarize an issue's comment thread.
+
+        on_token: Optional function(text_delta); when given, the final completion is
+        streamed from the provider and partial output is passed on as it arrives
+        (a cached summary is passed as a single delta).
+        """
         if not comments:
             return "No comments available for summary."
         
         target_provider = provider if provider else self.provider
-        
-        # Check active client based on provider
-        active_client = None
-        if target_provider == "openai":
-            active_client = self.client
-        elif target_provider == "cambrian":
-            active_client = self.cambrian_client
-        
-        if not active_client and target_provider in ["openai", "cambrian"]:
-            if target_provider == "openai":
-                return "[Error: OPENAI_API_KEY not configured]"
-            else:
-                return "[Error: CAMBRIAN_BASE_URL not configured]"
 
-        # Combine comments into a single string
-        comment_text = "\n".join([f"- {c.get('author', {}).get('displayName', 'User')}: {c.get('body', '')}" for c in comments])
-        
-        prompt = f"""
-Summarize the current progress and key discussion points for the following Jira issue based on its comments.
-Issue: {issue_key} - {summary}
+        # Unchanged comment threads reuse the stored summary
+        thread_hash = comments_hash(summary, comments)
+        cached = self._cached(issue_key, target_provider, thread_hash)
+        if cached is not None:
+            if on_token:
+                on_token(cached)
+            return cached
 
-Comments:
-{comment_text}
+        result, producer = self._summarize(issue_key, summary, comments, target_provider, on_token)
+        if producer is not None:
+            # Filed under the provider that answered (a fallback after hedging/failover)
+            summary_cache.put(issue_key, producer, self.model_for(producer), PROMPT_VERSION, thread_hash, result)
+        return result
 
-Provide a concise summary (max 2-3 sentences) focusing on the latest status and any blockers.
-Format: Bullet points or a short paragraph.
-"""
+    def plan_batches(self, items, provider=None):
+        """
+        Group items for summarize_batch.
+
+        Args:
+            items: List of (issue_key, summary, comments)
+
+        Returns:
+            List of index lists; small uncached threads are packed together under
+            the prompt token budget, everything else is a group of one.
+        """
+        target_provider = provider if provider else self.provider
+        if self.batch_max_issues <= 1:
+            return [[i] for i in range(len(items))]
 
+        groups = []
+        current = []
+        used = PROMPT_OVERHEAD_TOKENS
+        for i, (issue_key, summary, comments) in enumerate(items):
+            cost = self._batch_cost(issue_key, summary, comments, target_provider)
+            if cost is None:
+                groups.append([i])
+                continue
+            if current and (len(current) >= self.batch_max_issues or used + cost > self.prompt_token_budget):
+                groups.append(current)
+                current = []
+                used = PROMPT_OVERHEAD_TOKENS
+            current.append(i)
+            used += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    def _batch_cost(self, issue_key, summary, comments, target_provider):
+        """Estimated prompt tokens for packing this issue, or None if it should be summarized alone."""
+        if not comments or self.cached_summary(issue_key, summary, comments, provider=target_provider) is not None:
+            return None
+        if self.summary_mode == "rolling" and self._rolling_state(issue_key, target_provider, comments):
+            return None
+        lines = [format_comment(c, self.max_comment_tokens) for c in comments]
+        cost = estimate_tokens(issue_key) + estimate_tokens(summary) + sum(estimate_tokens(l) for l in lines) + 10
+        return cost if cost <= self.batch_item_max_tokens else None
+
+    def summarize_batch(self, items, provider=None, on_token=None):
+        """
+        Summarize several issues with one packed prompt (see plan_batches).
+
+        The model answers with a JSON object keyed by issue key; any issue whose
+        entry is missing or invalid (or the whole call if it fails) falls back to
+        a single-issue summarize_comments call.
+
+        on_token is only used for single-item groups (packed JSON output is not streamed).
+
+        Returns:
+            List of summaries aligned with items
+        """
+        if len(items) == 1:
+            return [self.summarize_comments(*items[0], provider=provider, on_token=on_token)]
+
+        target_provider = provider if provider else self.provider
+        producer = target_provider
+        parsed = {}
         try:
-            if target_provider == "openai":
-                response = active_client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a professional project manager summarizing technical issue progress."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=200,
-                    temperature=0.3
-                )
-                return response.choices[0].message.content.strip()
-            
-            elif target_provider == "cambrian":
-                response = active_client.chat.completions.create(
-                    model=self.cambrian_model,
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=200,
-                    temperature=0.3
-                )
-                return response.choices[0].message.content.strip()
-
-            elif target_provider == "ollama":
-                url = self.base_url or "http://localhost:11434/api/generate"
-                payload = {
-                    "model": self.model if self.model != "gpt-4o-mini" else "llama3",
-                    "prompt": prompt,
-                    "stream": False
-                }
-                resp = requests.post(url, json=payload)
-                if resp.status_code == 200:
-                    return resp.json().get("response", "").strip()
-                else:
-                    return f"[Error: Ollama request failed with status {resp.status_code}]"
-            
-            return "[Error: Unsupported LLM provider]"
+            issues_text = "\n".join(
+                BATCH_ISSUE_TEMPLATE.format(
+                    issue_key=issue_key, summary=summary,
+                    comment_text="\n".join(format_comment(c, self.max_comment_tokens) for c in comments))
+                for issue_key, summary, comments in items
+            )
+            response, producer = self._complete(target_provider, BATCH_PROMPT.format(issues_text=issues_text),
+                                                max_tokens=150 * len(items) + 50)
+            parsed = parse_batch_response(response)
+        except Exception as e:
+            logging.warning(f"Batch summarization failed, falling back to single calls: {e}")
+
+        model = self.model_for(producer)
+        results = []
+        for issue_key, summary, comments in items:
+            text = parsed.get(issue_key)
+            if isinstance(text, str) and text.strip():
+                text = text.strip()
+                summary_cache.put(issue_key, producer, model, PROMPT_VERSION, comments_hash(summary, comments), text)
+                rolling_store.put(issue_key, producer, model, PROMPT_VERSION, text,
+                                  str(comments[-1].get('id', '')), len(comments))
+                results.append(text)
+            else:
+                results.append(self.summarize_comments(issue_key, summary, comments, provider=provider))
+        return results
 
+    def _summarize(self, issue_key, summary, comments, target_provider, on_token=None):
+        """(summary, provider that wrote it), or (error text, None)."""
+        try:
+            if self.summary_mode == "rolling":
+                result, producer = self._summarize_rolling(issue_key, summary, comments, target_provider, on_token)
+            else:
+                result, producer = self._summarize_thread(issue_key, summary, comments, target_provider, on_token=on_token)
+        except LLMConfigError as e:
+            return f"[Error: {e}]", None
         except Exception as e:
-            return f"[Error: LLM summarization failed: {str(e)}]"
+            return f"[Error: LLM summarization failed: {str(e)}]", None
+
+        # Remember what this summary covers so the next run can update it incrementally
+        rolling_store.put(issue_key, producer, self.model_for(producer), PROMPT_VERSION,
+                          result, str(comments[-1].get('id', '')), len(comments))
+        return result, producer
+
+    def _summarize_rolling(self, issue_key, summary, comments, target_provider, on_token=None):
+        """Update the stored summary with only the comments added since it was written."""
+        state = self._rolling_state(issue_key, target_provider, comments)
+        if state:
+            previous, last_comment_id, writer = state
+            ids = [str(c.get('id', '')) for c in comments]
+            new_comments = comments[ids.index(last_comment_id) + 1:]
+            if not new_comments:
+                if on_token:
+                    on_token(previous)
+                return previous, writer
+            return self._summarize_thread(issue_key, summary, new_comments, target_provider, previous, on_token)
+        # No usable state (first run, or the covered comment was deleted): start from scratch
+        return self._summarize_thread(issue_key, summary, comments, target_provider, on_token=on_token)
+
+    def _summarize_thread(self, issue_key, summary, comments, target_provider, previous=None, on_token=None):
+        """
+        Summarize comments within the prompt token budget.
+
+        Threads that don't fit are split into budget-sized chunks that are
+        condensed oldest-first into a running summary; at most
+        max_condense_calls chunks are used (the oldest comments are dropped
+        beyond that), so prompt size and call count per issue stay bounded.
+
+        Returns:
+            (summary, provider that wrote the final pass)
+        """
+        lines = [format_comment(c, self.max_comment_tokens) for c in comments]
+        fixed_tokens = estimate_tokens(issue_key) + estimate_tokens(summary) + PROMPT_OVERHEAD_TOKENS
+        # Every chunk after the first carries the running summary (up to SUMMARY_MAX_TOKENS) in its prompt
+        summary_tokens = max(estimate_tokens(previous or ""), SUMMARY_MAX_TOKENS)
+        chunks = chunk_lines(lines, self.prompt_token_budget - fixed_tokens - summary_tokens)
+
+        omitted = 0
+        if len(chunks) > self.max_condense_calls:
+            dropped = chunks[:-self.max_condense_calls]
+            omitted = sum(len(c) for c in dropped)
+            chunks = chunks[-self.max_condense_calls:]
+
+        running = previous
+        producer = target_provider
+        for n, chunk in enumerate(chunks):
+            comment_text = "\n".join(chunk)
+            if n == 0 and omitted:
+                comment_text = f"({omitted} earlier comments omitted)\n{comment_text}"
+            if running is None:
+                prompt = SUMMARY_PROMPT.format(issue_key=issue_key, summary=summary, comment_text=comment_text)
+            else:
+                prompt = UPDATE_PROMPT.format(issue_key=issue_key, summary=summary, previous=running, comment_text=comment_text)
+            # Only the final pass is user-visible output worth streaming
+            running, producer = self._complete(target_provider, prompt, on_token=on_token if n == len(chunks) - 1 else None)
+        return running, producer
+
+    def _is_configured(self, target_provider):
+        try:
+            self._check_client(target_provider)
+            return True
+        except LLMConfigError:
+            return False
+
+    def _check_client(self, target_provider):
+        if target_provider == "openai" and not (self.api_key or "openai" in self._clients):
+            raise LLMConfigError("OPENAI_API_KEY not configured")
+        if target_provider == "cambrian" and not (self.cambrian_base_url or "cambrian" in self._clients):
+            raise LLMConfigError("CAMBRIAN_BASE_URL not configured")
+        if target_provider not in ("openai", "cambrian", "ollama"):
+            raise LLMConfigError("Unsupported LLM provider")
+
+    def _complete(self, target_provider, prompt, max_tokens=SUMMARY_MAX_TOKENS, on_token=None):
+        """
+        Run one completion and return (stripped text, provider that answered); raises if every provider fails.
+
+        Goes through the provider router: a slow primary is hedged with a fallback
+        provider and a failing one is failed over. With on_token, the response is
+        streamed and each text delta is passed to it; streaming fails over only
+        before any output was passed on and is never hedged.
+        """
+        if not on_token:
+            return self.router.call(target_provider, lambda p: self._complete_once(p, prompt, max_tokens))
+
+        streamed = []
+        def attempt(provider):
+            try:
+                return self._complete_once(provider, prompt, max_tokens, on_token=lambda d: (streamed.append(d), on_token(d)))
+            except Exception as e:
+                if streamed:
+                    raise NoFailover(e) from e
+                raise
+        return self.router.call(target_provider, attempt, hedge=False)
+
+    def _complete_once(self, target_provider, prompt, max_tokens=SUMMARY_MAX_TOKENS, on_token=None):
+        """Run one completion against a single provider (raises on failure)."""
+        self._check_client(target_provider)
+        with self.limiter_for(target_provider).track():
+            return self._request(target_provider, prompt, max_tokens, on_token)
+
+    def _request(self, target_provider, prompt, max_tokens, on_token):
+        """The provider call itself (429s raise so the limiter backs off)."""
+        if on_token:
+            parts = []
+            for delta in self._stream(target_provider, prompt, max_tokens):
+                parts.append(delta)
+                on_token(delta)
+            return "".join(parts).strip()
+
+        if target_provider in ("openai", "cambrian"):
+            active_client = self.client if target_provider == "openai" else self.cambrian_client
+            response = active_client.chat.completions.create(
+                model=self.model_for(target_provider),
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPTS[target_provider]},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=0.3
+            )
+            return response.choices[0].message.content.strip()
+
+        url = self.base_url or "http://localhost:11434/api/generate"
+        payload = {
+            "model": self.model_for("ollama"),
+            "prompt": prompt,
+            "stream": False
+        }
+        resp = self.ollama_http.post(url, json=payload)
+        if resp.status_code == 429:
+            resp.raise_for_status()
+        if resp.status_code != 200:
+            raise LLMConfigError(f"Ollama request failed with status {resp.status_code}")
+        return resp.json().get("response", "").strip()
+
+    def _stream(self, target_provider, prompt, max_tokens):
+        """Yield text deltas from a streaming completion."""
+        if target_provider in ("openai", "cambrian"):
+            active_client = self.client if target_provider == "openai" else self.cambrian_client
+            stream = active_client.chat.completions.create(
+                model=self.model_for(target_provider),
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPTS[target_provider]},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=0.3,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            return
+
+        url = self.base_url or "http://localhost:11434/api/generate"
+        payload = {
+            "model": self.model_for("ollama"),
+            "prompt": prompt,
+            "stream": True
+        }
+        with self.ollama_http.stream("POST", url, json=payload) as resp:
+            if resp.status_code == 429:
+                resp.raise_for_status()
+            if resp.status_code != 200:
+                raise LLMConfigError(f"Ollama request failed with status {resp.status_code}")
+            # Ollama streams one JSON object per line
+            for line in resp.iter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
 
 # Singleton instance
 llm_service = LLMService()
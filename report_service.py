@@ -5,20 +5,181 @@ Fetches Jira issues and generates LLM summaries on-demand.
 import os
 import datetime
 import json
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from collections import Counter
-from fetch_jira_data import fetch_issues, get_jira_headers
+from fetch_jira_data import fetch_issues, count_issues, get_jira_headers, JiraQueryError
 from llm_service import llm_service
 
 load_dotenv()
 
-def generate_realtime_report(progress_callback=None, provider=None):
+# Statuses included in the weekly report
+REPORT_STATUSES = ("New", "Open", "In Progress")
+
+# Snapshot issues without a usable summary are re-fetched by key in the delta
+# query; beyond this many the report falls back to a full fetch
+MAX_BACKFILL_KEYS = 200
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard.db")
+
+# Report order (Critical/Blocker first)
+PRIORITY_ORDER = {
+    'Critical': 1,
+    'Blocker': 1,
+    'High': 2,
+    'Medium': 3,
+    'Low': 4,
+    'None': 5,
+    'Undecided': 5
+}
+
+# LLM scheduling tiers: (name, highest PRIORITY_ORDER value in the tier)
+PRIORITY_TIERS = [
+    ("Critical/Blocker", 1),
+    ("High", 2),
+    ("Other", 5),
+]
+
+def priority_tier(priority):
+    rank = PRIORITY_ORDER.get(priority, 5)
+    return next(n for n, (_, highest) in enumerate(PRIORITY_TIERS) if rank <= highest)
+
+def sort_by_priority(issues):
+    return sorted(issues, key=lambda x: PRIORITY_ORDER.get(x['priority'], 5))
+
+def report_jql(project):
+    statuses = ", ".join(f'"{s}"' for s in REPORT_STATUSES)
+    return f'project = "{project}" AND status IN ({statuses})'
+
+def is_stale_update(updated, since):
+    """True if the Jira `updated` timestamp is older than `since`."""
+    if not updated:
+        return False
+    try:
+        return datetime.datetime.strptime(updated[:10], "%Y-%m-%d") < since
+    except ValueError:
+        return False
+
+def extract_issue(issue, since):
+    """Report row and comment thread from a Jira API issue."""
+    fields = issue.get('fields', {})
+    assignee = fields.get('assignee', {})
+    comments = fields.get('comment', {}).get('comments', [])
+    row = {
+        "key": issue.get('key'),
+        "summary": fields.get('summary', ''),
+        "status": fields.get('status', {}).get('name', 'Unknown'),
+        "priority": fields.get('priority', {}).get('name', 'None'),
+        "assignee": assignee.get('displayName', 'Unassigned') if assignee else 'Unassigned',
+        "updated": fields.get('updated', '') or '',
+        "llm_summary": None,
+        "latest_comment": comments[-1].get('body', '') if comments else "",
+        "is_stale": is_stale_update(fields.get('updated', ''), since)
+    }
+    return row, comments
+
+def has_usable_summary(row):
+    return bool(row.get('llm_summary')) and not row['llm_summary'].startswith("[Error")
+
+def load_snapshot_issues(project):
     """
-    Generate a weekly report in real-time by fetching Jira and calling LLM.
+    Latest snapshot and its report rows for a project (open statuses only).
+
+    Returns:
+        (snapshot dict with snapshot_id/timestamp, list of report rows), or (None, [])
+        when there is no snapshot or it doesn't cover the project
+    """
+    if not os.path.exists(DB_PATH):
+        return None, []
+    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    try:
+        snapshot = conn.execute(
+            "SELECT snapshot_id, timestamp FROM snapshots ORDER BY timestamp DESC, snapshot_id DESC LIMIT 1").fetchone()
+        if not snapshot:
+            return None, []
+        rows = conn.execute(f'''
+            SELECT key, summary, status, priority, assignee, updated_date, latest_comment, llm_summary
+            FROM issues
+            WHERE snapshot_id = ? AND key LIKE ? AND status IN ({", ".join("?" for _ in REPORT_STATUSES)})
+        ''', (snapshot['snapshot_id'], f"{project}-%", *REPORT_STATUSES)).fetchall()
+    except sqlite3.Error as e:
+        print(f"Could not read snapshot for report: {e}")
+        return None, []
+    finally:
+        conn.close()
+    return dict(snapshot), [
+        {
+            "key": r['key'],
+            "summary": r['summary'] or '',
+            "status": r['status'],
+            "priority": r['priority'] or 'None',
+            "assignee": r['assignee'] or 'Unassigned',
+            "updated": r['updated_date'] or '',
+            "llm_summary": r['llm_summary'] or None,
+            "latest_comment": r['latest_comment'] or "",
+        }
+        for r in rows
+    ]
+
+def merge_with_snapshot(issues, snapshot_rows, since):
+    """
+    Combine fetched Jira issues with the snapshot rows they supersede.
+
+    Returns:
+        (rows to summarize, their comment threads, unchanged snapshot rows);
+        with a snapshot, fetched issues that are no longer open are dropped
+    """
+    processed_issues = []
+    issue_comments = []
+    for issue in issues:
+        row, comments = extract_issue(issue, since)
+        if snapshot_rows and row['status'] not in REPORT_STATUSES:
+            continue
+        processed_issues.append(row)
+        issue_comments.append(comments)
+
+    fetched_keys = {issue.get('key') for issue in issues}
+    unchanged = [dict(r, is_stale=is_stale_update(r['updated'], since))
+                 for r in snapshot_rows if r['key'] not in fetched_keys]
+    return processed_issues, issue_comments, unchanged
+
+def updated_after(updated, moment):
+    """True if a Jira `updated` timestamp ('2025-10-01T01:00:00.000+0000') is at or after an aware datetime."""
+    try:
+        return datetime.datetime.strptime(updated, "%Y-%m-%dT%H:%M:%S.%f%z") >= moment
+    except (TypeError, ValueError):
+        return True
+
+def minutes_since(timestamp):
+    """Whole minutes since a SQLite CURRENT_TIMESTAMP value (UTC)."""
+    taken = datetime.datetime.strptime(timestamp[:19], "%Y-%m-%d %H:%M:%S")
+    return int((datetime.datetime.utcnow() - taken).total_seconds() // 60)
+
+def generate_realtime_report(progress_callback=None, provider=None, stream_tokens=False, project=None, jql=None,
+                             resume=None, on_summary=None):
+    """
+    Generate a weekly report from the latest snapshot plus the issues updated since.
     
+    The report starts from the latest snapshot's open issues of the project and
+    only fetches issues updated after it was taken (a relative JQL window, so
+    Jira's timezone doesn't matter), plus snapshot issues that have no summary
+    yet. Only those fetched issues go to the LLM. Without a usable snapshot, or
+    with a custom JQL that can't be evaluated against the snapshot, all matching
+    issues are fetched as before.
+
     Args:
         progress_callback: Optional function(current, total, status, issue_key) for progress updates
         provider: Optional LLM provider override ('openai', 'cambrian', etc.)
+        stream_tokens: Also yield {"type": "token", "issue_key", "delta"} events with partial
+            LLM output as it is generated (disables multi-issue packing)
+        project: Jira project key (default REPORT_PROJECT, then "THRPI")
+        jql: Custom JQL (default REPORT_JQL); always fetched in full
+        resume: Optional {issue_key: summary} checkpointed by an earlier run; those
+            issues are not sent to the LLM again
+        on_summary: Optional function(issue_key, summary) called as each summary is ready
     
     Yields:
         Progress updates as dict, final yield is the complete report
@@ -32,92 +193,183 @@ def generate_realtime_report(progress_callback=None, provider=None):
     seven_days_ago = now - datetime.timedelta(days=7)
     date_str = now.strftime("%Y-%m-%d")
     start_date = seven_days_ago.strftime("%Y-%m-%d")
-    
-    # Build JQL for all open issues (no date filter)
-    jql = f'project = "THRPI" AND status IN ("New", "Open", "In Progress")'
-    
-    yield {"type": "progress", "current": 0, "total": 0, "status": "Fetching issues from Jira...", "issue_key": None}
+
+    jql = jql or os.getenv("REPORT_JQL")
+    project = project or os.getenv("REPORT_PROJECT", "THRPI")
+
+    snapshot, snapshot_rows = (None, []) if jql else load_snapshot_issues(project)
+    missing = [r['key'] for r in snapshot_rows if not has_usable_summary(r)]
+    if len(missing) > MAX_BACKFILL_KEYS:
+        snapshot_rows = []
+
+    untouched = None
+    if snapshot_rows:
+        # Small margin so nothing updated while the snapshot ran is missed
+        window_minutes = minutes_since(snapshot['timestamp']) + 10
+        window_start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=window_minutes + 1)
+        # Open issues not updated since the snapshot can only come from the snapshot,
+        # whose query (JIRA_JQL_QUERY) may not cover every open issue of the project
+        untouched = count_issues(jira_url, f"{report_jql(project)} AND updated < -{window_minutes}m", email, api_token)
+        if untouched is not None and untouched > len(snapshot_rows):
+            print(f"Snapshot has {len(snapshot_rows)} open issues, {untouched} not updated since; fetching all")
+            snapshot_rows = []
+
+    if snapshot_rows:
+        window = f"updated >= -{window_minutes}m"
+        if missing:
+            window = f'({window} OR key in ({", ".join(json.dumps(key) for key in missing)}))'
+        fetch_jql = f'project = "{project}" AND {window}'
+        yield {"type": "progress", "current": 0, "total": 0,
+               "status": f"Fetching issues updated since snapshot #{snapshot['snapshot_id']}...", "issue_key": None}
+    else:
+        snapshot_rows = []
+        fetch_jql = jql or report_jql(project)
+        yield {"type": "progress", "current": 0, "total": 0, "status": "Fetching issues from Jira...", "issue_key": None}
     
     # Fetch issues from Jira
-    issues = fetch_issues(jira_url, jql, email, api_token)
-    total_issues = len(issues)
+    if snapshot_rows:
+        try:
+            # "warn": a listed key that was deleted or moved does not reject the whole query
+            issues = fetch_issues(jira_url, fetch_jql, email, api_token, validate_query="warn", raise_errors=True)
+        except JiraQueryError as e:
+            print(f"Delta query rejected ({e}); fetching all issues")
+            snapshot_rows = []
+            issues = fetch_issues(jira_url, report_jql(project), email, api_token)
+    else:
+        issues = fetch_issues(jira_url, fetch_jql, email, api_token)
+
+    processed_issues, issue_comments, unchanged = merge_with_snapshot(issues, snapshot_rows, seven_days_ago)
+
+    # Rarely the snapshot still misses some untouched open issues (its rows that
+    # were updated since hid the shortfall above); then fetch them all instead
+    if snapshot_rows and untouched is not None:
+        updated_keys = {i.get('key') for i in issues if updated_after(i.get('fields', {}).get('updated'), window_start)}
+        covered = sum(1 for r in snapshot_rows if r['key'] not in updated_keys)
+        if covered < untouched:
+            print(f"Snapshot covers {covered} of {untouched} open issues not updated since; fetching all")
+            yield {"type": "progress", "current": 0, "total": 0, "status": "Fetching issues from Jira...", "issue_key": None}
+            issues = fetch_issues(jira_url, report_jql(project), email, api_token)
+            snapshot_rows = []
+            processed_issues, issue_comments, unchanged = merge_with_snapshot(issues, [], seven_days_ago)
+
+    to_summarize = len(processed_issues)
+    total_issues = to_summarize + len(unchanged)
     
     if total_issues == 0:
         yield {"type": "progress", "current": 0, "total": 0, "status": "No issues found", "issue_key": None}
         yield {"type": "complete", "content": "# Weekly Report\n\nNo issues found for the last 7 days.", "filename": f"weekly_report_{date_str}.md"}
         return
     
-    yield {"type": "progress", "current": 0, "total": total_issues, "status": f"Found {total_issues} issues. Starting LLM analysis...", "issue_key": None}
-    
-    # Process each issue
-    processed_issues = []
-    for idx, issue in enumerate(issues):
-        fields = issue.get('fields', {})
-        key = issue.get('key')
-        summary = fields.get('summary', '')
-        status = fields.get('status', {}).get('name', 'Unknown')
-        priority = fields.get('priority', {}).get('name', 'None')
-        assignee = fields.get('assignee', {})
-        assignee_name = assignee.get('displayName', 'Unassigned') if assignee else 'Unassigned'
-        updated = fields.get('updated', '')
-        
-        # Get comments
-        comments = fields.get('comment', {}).get('comments', [])
-        
-        yield {"type": "progress", "current": idx + 1, "total": total_issues, "status": f"Analyzing {key}...", "issue_key": key}
-        
-        # Generate LLM summary
-        llm_summary = llm_service.summarize_comments(key, summary, comments, provider=provider)
-        
-        # Get latest comment
-        latest_comment = comments[-1].get('body', '') if comments else ""
-        
-        # Check if updated recently
-        is_stale = False
-        if updated:
-            try:
-                updated_date = datetime.datetime.strptime(updated[:10], "%Y-%m-%d")
-                if updated_date < seven_days_ago:
-                    is_stale = True
-            except:
-                pass
-        
-        processed_issues.append({
-            "key": key,
-            "summary": summary,
-            "status": status,
-            "priority": priority,
-            "assignee": assignee_name,
-            "updated": updated,
-            "llm_summary": llm_summary,
-            "latest_comment": latest_comment,
-            "is_stale": is_stale
-        })
-    
-    yield {"type": "progress", "current": total_issues, "total": total_issues, "status": "Generating report...", "issue_key": None}
+    status = f"Found {total_issues} issues"
+    if snapshot_rows:
+        status += f" ({to_summarize} updated since snapshot)"
+    yield {"type": "progress", "current": 0, "total": to_summarize, "status": f"{status}. Starting LLM analysis...", "issue_key": None}
     
-    # Sort by priority (Critical/Blocker first)
-    priority_order = {
-        'Critical': 1,
-        'Blocker': 1,
-        'High': 2,
-        'Medium': 3,
-        'Low': 4,
-        'None': 5,
-        'Undecided': 5
-    }
-    processed_issues.sort(key=lambda x: priority_order.get(x['priority'], 5))
+    # Generate LLM summaries on a bounded worker pool; results are stored by
+    # position so the report order does not depend on completion order.
+    # Small threads may be packed several per call (LLM_BATCH_MAX_ISSUES),
+    # never across priority tiers.
+    items = [(item['key'], item['summary'], comments) for item, comments in zip(processed_issues, issue_comments)]
+    resume = resume or {}
+    for item in processed_issues:
+        if item['key'] in resume:
+            item['llm_summary'] = resume[item['key']]
+    groups = []
+    group_tiers = []
+    for tier in range(len(PRIORITY_TIERS)):
+        indexes = [i for i, item in enumerate(processed_issues)
+                   if priority_tier(item['priority']) == tier and item['key'] not in resume]
+        if stream_tokens:
+            tier_groups = [[i] for i in indexes]
+        else:
+            tier_groups = [[indexes[j] for j in group]
+                           for group in llm_service.plan_batches([items[i] for i in indexes], provider=provider)]
+        groups.extend(tier_groups)
+        group_tiers.extend([tier] * len(tier_groups))
+    outstanding = Counter(group_tiers)
+    # Positions in processed_issues still queued for (or being given) an LLM summary
+    waiting = {i for group in groups for i in group}
+    all_issues = processed_issues + unchanged
+
+    # Workers report tokens and finished groups through one queue, which this
+    # generator drains so all events are yielded from the consumer's thread
+    events = queue.Queue()
+
+    def run_group(n, group):
+        try:
+            on_token = None
+            if stream_tokens:
+                key = items[group[0]][0]
+                on_token = lambda delta: events.put(("token", key, delta))
+            summaries = llm_service.summarize_batch([items[i] for i in group], provider=provider, on_token=on_token)
+        except Exception as e:
+            summaries = [f"[Error: LLM summarization failed: {str(e)}]"] * len(group)
+        events.put(("done", n, summaries))
+
+    # Enough threads for the provider's adaptive limit to grow into; the limiter
+    # decides how many calls are actually in flight
+    workers = llm_service.limiter_for(provider).max_limit
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-summary")
+    try:
+        # Groups are submitted tier by tier, so the pool starts Critical/Blocker
+        # issues first, then High, then the rest
+        for n, group in enumerate(groups):
+            executor.submit(run_group, n, group)
+        done = sum(1 for item in processed_issues if item['key'] in resume)
+        next_tier = 0
+        # Issues in the last partial report; one that adds nothing is skipped
+        reported = 0
+        remaining = len(groups)
+        while True:
+            # A finished tier becomes a renderable partial report while later tiers are still running
+            while next_tier < len(PRIORITY_TIERS) and not outstanding[next_tier]:
+                if any(outstanding[t] for t in range(next_tier + 1, len(PRIORITY_TIERS))):
+                    # Every issue that has its summary: the finished tiers plus unchanged,
+                    # resumed or already summarized issues of later ones
+                    ready = [item for i, item in enumerate(processed_issues) if i not in waiting] + unchanged
+                    if len(ready) > reported:
+                        reported = len(ready)
+                        content = build_report_markdown(sort_by_priority(ready), date_str, start_date, jira_url,
+                                                        pending=len(waiting))
+                        yield {"type": "partial", "tier": PRIORITY_TIERS[next_tier][0], "content": content,
+                               "filename": f"weekly_report_{date_str}_partial.md", "issue_count": len(ready)}
+                next_tier += 1
+            if not remaining:
+                break
+
+            kind, ref, payload = events.get()
+            if kind == "token":
+                yield {"type": "token", "issue_key": ref, "delta": payload}
+                continue
+            remaining -= 1
+            outstanding[group_tiers[ref]] -= 1
+            for i, llm_summary in zip(groups[ref], payload):
+                processed_issues[i]['llm_summary'] = llm_summary
+                waiting.discard(i)
+                done += 1
+                key = processed_issues[i]['key']
+                if on_summary:
+                    on_summary(key, llm_summary)
+                yield {"type": "progress", "current": done, "total": to_summarize, "status": f"Analyzed {key}", "issue_key": key}
+    finally:
+        # Stop queued work if the consumer goes away mid-report
+        executor.shutdown(wait=False, cancel_futures=True)
     
-    # Build report
-    report_content = build_report_markdown(processed_issues, date_str, start_date, jira_url)
+    yield {"type": "progress", "current": to_summarize, "total": to_summarize, "status": "Generating report...", "issue_key": None}
+
+    # Build report (Critical/Blocker first)
+    report_content = build_report_markdown(sort_by_priority(all_issues), date_str, start_date, jira_url)
     
     yield {"type": "complete", "content": report_content, "filename": f"weekly_report_{date_str}.md", "issue_count": total_issues}
 
 
-def build_report_markdown(issues, date_str, start_date, jira_url):
-    """Build the markdown report from processed issues."""
+def build_report_markdown(issues, date_str, start_date, jira_url, pending=0):
+    """Build the markdown report from processed issues (pending: issues still waiting for their summary, for partial reports)."""
     lines = []
     lines.append(f"# Weekly Jira Update Report - {date_str}\n")
+    if pending:
+        lines.append(f"> [!IMPORTANT]")
+        lines.append(f"> Partial report: {pending} lower-priority issues are still being summarized.\n")
     lines.append(f"> [!NOTE]")
     lines.append(f"> This report includes issues in **New**, **Open**, or **In Progress** status that have been updated in the last 7 days.\n")
     
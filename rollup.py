@@ -0,0 +1,185 @@
+"""
+Assignee x component x priority rollup cube of bug counts.
+
+For every snapshot, issue_rollups holds open and total bug counts for every
+combination of assignee, component and priority, including the subtotals
+where any of them is rolled up to ALL ("*"), for all bugs and for each label
+in ROLLUP_LABELS. A drill-down slice or a trend of one slice over time is then
+an indexed lookup instead of a GROUP BY over the issues of each snapshot.
+
+Bugs with several components count once per component, and once in the
+component "*" subtotal. The cube is written at ingestion by save_snapshot;
+`python rollup.py --rebuild` recomputes it for all snapshots.
+"""
+import sqlite3
+import argparse
+
+DB_NAME = "dashboard.db"
+
+# Same "open" as the dashboard's breakdown pies (backend/read_model.py)
+OPEN_STATUSES = ('New', 'Open', 'In Progress')
+
+# Rolled-up ("any value") marker in every dimension column
+ALL = "*"
+DIMENSIONS = ("assignee", "component", "priority")
+# Label filters precomputed besides "all bugs" (the Gate dashboard's label)
+ROLLUP_LABELS = ("OS_FCS",)
+NO_COMPONENT = "(none)"
+
+
+def _components(value):
+    return [c.strip() for c in (value or "").split(",") if c.strip()] or [NO_COMPONENT]
+
+
+def cube(rows):
+    """
+    {(label, assignee, component, priority): [open, total]} for one snapshot's bugs.
+
+    Args:
+        rows: Iterable of (assignee, component, priority, status, labels) tuples
+    """
+    counts = {}
+    for assignee, component, priority, status, labels in rows:
+        is_open = status in OPEN_STATUSES
+        labels = (labels or "").lower()
+        scopes = [ALL] + [label for label in ROLLUP_LABELS if label.lower() in labels]
+        assignees = (assignee or "Unassigned", ALL)
+        components = (*_components(component), ALL)
+        priorities = (priority or "None", ALL)
+        for scope in scopes:
+            for a in assignees:
+                for c in components:
+                    for p in priorities:
+                        entry = counts.setdefault((scope, a, c, p), [0, 0])
+                        entry[0] += is_open
+                        entry[1] += 1
+    return counts
+
+
+def update_snapshot(conn, snapshot_id):
+    """Write the rollups of one snapshot from its issue rows (part of the caller's transaction)."""
+    rows = conn.execute('''
+        SELECT assignee, component, priority, status, labels
+        FROM issues WHERE snapshot_id=? AND type='Bug'
+    ''', (snapshot_id,))
+    # A snapshot without bugs still gets its (zero) total, so catch_up sees it as rolled up
+    counts = cube(rows) or {(ALL, ALL, ALL, ALL): [0, 0]}
+    conn.execute("DELETE FROM issue_rollups WHERE snapshot_id=?", (snapshot_id,))
+    conn.executemany('''
+        INSERT INTO issue_rollups (snapshot_id, label, assignee, component, priority, open_count, total_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(snapshot_id, *dims, open_count, total) for dims, (open_count, total) in counts.items()])
+
+
+def catch_up(conn):
+    """
+    Roll up every snapshot that has no rollups yet (part of the caller's transaction).
+
+    Returns False when the table does not exist (database created before rollups).
+    """
+    try:
+        missing = conn.execute('''
+            SELECT snapshot_id FROM snapshots s
+            WHERE NOT EXISTS (SELECT 1 FROM issue_rollups r WHERE r.snapshot_id = s.snapshot_id)
+        ''').fetchall()
+    except sqlite3.OperationalError:
+        return False
+    for (snapshot_id,) in missing:
+        update_snapshot(conn, snapshot_id)
+    return True
+
+
+def rebuild(conn):
+    """Recompute the rollups of all snapshots."""
+    conn.execute("DELETE FROM issue_rollups")
+    catch_up(conn)
+    conn.commit()
+
+
+# --- Queries ---
+
+def _slice_params(filters, label):
+    if label not in (ALL, *ROLLUP_LABELS):
+        raise ValueError(f"No rollups for label '{label}' (available: {', '.join(ROLLUP_LABELS)})")
+    return [label] + [filters.get(dim) or ALL for dim in DIMENSIONS]
+
+
+def slice_counts(conn, snapshot_id, filters=None, group_by=None, label=ALL):
+    """
+    Open/total bug counts of a slice, optionally broken down by one dimension.
+
+    Args:
+        filters: {dimension: value}; missing or empty dimensions are rolled up
+        group_by: Dimension to break the slice down by (not filtered on), or None for the slice total
+        label: ALL or one of ROLLUP_LABELS
+
+    Returns:
+        [{"name", "open", "total"}] by open count (one row named ALL without group_by)
+
+    Raises:
+        ValueError: Invalid group_by, a filter on the group_by dimension, or a label without rollups
+    """
+    filters = dict(filters or {})
+    if group_by is not None:
+        if group_by not in DIMENSIONS:
+            raise ValueError(f"group_by must be one of {', '.join(DIMENSIONS)}")
+        if filters.get(group_by):
+            raise ValueError(f"Cannot filter on {group_by} and group by it")
+    params = [snapshot_id] + _slice_params(filters, label)
+    conditions = ["snapshot_id=?", "label=?"]
+    for dim in DIMENSIONS:
+        conditions.append(f"{dim} != ?" if dim == group_by else f"{dim}=?")
+    name = group_by or "label"
+    rows = conn.execute(f'''
+        SELECT {name} AS name, open_count, total_count FROM issue_rollups
+        WHERE {' AND '.join(conditions)}
+        ORDER BY open_count DESC, total_count DESC, name
+    ''', params).fetchall()
+    if group_by is None:
+        return [{"name": ALL, "open": rows[0][1] if rows else 0, "total": rows[0][2] if rows else 0}]
+    return [{"name": n, "open": o, "total": t} for n, o, t in rows]
+
+
+def trend(conn, filters=None, label=ALL, limit=None):
+    """[{"snapshot_id", "timestamp", "open", "total"}] of one slice per snapshot, oldest first."""
+    params = _slice_params(filters or {}, label)
+    sql = f'''
+        SELECT s.snapshot_id, s.timestamp, COALESCE(r.open_count, 0), COALESCE(r.total_count, 0)
+        FROM snapshots s
+        LEFT JOIN issue_rollups r ON r.snapshot_id = s.snapshot_id
+            AND r.label=? AND {' AND '.join(f'r.{dim}=?' for dim in DIMENSIONS)}
+        ORDER BY s.timestamp DESC, s.snapshot_id DESC
+    '''
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    rows = conn.execute(sql, params).fetchall()
+    return [{"snapshot_id": sid, "timestamp": ts, "open": o, "total": t} for sid, ts, o, t in reversed(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assignee x component x priority bug rollups.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute rollups for all snapshots")
+    parser.add_argument("--group-by", default="assignee", choices=DIMENSIONS)
+    parser.add_argument("--label", default=ALL)
+    for dim in DIMENSIONS:
+        parser.add_argument(f"--{dim}", help=f"Only bugs with this {dim}")
+    args = parser.parse_args()
+    if getattr(args, args.group_by):
+        parser.error(f"--{args.group_by} cannot be combined with --group-by {args.group_by}")
+
+    conn = sqlite3.connect(DB_NAME)
+    if args.rebuild:
+        rebuild(conn)
+        print("Rollups rebuilt.")
+    latest = conn.execute("SELECT snapshot_id FROM snapshots ORDER BY timestamp DESC, snapshot_id DESC LIMIT 1").fetchone()
+    if latest:
+        filters = {dim: getattr(args, dim) for dim in DIMENSIONS}
+        print(f"Open bugs by {args.group_by} (snapshot {latest[0]})")
+        for row in slice_counts(conn, latest[0], filters, args.group_by, args.label):
+            print(f"  {row['name']:<30} open {row['open']:>5}  total {row['total']:>5}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
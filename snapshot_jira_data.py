@@ -4,13 +4,21 @@ import datetime
 from dotenv import load_dotenv
 from fetch_jira_data import fetch_issues
 from llm_service import llm_service
+import init_db
+import duplicates
+import analytics
+import rollup
 
 # Database configuration
 DB_NAME = "dashboard.db"
 
+# Callbacks run after a snapshot has been committed: listener(snapshot_id)
+snapshot_listeners = []
+
 def save_snapshot(issues):
     # 1. Prepare data first (heavy lifting, especially LLM calls)
     campaign_data_partial = []
+    duplicate_texts = []
     print(f"Processing {len(issues)} issues for snapshot...")
     
     for issue in issues:
@@ -49,13 +57,12 @@ def save_snapshot(issues):
             latest_comment_body = comments[-1].get('body', '')
 
         # Handle LLM Summary
-        # Disabled for snapshot performance (to prevent timeouts on Refresh Data)
-        # LLM summaries are generated on-demand for the Weekly Report.
-        llm_summary = ""
-        # if comments:
-        #     llm_summary = llm_service.summarize_comments(key, summary, comments)
-        # else:
-        #     llm_summary = ""
+        # No LLM calls here (to prevent timeouts on Refresh Data); summaries are
+        # generated on-demand for the Weekly Report and reused from the summary
+        # cache when the comment thread has not changed since.
+        llm_summary = llm_service.cached_summary(key, summary, comments) or ""
+
+        duplicate_texts.append((key, duplicates.issue_text(summary, fields.get('description'))))
 
         # Store tuple without snapshot_id for now
         campaign_data_partial.append((
@@ -68,6 +75,9 @@ def save_snapshot(issues):
     conn = sqlite3.connect(DB_NAME, timeout=30.0) # Increase timeout just in case
     cursor = conn.cursor()
 
+    # Duplicate-detection signatures of issues whose text changed (read-only, before the write)
+    signature_updates = duplicates.prepare_signatures(conn, duplicate_texts)
+
     try:
         # Create a new snapshot record
         total_count = len(issues)
@@ -91,6 +101,16 @@ def save_snapshot(issues):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', campaign_data)
 
+        # Keep the full-text search index in step with the new rows
+        init_db.index_snapshot(conn, snapshot_id)
+        duplicates.store_signatures(conn, signature_updates)
+        # Aging / cycle-time sketches of this snapshot (a history not folded in
+        # yet is replayed at backend startup, not inside this transaction)
+        if not analytics.update_latest(conn, snapshot_id):
+            print("Analytics are behind; they catch up when the backend starts (or run analytics.py --rebuild).")
+        # Drill-down rollup cube of this snapshot
+        rollup.update_snapshot(conn, snapshot_id)
+
         conn.commit()
         print("Snapshot data saved successfully.")
     except Exception as e:
@@ -100,6 +120,14 @@ def save_snapshot(issues):
     finally:
         conn.close()
 
+    for listener in snapshot_listeners:
+        try:
+            listener(snapshot_id)
+        except Exception as e:
+            print(f"Snapshot listener failed: {e}")
+
+    return snapshot_id
+
 def main():
     # Ensure DB exists
     if not os.path.exists(DB_NAME):
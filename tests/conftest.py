@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Root scripts (init_db, analytics, ...) and the backend package import from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import init_db
+
+
+@pytest.fixture
+def connect(tmp_path):
+    """Connection factory for a fresh database with the full schema."""
+    db_path = str(tmp_path / "dashboard.db")
+
+    def _connect():
+        conn = sqlite3.connect(db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    conn = _connect()
+    init_db.apply_schema(conn)
+    conn.close()
+    return _connect
+
+
+ISSUE_DEFAULTS = {"summary": "", "status": "Open", "priority": "Medium", "assignee": None,
+                  "created_date": "2025-01-01 00:00:00", "resolution_date": None, "type": "Bug",
+                  "component": None, "reporter": None, "updated_date": "2025-01-01 00:00:00",
+                  "labels": "", "latest_comment": None, "llm_summary": None}
+
+
+@pytest.fixture
+def add_snapshot(connect):
+    """Store a snapshot of issues ({"key": ..., column: value}; other columns defaulted), returning its id."""
+    def _add_snapshot(issues, timestamp="2025-03-01 09:00:00"):
+        conn = connect()
+        try:
+            snapshot_id = conn.execute("INSERT INTO snapshots (timestamp, total_issues) VALUES (?, ?)",
+                                       (timestamp, len(issues))).lastrowid
+            for issue in issues:
+                row = {**ISSUE_DEFAULTS, **issue, "snapshot_id": snapshot_id}
+                conn.execute(f"INSERT INTO issues ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+                             list(row.values()))
+            init_db.index_snapshot(conn, snapshot_id)
+            conn.commit()
+        finally:
+            conn.close()
+        return snapshot_id
+    return _add_snapshot
+
+
+@pytest.fixture
+def api(connect, monkeypatch):
+    """TestClient for the API on the test database (startup hooks not run)."""
+    from fastapi.testclient import TestClient
+    from backend import main, read_model, services
+    from backend.response_cache import response_cache
+
+    monkeypatch.setattr(services, "get_db_connection", connect)
+    monkeypatch.setattr(read_model, "_current", None)
+    response_cache.clear()
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def llm(connect, tmp_path, monkeypatch):
+    """LLMService factory (env overrides as keywords) whose summary cache is the test database."""
+    import llm_cache
+    import llm_service
+
+    db_path = str(tmp_path / "dashboard.db")
+    monkeypatch.setattr(llm_service, "summary_cache", llm_cache.SummaryCache(db_path))
+    monkeypatch.setattr(llm_service, "rolling_store", llm_cache.RollingSummaryStore(db_path))
+
+    def _llm(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return llm_service.LLMService()
+    return _llm
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+import adaptive_limiter
+from adaptive_limiter import AdaptiveLimiter
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": {"Retry-After": retry_after} if retry_after else {}})()
+
+
+def saturate(limiter, latency=0.0):
+    """Release a call while every slot is in use."""
+    limiter.inflight = int(limiter.limit)
+    limiter.release(latency)
+    limiter.inflight = 0
+
+
+def test_limit_grows_additively_only_when_saturated():
+    limiter = AdaptiveLimiter("test", initial=2, max_limit=4)
+    with limiter.track():
+        pass
+    assert limiter.limit == 2
+
+    for _ in range(2):
+        saturate(limiter)
+    # +1/limit per saturated success: about one per window of completed calls
+    assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    for _ in range(20):
+        saturate(limiter)
+    assert limiter.limit == 4
+
+
+def test_overload_halves_limit_once_per_window():
+    limiter = AdaptiveLimiter("test", initial=8)
+    for _ in range(3):
+        with pytest.raises(RateLimited):
+            with limiter.track():
+                raise RateLimited()
+
+    # Calls in flight together fail together: one cut
+    assert limiter.limit == 4
+    assert limiter.stats()["overloads"] == 3
+    # The next overload after the window cuts again
+    limiter.last_decrease -= 2
+    with limiter.track() as call:
+        call.overloaded()
+    assert limiter.limit == 2
+
+
+def test_latency_spike_counts_as_overload():
+    limiter = AdaptiveLimiter("test", initial=8)
+    for _ in range(adaptive_limiter.MIN_SAMPLES):
+        limiter.inflight += 1
+        limiter.release(0.1)
+    limiter.inflight += 1
+    limiter.release(0.1 * adaptive_limiter.LATENCY_SPIKE_FACTOR * 2)
+
+    assert limiter.limit == 4
+    assert limiter.stats()["overloads"] == 1
+
+
+def test_other_errors_leave_the_limit_alone():
+    limiter = AdaptiveLimiter("test", initial=4)
+    with pytest.raises(KeyError):
+        with limiter.track():
+            raise KeyError("bug")
+
+    assert limiter.limit == 4
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_retry_after_pauses_new_calls():
+    limiter = AdaptiveLimiter("test", initial=4)
+    with pytest.raises(RateLimited):
+        with limiter.track():
+            raise RateLimited(retry_after="0.3")
+    assert limiter.stats()["paused_seconds"] > 0
+
+    start = time.monotonic()
+    with limiter.track():
+        pass
+    assert time.monotonic() - start >= 0.25
+
+
+def test_calls_beyond_the_limit_wait_for_a_slot():
+    limiter = AdaptiveLimiter("test", initial=2, max_limit=2)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def call():
+        with limiter.track():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+    assert limiter.stats()["successes"] == 8
+
+
+def test_env_bounds_apply_on_first_use(monkeypatch):
+    monkeypatch.setattr(adaptive_limiter, "_limiters", {})
+    monkeypatch.setenv("LIMIT_LLM_CAMBRIAN_MAX", "6")
+
+    limiter = adaptive_limiter.get_limiter("llm_cambrian", initial=8, max_limit=32)
+
+    assert (limiter.limit, limiter.max_limit) == (6, 6)
+    assert adaptive_limiter.get_limiter("llm_cambrian", max_limit=64) is limiter
@@ -0,0 +1,101 @@
+import random
+
+import analytics
+from analytics import QuantileSketch
+
+
+def sketch_of(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(2.0, 1.5) for _ in range(5000))
+    sketch = sketch_of(values)
+
+    for q in (0.01, 0.25, 0.5, 0.75, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= analytics.RELATIVE_ACCURACY * exact * (1 + 1e-9)
+
+
+def test_sketch_merge_equals_sketch_of_union():
+    rng = random.Random(11)
+    first = [rng.expovariate(0.1) for _ in range(1000)] + [0.0] * 10
+    second = [rng.expovariate(0.02) for _ in range(700)]
+
+    merged = sketch_of(first)
+    merged.merge(sketch_of(second))
+    union = sketch_of(first + second)
+
+    assert (merged.bins, merged.zero_count, merged.count) == (union.bins, union.zero_count, union.count)
+    restored = QuantileSketch.from_json(merged.to_json())
+    assert [restored.quantile(q) for q in (0.1, 0.5, 0.9)] == [union.quantile(q) for q in (0.1, 0.5, 0.9)]
+
+
+def add_snapshot(conn, timestamp, bugs):
+    """bugs: [(key, status, priority, component)]"""
+    snapshot_id = conn.execute("INSERT INTO snapshots (timestamp, total_issues) VALUES (?, ?)",
+                               (timestamp, len(bugs))).lastrowid
+    conn.executemany('''
+        INSERT INTO issues (snapshot_id, key, status, priority, component, created_date, type)
+        VALUES (?, ?, ?, ?, ?, '2025-01-01 00:00:00', 'Bug')
+    ''', [(snapshot_id, *bug) for bug in bugs])
+    return snapshot_id
+
+
+def time_in_status(conn, dimension):
+    return {value: entry["count"] for value, entry in analytics.percentiles(conn, "time_in_status", dimension).items()}
+
+
+def test_catch_up_processes_snapshot_with_same_timestamp(connect):
+    conn = connect()
+    add_snapshot(conn, "2025-03-01 09:00:00", [("BUG-1", "Open", "High", "ui")])
+    analytics.catch_up(conn)
+    # Saved within the same second as the one already processed
+    second = add_snapshot(conn, "2025-03-01 09:00:00", [("BUG-1", "In Progress", "High", "ui")])
+    analytics.catch_up(conn)
+
+    assert conn.execute("SELECT snapshot_id FROM analytics_progress").fetchone()[0] == second
+    assert time_in_status(conn, "all") == {"all|Open": 1}
+    conn.close()
+
+
+def test_time_in_status_counted_under_priority_and_component_held(connect):
+    conn = connect()
+    add_snapshot(conn, "2025-03-01 09:00:00", [("BUG-1", "Open", "High", "ui")])
+    add_snapshot(conn, "2025-03-08 09:00:00", [("BUG-1", "Open", "High", "ui")])
+    # Escalated and moved to another component as work starts
+    add_snapshot(conn, "2025-03-15 09:00:00", [("BUG-1", "In Progress", "Critical", "backend")])
+    analytics.catch_up(conn)
+
+    assert time_in_status(conn, "priority") == {"High|Open": 1}
+    assert time_in_status(conn, "component") == {"ui|Open": 1}
+    days = analytics.percentiles(conn, "time_in_status")["all|Open"]["p50"]
+    assert abs(days - 14.0) <= 14.0 * analytics.RELATIVE_ACCURACY
+    conn.close()
+
+
+def test_snapshot_save_folds_in_only_the_new_snapshot(connect, monkeypatch):
+    from backend import services
+    conn = connect()
+    add_snapshot(conn, "2025-03-01 09:00:00", [("BUG-1", "Open", "High", "ui")])
+    add_snapshot(conn, "2025-03-08 09:00:00", [("BUG-1", "Open", "High", "ui")])
+    # History never folded in: a save leaves it (and itself) to startup
+    third = add_snapshot(conn, "2025-03-15 09:00:00", [("BUG-1", "In Progress", "High", "ui")])
+    assert analytics.update_latest(conn, third) is False
+    assert conn.execute("SELECT COUNT(*) FROM analytics_progress").fetchone()[0] == 0
+    conn.commit()
+
+    monkeypatch.setattr(services, "get_db_connection", connect)
+    services.ensure_schema()
+    assert conn.execute("SELECT snapshot_id FROM analytics_progress").fetchone()[0] == third
+    assert time_in_status(conn, "all") == {"all|Open": 1}
+
+    fourth = add_snapshot(conn, "2025-03-22 09:00:00", [("BUG-1", "Closed", "High", "ui")])
+    assert analytics.update_latest(conn, fourth) is True
+    assert conn.execute("SELECT snapshot_id FROM analytics_progress").fetchone()[0] == fourth
+    assert analytics.pending_snapshots(conn) == []
+    conn.close()
@@ -0,0 +1,82 @@
+import base64
+import json
+
+import pytest
+
+from backend import read_model
+
+PRIORITIES = ("Critical", "High", "Medium", "Low")
+
+
+@pytest.fixture
+def backlog(add_snapshot):
+    """250 open bugs, 20 closed ones (10 in the Gate label) and 5 open tasks."""
+    issues = [{"key": f"BUG-{n}", "priority": PRIORITIES[n % 4], "labels": "OS_FCS" if n < 100 else ""}
+              for n in range(250)]
+    issues += [{"key": f"BUG-{n}", "status": "Closed", "labels": "OS_FCS" if n % 2 else ""} for n in range(250, 270)]
+    issues += [{"key": f"TASK-{n}", "type": "Task"} for n in range(5)]
+    add_snapshot(issues)
+
+
+def all_pages(api, url, **params):
+    keys, pages, cursor = [], 0, None
+    while True:
+        response = api.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        keys += [bug["key"] for bug in response.json()]
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return keys, pages
+
+
+def test_bugs_are_paged_by_default(api, backlog):
+    response = api.get("/api/bugs")
+
+    assert len(response.json()) == 100
+    assert response.headers["x-total-count"] == "250"
+    assert response.headers["x-next-cursor"]
+    assert json.loads(response.headers["x-status-counts"]) == {"Open": 250}
+
+
+def test_cursor_walks_every_bug_once_in_sort_order(api, backlog):
+    keys, pages = all_pages(api, "/api/bugs", sort="key", order="desc")
+
+    assert pages == 3
+    assert keys == [f"BUG-{n}" for n in range(249, -1, -1)]
+
+
+def test_gate_bugs_exclude_closed_unless_asked(api, backlog):
+    open_keys, _ = all_pages(api, "/api/gate/bugs")
+    all_keys, _ = all_pages(api, "/api/gate/bugs", include_closed="true")
+
+    assert len(open_keys) == 100
+    assert len(all_keys) == 110
+    response = api.get("/api/gate/bugs", params={"include_closed": "true"})
+    assert json.loads(response.headers["x-status-counts"]) == {"Open": 100, "Closed": 10}
+
+
+def test_filters_apply_before_paging(api, backlog):
+    keys, _ = all_pages(api, "/api/bugs", priority="Critical,High", q="bug-1", limit=7)
+
+    expected = {f"BUG-{n}" for n in range(250) if n % 4 < 2 and str(n).startswith("1")}
+    assert sorted(keys) == sorted(expected)
+    assert len(keys) == len(expected)
+
+
+def test_cursor_round_trip():
+    cursor = read_model.encode_cursor("created", True, ("2025-01-01", "BUG", 7))
+
+    assert read_model.decode_cursor(cursor) == ("created", True, ("2025-01-01", "BUG", 7))
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b'["drop table",false,[]]').decode(),  # unknown sort key
+    read_model.encode_cursor("priority", False, ["x"]),            # wrong shape for the sort key
+    read_model.encode_cursor("key", False, ["BUG", 7])[:-4] + "!!",  # truncated
+])
+def test_tampered_cursor_is_rejected(api, backlog, cursor):
+    response = api.get("/api/bugs", params={"cursor": cursor})
+
+    assert response.status_code == 400
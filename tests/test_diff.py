@@ -0,0 +1,81 @@
+from backend import diff
+
+
+def keys(entries):
+    return [entry["key"] for entry in entries]
+
+
+def test_categorize():
+    before = {"status": "Open", "priority": "Medium", "assignee": "amy"}
+
+    assert diff.categorize(before, {**before, "status": "Closed", "assignee": "bob"}) == (
+        ["closed", "reassigned"], {"status": ["Open", "Closed"], "assignee": ["amy", "bob"]})
+    assert diff.categorize({**before, "status": "Resolved"}, before)[0] == ["reopened"]
+    assert diff.categorize(before, {**before, "status": "In Progress"})[0] == ["status"]
+    assert diff.categorize(before, {**before, "priority": "Critical"}) == (
+        ["priority"], {"priority": ["Medium", "Critical"], "escalated": True})
+    assert diff.categorize(before, {**before, "priority": None})[1]["escalated"] is False
+    assert diff.categorize(before, dict(before)) == ([], {})
+
+
+def test_diff_snapshots(connect, add_snapshot):
+    old = add_snapshot([
+        {"key": "BUG-1", "status": "Open"},
+        {"key": "BUG-2", "status": "Open", "assignee": "amy"},
+        {"key": "BUG-3", "status": "Closed"},
+        {"key": "BUG-4", "priority": "Low"},
+        {"key": "BUG-5", "summary": "Only the summary changes"},
+        {"key": "BUG-6", "labels": "OS_FCS"},
+        {"key": "TASK-1", "type": "Task"},
+    ], timestamp="2025-03-01 09:00:00")
+    new = add_snapshot([
+        {"key": "BUG-1", "status": "Closed", "assignee": "bob"},
+        {"key": "BUG-2", "status": "In Progress", "assignee": "amy"},
+        {"key": "BUG-3", "status": "Open"},
+        {"key": "BUG-4", "priority": "Critical"},
+        {"key": "BUG-5", "summary": "Reworded"},
+        {"key": "BUG-7", "labels": "OS_FCS"},
+        {"key": "TASK-1", "type": "Task", "status": "Closed"},
+        {"key": "TASK-2", "type": "Task"},
+    ], timestamp="2025-03-08 09:00:00")
+    conn = connect()
+
+    changes = diff.diff_snapshots(conn, old, new, jira_base="https://jira")
+
+    assert {category: keys(entries) for category, entries in changes.items()} == {
+        "new": ["BUG-7"], "removed": ["BUG-6"], "closed": ["BUG-1"], "reopened": ["BUG-3"],
+        "priority": ["BUG-4"], "reassigned": ["BUG-1"], "status": ["BUG-2"],
+    }
+    assert changes["closed"][0]["changes"] == {"status": ["Open", "Closed"], "assignee": [None, "bob"]}
+    assert changes["closed"][0]["link"] == "https://jira/browse/BUG-1"
+
+    labelled = diff.diff_snapshots(conn, old, new, label_filter="os_fcs")
+    assert keys(labelled["new"]) == ["BUG-7"] and keys(labelled["removed"]) == ["BUG-6"]
+    assert not labelled["closed"]
+    everything = diff.diff_snapshots(conn, old, new, bugs_only=False)
+    assert keys(everything["new"]) == ["BUG-7", "TASK-2"]
+    assert keys(everything["closed"]) == ["BUG-1", "TASK-1"]
+    conn.close()
+
+
+def test_snapshot_before(connect, add_snapshot):
+    first = add_snapshot([], timestamp="2025-03-01 09:00:00")
+    week = add_snapshot([], timestamp="2025-03-04 09:00:00")
+    latest = add_snapshot([], timestamp="2025-03-11 09:00:00")
+    conn = connect()
+
+    assert diff.snapshot_before(conn, latest) == week
+    assert diff.snapshot_before(conn, latest, days=30) == first  # nothing that old: the oldest one
+    assert diff.snapshot_before(conn, first) is None
+    conn.close()
+
+
+def test_diff_endpoint(api, add_snapshot):
+    add_snapshot([{"key": "BUG-1"}], timestamp="2025-03-01 09:00:00")
+    assert api.get("/api/diff").status_code == 404
+
+    add_snapshot([{"key": "BUG-1", "status": "Closed"}], timestamp="2025-03-08 09:00:00")
+    body = api.get("/api/diff").json()
+    assert body["from"]["timestamp"] == "2025-03-01 09:00:00"
+    assert body["counts"]["closed"] == 1
+    assert api.get("/api/diff", params={"from": 99}).status_code == 404
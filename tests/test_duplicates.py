@@ -0,0 +1,37 @@
+import random
+
+import duplicates
+
+WORDS = ("crash null pointer login page timeout render upload retry cache "
+         "session token expired dashboard filter export report memory leak").split()
+
+
+def exact_jaccard(text_a, text_b):
+    a, b = duplicates.shingles(text_a), duplicates.shingles(text_b)
+    return len(a & b) / len(a | b)
+
+
+def reference_signature(text):
+    """The MinHash definition, one permutation and shingle at a time."""
+    hashes = duplicates.shingles(text)
+    return [min((a * h + b) % duplicates._PRIME for h in hashes) for a, b in duplicates._PERMUTATIONS]
+
+
+def test_signature_matches_reference():
+    text = "Login page crashes with a null pointer when the session token expired"
+    assert duplicates.signature(text) == reference_signature(text)
+    assert duplicates.signature("  ... ") is None
+
+
+def test_similarity_close_to_exact_jaccard():
+    rng = random.Random(3)
+    for _ in range(20):
+        base = [rng.choice(WORDS) for _ in range(40)]
+        edited = list(base)
+        for i in rng.sample(range(len(edited)), rng.randint(0, 30)):
+            edited[i] = rng.choice(WORDS)
+        text_a, text_b = " ".join(base), " ".join(edited)
+
+        estimate = duplicates.similarity(duplicates.signature(text_a), duplicates.signature(text_b))
+        # Standard error of a 128-permutation estimate is at most 0.045
+        assert abs(estimate - exact_jaccard(text_a, text_b)) <= 0.15
@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+
+import forecast
+
+
+def weeks_to_zero(open_now, net_by_week, draws):
+    week_draws = np.array(draws, dtype=np.int16)
+    paths = forecast.simulate(open_now, np.array(net_by_week, dtype=np.float32), week_draws)
+    return forecast.convergence_weeks(paths, open_now).tolist()
+
+
+def test_convergence_weeks_on_hand_built_series():
+    horizon = 6
+    # Historical weeks: 3 fixed more than arrived, then 1 more arrived than fixed
+    net = [-3.0, 1.0]
+    draws = [
+        [0] * horizon,                # 6, 3, 0: zero in week 2
+        [1, 0, 0, 0, 0, 0],           # 7, 4, 1, -2: week 4
+        [1] * horizon,                # only grows: never
+        [0, 1, 0, 1, 0, 1],           # 3, 4, 1, 2, -1: week 5
+    ]
+
+    assert weeks_to_zero(6, net, draws) == [2.0, 4.0, math.inf, 5.0]
+
+
+def test_convergence_weeks_zero_when_nothing_open():
+    assert weeks_to_zero(0, [1.0], [[0, 0], [0, 0]]) == [0.0, 0.0]
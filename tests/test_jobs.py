@@ -0,0 +1,148 @@
+import time
+
+from backend import jobs
+from backend.jobs import JobQueue
+
+
+def wait_for(queue, job_id, statuses=jobs.FINISHED_STATUSES, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {queue.get(job_id)['status']}")
+
+
+def insert_running_job(connect, heartbeat_age_seconds, dedupe_key="snapshot"):
+    conn = connect()
+    cursor = conn.execute(f'''
+        INSERT INTO jobs (kind, dedupe_key, status, started_at, heartbeat_at)
+        VALUES ('snapshot', ?, 'running', datetime('now', '-1 hour'),
+                datetime('now', '-{heartbeat_age_seconds} seconds'))
+    ''', (dedupe_key,))
+    conn.commit()
+    conn.close()
+    return cursor.lastrowid
+
+
+def test_enqueue_requeues_job_left_running_by_crashed_process(connect):
+    orphan_id = insert_running_job(connect, jobs.STALE_AFTER_SECONDS + 60)
+    queue = JobQueue(connect, poll_interval=0.05)
+    queue.register("snapshot", lambda ctx: {"ran": ctx.job_id})
+
+    job, created = queue.enqueue("snapshot", dedupe_key="snapshot")
+
+    # Coalesced into the orphan, which is back in the queue instead of "running" forever
+    assert not created
+    assert job['job_id'] == orphan_id
+    assert job['status'] == 'queued'
+
+    queue.start()
+    try:
+        finished = wait_for(queue, orphan_id)
+    finally:
+        queue.stop()
+    assert finished['status'] == 'succeeded'
+    assert finished['result'] == {"ran": orphan_id}
+
+
+def test_enqueue_coalesces_into_live_running_job(connect):
+    live_id = insert_running_job(connect, 5)
+    queue = JobQueue(connect)
+
+    job, created = queue.enqueue("snapshot", dedupe_key="snapshot")
+
+    assert not created
+    assert job['job_id'] == live_id
+    assert job['status'] == 'running'
+
+
+def test_worker_sweep_requeues_orphan_after_restart(connect, monkeypatch):
+    # Restarted before the orphan's heartbeat went stale: the periodic sweep picks it up later
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL_SECONDS", 0.05)
+    orphan_id = insert_running_job(connect, 5)
+    queue = JobQueue(connect, poll_interval=0.05)
+    queue.register("snapshot", lambda ctx: "done")
+    queue.start()
+    try:
+        time.sleep(0.2)
+        assert queue.get(orphan_id)['status'] == 'running'
+        conn = connect()
+        conn.execute("UPDATE jobs SET heartbeat_at=datetime('now', '-1 hour') WHERE job_id=?", (orphan_id,))
+        conn.commit()
+        conn.close()
+        assert wait_for(queue, orphan_id)['status'] == 'succeeded'
+    finally:
+        queue.stop()
+
+
+def test_running_job_heartbeats_without_progress(connect, monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_INTERVAL_SECONDS", 0.05)
+    queue = JobQueue(connect, poll_interval=0.05)
+
+    def slow_handler(ctx):
+        conn = connect()
+        conn.execute("UPDATE jobs SET heartbeat_at=datetime('now', '-1 hour') WHERE job_id=?", (ctx.job_id,))
+        conn.commit()
+        time.sleep(0.3)
+        age = conn.execute("SELECT (julianday('now') - julianday(heartbeat_at)) * 86400 FROM jobs WHERE job_id=?",
+                           (ctx.job_id,)).fetchone()[0]
+        conn.close()
+        return age
+
+    queue.register("snapshot", slow_handler)
+    job, _ = queue.enqueue("snapshot")
+    queue.start()
+    try:
+        finished = wait_for(queue, job['job_id'])
+    finally:
+        queue.stop()
+    assert finished['status'] == 'succeeded'
+    assert finished['result'] < jobs.STALE_AFTER_SECONDS
+
+
+def finish_job(connect, job_id, status):
+    conn = connect()
+    conn.execute("UPDATE jobs SET status=?, finished_at=CURRENT_TIMESTAMP WHERE job_id=?", (status, job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_retry_requeues_failed_job(connect):
+    queue = JobQueue(connect)
+    job, _ = queue.enqueue("report", dedupe_key="report:openai::")
+    finish_job(connect, job['job_id'], 'failed')
+
+    retried = queue.retry(job['job_id'])
+
+    assert retried['job_id'] == job['job_id']
+    assert retried['status'] == 'queued'
+    assert queue.retry(job['job_id']) is None  # already active again
+
+
+def test_retry_returns_active_job_with_same_dedupe_key(connect):
+    queue = JobQueue(connect)
+    old, _ = queue.enqueue("report", dedupe_key="report:openai::")
+    finish_job(connect, old['job_id'], 'cancelled')
+    new, created = queue.enqueue("report", dedupe_key="report:openai::")
+    assert created
+
+    retried = queue.retry(old['job_id'])
+
+    # No second active job generating the same report
+    assert retried['job_id'] == new['job_id']
+    assert queue.get(old['job_id'])['status'] == 'cancelled'
+
+
+def test_scheduler_exits_when_queue_stops(connect):
+    queue = JobQueue(connect)
+    thread = jobs.start_scheduler(queue, "snapshot", interval_seconds=3600)
+    assert not queue.stopping
+
+    queue.stop()
+    thread.join(timeout=2.0)
+
+    assert queue.stopping
+    assert not thread.is_alive()
+    assert queue.list("snapshot") == []
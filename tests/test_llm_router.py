@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from llm_router import CircuitBreaker, CircuitOpenError, NoFailover, ProviderRouter
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_allows_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    # A failed trial reopens the circuit for another cooldown
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setenv("LLM_FALLBACK_PROVIDERS", "backup, spare")
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "2")
+    monkeypatch.setenv("LLM_SLO_MS_PRIMARY", "50")
+    return ProviderRouter()
+
+
+def test_failure_moves_on_to_the_next_provider(router):
+    def call(provider):
+        if provider != "spare":
+            raise RuntimeError(f"{provider} is down")
+        return "answer"
+
+    assert router.call("primary", call) == ("answer", "spare")
+    assert router.call("primary", call, hedge=False) == ("answer", "spare")
+    # Two failures each: both circuits are open and skipped from now on
+    calls = []
+    assert router.call("primary", lambda p: calls.append(p) or "answer") == ("answer", "spare")
+    assert calls == ["spare"]
+    assert router.stats()["primary"]["circuit"] == "open"
+
+
+def slow_primary(release):
+    def call(provider):
+        if provider == "primary":
+            release.wait(2)
+            return "late"
+        return "hedged"
+    return call
+
+
+def test_slow_primary_is_hedged(router):
+    release = threading.Event()
+    start = time.monotonic()
+    assert router.call("primary", slow_primary(release)) == ("hedged", "backup")
+    assert time.monotonic() - start < 1
+    release.set()
+
+    # Streaming calls are never hedged
+    release = threading.Event()
+    threading.Timer(0.2, release.set).start()
+    assert router.call("primary", slow_primary(release), hedge=False) == ("late", "primary")
+
+
+def test_hedge_delay_follows_observed_latency(router):
+    assert router.hedge_delay("primary") == 0.05
+    assert router.hedge_delay("openai") == 10.0
+    for _ in range(10):
+        router.call("openai", lambda p: "fast")
+    assert router.hedge_delay("openai") < 0.05
+
+
+def test_unavailable_providers_and_open_circuits(router):
+    router.is_available = lambda provider: provider != "backup"
+    assert router.candidates("primary") == ["primary", "spare"]
+
+    for provider in ("primary", "spare"):
+        for _ in range(2):
+            router._breaker(provider).record_failure()
+    with pytest.raises(CircuitOpenError):
+        router.call("primary", lambda p: "answer")
+
+
+def test_no_failover_error_is_raised_as_is(router):
+    calls = []
+
+    def call(provider):
+        calls.append(provider)
+        error = ValueError("half streamed")
+        raise NoFailover(error) from error
+
+    with pytest.raises(ValueError, match="half streamed"):
+        router.call("primary", call, hedge=False)
+    assert calls == ["primary"]
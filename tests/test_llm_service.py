@@ -0,0 +1,256 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import llm_service
+
+COMMENTS = [
+    {"id": "1", "author": {"displayName": "Dana"}, "body": "Crashes on login with an expired token."},
+    {"id": "2", "author": {"displayName": "Sam"}, "body": "Reproduced on 2.3; fix in review."},
+]
+
+
+def fake_completions(service, fail=()):
+    """Replace provider calls; returns the list of providers called."""
+    calls = []
+
+    def complete_once(provider, prompt, max_tokens=None, on_token=None):
+        calls.append(provider)
+        service.prompts.append(prompt)
+        if provider in fail:
+            raise RuntimeError(f"{provider} is down")
+        text = f"summary by {provider}"
+        if on_token:
+            on_token(text)
+        return text
+
+    service.prompts = []
+    service._complete_once = complete_once
+    return calls
+
+
+@pytest.mark.parametrize("mode", ["full", "rolling"])
+def test_unchanged_thread_after_failover_makes_no_llm_calls(llm, mode):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_FALLBACK_PROVIDERS="ollama",
+                  LLM_SUMMARY_MODE=mode)
+    calls = fake_completions(service, fail={"openai"})
+    first = service.summarize_comments("BUG-1", "Login crash", COMMENTS)
+    assert first == "summary by ollama"
+    assert calls[-1] == "ollama"
+
+    # The next report run: openai is back, the thread has not changed
+    service = llm()
+    calls = fake_completions(service)
+    assert service.summarize_comments("BUG-1", "Login crash", COMMENTS) == first
+    assert service.cached_summary("BUG-1", "Login crash", COMMENTS, provider="openai") == first
+    assert calls == []
+
+
+def test_rolling_summary_written_by_fallback_is_updated_with_new_comments_only(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_FALLBACK_PROVIDERS="ollama",
+                  LLM_SUMMARY_MODE="rolling")
+    fake_completions(service, fail={"openai"})
+    service.summarize_comments("BUG-1", "Login crash", COMMENTS)
+
+    service = llm()
+    calls = fake_completions(service)
+    new_comment = {"id": "3", "author": {"displayName": "Dana"}, "body": "Verified the fix on staging."}
+    assert service.summarize_comments("BUG-1", "Login crash", COMMENTS + [new_comment]) == "summary by openai"
+    assert calls == ["openai"]
+    assert "summary by ollama" in service.prompts[0]
+    assert "Verified the fix" in service.prompts[0] and "Reproduced on 2.3" not in service.prompts[0]
+
+
+def long_thread(count, words=60):
+    return [{"id": str(n), "author": {"displayName": "Dana"}, "body": f"Comment {n}: " + "details " * words}
+            for n in range(count)]
+
+
+def test_chunk_lines_stays_within_budget():
+    lines = ["x" * 40] * 10  # 11 estimated tokens each
+
+    chunks = llm_service.chunk_lines(lines, 25)
+
+    assert [len(chunk) for chunk in chunks] == [2] * 5
+    assert sum(chunks, []) == lines
+    # A line over budget still gets a chunk of its own
+    assert llm_service.chunk_lines(["x" * 400, "y"], 25) == [["x" * 400], ["y"]]
+
+
+def test_long_thread_is_condensed_in_budget_sized_chunks(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_PROMPT_TOKEN_BUDGET="600",
+                  LLM_MAX_CONDENSE_CALLS="3")
+    calls = fake_completions(service)
+
+    assert service.summarize_comments("BUG-1", "Login crash", long_thread(40)) == "summary by openai"
+
+    assert calls == ["openai"] * 3
+    assert all(llm_service.estimate_tokens(prompt) <= 600 for prompt in service.prompts)
+    # The oldest chunks are dropped, the newest comments always make it in
+    assert "earlier comments omitted" in service.prompts[0]
+    assert "Comment 39:" in service.prompts[-1]
+    assert "summary by openai" in service.prompts[1] and "summary by openai" in service.prompts[2]
+
+
+def test_chunk_budget_leaves_room_for_the_running_summary(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_PROMPT_TOKEN_BUDGET="1200")
+    fake_completions(service)
+    service._summarize_thread("BUG-1", "Login crash", long_thread(4), "openai", previous="Fix in review.")
+    # A short previous summary reserves SUMMARY_MAX_TOKENS: the four comments fit one prompt
+    assert len(service.prompts) == 1
+
+    service.prompts = []
+    previous = "Earlier: " + "context " * 300  # ~600 tokens
+    service._summarize_thread("BUG-1", "Login crash", long_thread(4), "openai", previous=previous)
+
+    assert len(service.prompts) == 2
+    assert previous in service.prompts[0]
+    assert all(llm_service.estimate_tokens(prompt) <= 1200 for prompt in service.prompts)
+
+
+def short_thread(key):
+    return [{"id": "1", "author": {"displayName": "Sam"}, "body": f"Short note on {key}."}]
+
+
+def test_plan_batches_packs_small_uncached_threads(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_BATCH_MAX_ISSUES="3")
+    fake_completions(service)
+    service.summarize_comments("BUG-4", "Cached", short_thread("BUG-4"))
+    items = [(f"BUG-{n}", f"Issue {n}", short_thread(f"BUG-{n}")) for n in range(4)]
+    items += [("BUG-4", "Cached", short_thread("BUG-4")),  # already summarized
+              ("BUG-5", "Long thread", long_thread(10)),    # over LLM_BATCH_ITEM_MAX_TOKENS
+              ("BUG-6", "No comments", []),
+              ("BUG-7", "Issue 7", short_thread("BUG-7"))]
+
+    # Groups close at LLM_BATCH_MAX_ISSUES; single-call items never join one
+    assert service.plan_batches(items) == [[0, 1, 2], [4], [5], [6], [3, 7]]
+    assert llm(LLM_BATCH_MAX_ISSUES="1").plan_batches(items) == [[i] for i in range(len(items))]
+
+
+def test_batch_falls_back_to_single_calls_for_missing_entries(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_BATCH_MAX_ISSUES="3")
+    prompts = []
+
+    def complete_once(provider, prompt, max_tokens=None, on_token=None):
+        prompts.append(prompt)
+        if "Respond with only a JSON object" in prompt:
+            return 'Sure! ```json\n{"BUG-1": "Packed summary of BUG-1", "BUG-2": ""}\n```'
+        return "Single summary"
+    service._complete_once = complete_once
+    items = [(f"BUG-{n}", f"Issue {n}", short_thread(f"BUG-{n}")) for n in range(1, 4)]
+
+    assert service.summarize_batch(items) == ["Packed summary of BUG-1", "Single summary", "Single summary"]
+    assert len(prompts) == 3
+    # Packed results are cached like single-issue summaries
+    assert service.cached_summary(*items[0]) == "Packed summary of BUG-1"
+
+
+def test_failed_batch_call_summarizes_each_issue_alone(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_BATCH_MAX_ISSUES="3")
+    calls = []
+
+    def complete_once(provider, prompt, max_tokens=None, on_token=None):
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return "Single summary"
+    service._complete_once = complete_once
+    items = [(f"BUG-{n}", f"Issue {n}", short_thread(f"BUG-{n}")) for n in range(1, 3)]
+
+    assert service.summarize_batch(items) == ["Single summary", "Single summary"]
+    assert len(calls) == 3
+
+
+def test_parse_batch_response_tolerates_prose():
+    assert llm_service.parse_batch_response('Here you go: {"A-1": "ok"} Thanks') == {"A-1": "ok"}
+    assert llm_service.parse_batch_response("no json here") == {}
+    assert llm_service.parse_batch_response('{"A-1": "unterminated}') == {}
+    assert llm_service.parse_batch_response('["A-1"]') == {}
+
+
+class FakeOpenAI:
+    """chat.completions.create() streaming the given deltas, optionally failing after them."""
+
+    def __init__(self, deltas, fail_after=False):
+        self.deltas = deltas
+        self.fail_after = fail_after
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.requests.append(request)
+        assert request.get("stream")
+        return self.chunks()
+
+    def chunks(self):
+        yield SimpleNamespace(choices=[])
+        for delta in self.deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+        if self.fail_after:
+            raise ConnectionError("stream reset")
+
+    def close(self):
+        pass
+
+
+def test_tokens_stream_as_they_arrive(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test")
+    service.client = FakeOpenAI(["Fix ", "is ", "in review. "])
+    tokens = []
+
+    assert service.summarize_comments("BUG-1", "Login crash", COMMENTS, on_token=tokens.append) == "Fix is in review."
+    assert tokens == ["Fix ", "is ", "in review. "]
+    # Served from the cache next time, still passed on as one token
+    tokens.clear()
+    assert service.summarize_comments("BUG-1", "Login crash", COMMENTS, on_token=tokens.append) == "Fix is in review."
+    assert tokens == ["Fix is in review."]
+    assert len(service.client.requests) == 1
+
+
+def test_stream_is_not_failed_over_after_output(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test", LLM_FALLBACK_PROVIDERS="cambrian",
+                  CAMBRIAN_BASE_URL="http://cambrian")
+    service.cambrian_client = FakeOpenAI(["From cambrian"])
+    tokens = []
+
+    # Nothing passed on yet: the fallback takes over
+    service.client = FakeOpenAI([], fail_after=True)
+    assert service.summarize_comments("BUG-1", "Login crash", COMMENTS, on_token=tokens.append) == "From cambrian"
+    assert tokens == ["From cambrian"]
+
+    # Half a summary already reached the viewer: the error stands
+    tokens.clear()
+    service.client = FakeOpenAI(["Fix "], fail_after=True)
+    result = service.summarize_comments("BUG-2", "Export crash", COMMENTS, on_token=tokens.append)
+    assert result.startswith("[Error")
+    assert tokens == ["Fix "]
+    assert len(service.cambrian_client.requests) == 1
+
+
+def test_provider_clients_are_created_lazily_and_reused(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="test")
+    assert service._clients == {}
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(service.client)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in seen}) == 1
+    assert service.ollama_http is service.ollama_http
+    assert set(service._clients) == {"openai", "ollama"}
+
+    service.close()
+    assert service._clients == {}
+    assert service.client is not seen[0]
+    service.close()
+
+
+def test_unconfigured_provider_has_no_client(llm):
+    service = llm(LLM_PROVIDER="openai", OPENAI_API_KEY="", CAMBRIAN_BASE_URL="")
+
+    assert service.client is None
+    assert service.cambrian_client is None
+    assert service._clients == {}
@@ -0,0 +1,36 @@
+import asyncio
+
+from backend.broker import EventBroker
+from backend.notifications import DASHBOARD_TOPIC, DashboardNotifier
+
+
+class CountingNotifier(DashboardNotifier):
+    """Reports a new snapshot on every database read."""
+
+    def __init__(self, broker):
+        super().__init__(None, broker, poll_interval=0.02)
+        self.reads = 0
+
+    def _read_state(self):
+        self.reads += 1
+        return {"snapshot_id": self.reads, "timestamp": "2025-03-01 09:00:00"}, []
+
+
+def test_no_polling_without_subscribers():
+    async def run():
+        broker = EventBroker()
+        notifier = CountingNotifier(broker)
+        notifier.start()
+        try:
+            await asyncio.sleep(0.2)
+            # Only the initial read while nobody listens
+            assert notifier.reads == 1
+
+            updates = broker.subscribe(DASHBOARD_TOPIC)
+            message = await updates.get(1.0)
+            assert message == {"type": "snapshot", "snapshot_id": 2, "timestamp": "2025-03-01 09:00:00"}
+            updates.close()
+        finally:
+            notifier.stop()
+
+    asyncio.run(run())
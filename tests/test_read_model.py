@@ -0,0 +1,89 @@
+import pytest
+
+from backend import read_model
+from backend.read_model import SnapshotReadModel, iter_bits
+
+
+def row(key, priority="Medium", status="Open", assignee=None, labels="", type="Bug", created="2025-01-01"):
+    return (key, f"Summary of {key}", priority, status, assignee, created, None, created, labels, type)
+
+
+@pytest.fixture
+def model():
+    return SnapshotReadModel(1, "2025-03-01 09:00:00", [
+        row("BUG-10", "Low", "Open", "bob", "OS_FCS, ui"),
+        row("BUG-9", "Critical", "Closed", "amy", "OS_FCS"),
+        row("BUG-2", "High", "In Progress", "amy", "backend"),
+        row("BUG-1", "Critical", "Open", None, "ui"),
+        row("TASK-1", "Critical", "Open", "bob", type="Task"),
+        row("BUG-3", "High", "New", "bob", "os_fcs_extra"),
+    ])
+
+
+def keys(model, rows):
+    return [model.keys[i] for i in rows]
+
+
+def test_rows_in_display_order(model):
+    # Priority rank, then status rank; stable for ties
+    assert model.keys == ("BUG-1", "TASK-1", "BUG-9", "BUG-3", "BUG-2", "BUG-10")
+
+
+def test_filter_bitsets(model):
+    assert keys(model, iter_bits(model.bug_filter_mask())) == ["BUG-1", "BUG-3", "BUG-2", "BUG-10"]
+    assert keys(model, iter_bits(model.bug_filter_mask(include_closed=True))) == ["BUG-1", "BUG-9", "BUG-3", "BUG-2", "BUG-10"]
+    # Substring match on labels, case-insensitive, like LIKE '%x%'
+    assert keys(model, iter_bits(model.bug_filter_mask("os_fcs", include_closed=True))) == ["BUG-9", "BUG-3", "BUG-10"]
+    assert keys(model, iter_bits(model.values_mask(model.assignee_masks, ["amy", None]))) == ["BUG-1", "BUG-9", "BUG-2"]
+    assert model.breakdown()["priority"] == [{"name": "Critical", "value": 1}, {"name": "High", "value": 2},
+                                              {"name": "Low", "value": 1}]
+
+
+def test_sort_keys_order_issue_keys_naturally(model):
+    order, values = model.sort_index("key")
+
+    assert keys(model, order) == ["BUG-1", "BUG-2", "BUG-3", "BUG-9", "BUG-10", "TASK-1"]
+    assert values == sorted(values)
+    assert keys(model, model.sort_index("assignee")[0])[:2] == ["BUG-1", "BUG-2"]  # None sorts as ""
+
+
+@pytest.mark.parametrize("sort", sorted(read_model.SORT_KEYS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_row_once(model, sort, descending):
+    mask = model.bug_filter_mask(include_closed=True)
+    everything, last = model.page(mask, sort, descending)
+    assert last is None
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = model.page(mask, sort, descending, cursor, limit=2)
+        seen += rows
+        if cursor is None:
+            break
+    assert seen == everything
+    assert sorted(seen) == list(iter_bits(mask))
+
+
+def test_page_resumes_after_cursor_not_in_snapshot(model):
+    mask = model.all_mask
+    # BUG-4 is not in the model: the next page starts at the first key after it
+    rows, _ = model.page(mask, "key", cursor=("BUG", 4), limit=2)
+    assert keys(model, rows) == ["BUG-9", "BUG-10"]
+    rows, _ = model.page(mask, "key", descending=True, cursor=("BUG", 4), limit=2)
+    assert keys(model, rows) == ["BUG-3", "BUG-2"]
+
+
+def test_model_is_swapped_for_newer_snapshot(connect, add_snapshot, monkeypatch):
+    monkeypatch.setattr(read_model, "_current", None)
+    add_snapshot([{"key": "BUG-1"}], timestamp="2025-03-01 09:00:00")
+    conn = connect()
+    first = read_model.get_read_model(conn)
+    assert read_model.get_read_model(conn) is first
+
+    add_snapshot([{"key": "BUG-1"}, {"key": "BUG-2"}], timestamp="2025-03-08 09:00:00")
+    second = read_model.get_read_model(conn)
+    conn.close()
+
+    assert second is not first
+    assert second.keys == ("BUG-1", "BUG-2")
+    assert first.keys == ("BUG-1",)
@@ -0,0 +1,144 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+import adaptive_limiter
+import fetch_jira_data
+import report_service
+from fetch_jira_data import JiraQueryError
+
+
+def jira_issue(key, priority="High"):
+    now = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+    return {"key": key, "fields": {"summary": f"Summary of {key}", "status": {"name": "Open"},
+                                   "priority": {"name": priority}, "updated": now,
+                                   "comment": {"comments": [{"id": "1", "author": {}, "body": "New comment"}]}}}
+
+
+def snapshot_row(key, llm_summary="Earlier summary"):
+    return {"key": key, "summary": f"Summary of {key}", "status": "Open", "priority": "High",
+            "assignee": "Unassigned", "updated": "", "llm_summary": llm_summary, "latest_comment": ""}
+
+
+@pytest.fixture
+def report_inputs(monkeypatch):
+    """A one-hour-old snapshot of THRPI-1 (summarized) and THRPI-2 (never summarized)."""
+    taken = (datetime.datetime.utcnow() - datetime.timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+    rows = [snapshot_row("THRPI-1"), snapshot_row("THRPI-2", llm_summary=None)]
+    monkeypatch.setattr(report_service, "load_snapshot_issues", lambda project: ({"snapshot_id": 1, "timestamp": taken}, rows))
+    monkeypatch.setattr(report_service, "count_issues", lambda *args: len(rows))
+    monkeypatch.setattr(report_service.llm_service, "plan_batches", lambda items, provider=None: [[i] for i in range(len(items))])
+    monkeypatch.setattr(report_service.llm_service, "summarize_batch",
+                        lambda items, provider=None, on_token=None: ["New summary"] * len(items))
+
+
+def test_rejected_delta_query_falls_back_to_full_fetch(report_inputs, monkeypatch):
+    queries = []
+
+    def fetch_issues(jira_url, jql, email, api_token, **kwargs):
+        queries.append((jql, kwargs))
+        if "key in" in jql:
+            raise JiraQueryError(400, "An issue with key 'THRPI-2' does not exist")
+        return [jira_issue(f"THRPI-{n}") for n in range(1, 4)]
+    monkeypatch.setattr(report_service, "fetch_issues", fetch_issues)
+
+    updates = list(report_service.generate_realtime_report(project="THRPI"))
+
+    delta_jql, delta_options = queries[0]
+    assert 'key in ("THRPI-2")' in delta_jql
+    assert delta_options == {"validate_query": "warn", "raise_errors": True}
+    assert queries[1][0] == report_service.report_jql("THRPI")
+    assert updates[-1]["type"] == "complete"
+    assert updates[-1]["issue_count"] == 3
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ""
+
+    def json(self):
+        return {"total": 42}
+
+
+def test_count_issues_goes_through_jira_limiter(monkeypatch):
+    monkeypatch.setattr(adaptive_limiter, "_limiters", {})
+    responses = [FakeResponse(429, {"Retry-After": "30"}), FakeResponse(200)]
+    monkeypatch.setattr(fetch_jira_data.requests.Session, "get", lambda self, *args, **kwargs: responses.pop(0))
+
+    assert fetch_jira_data.count_issues("https://jira", "project = THRPI", "me", "token") is None
+    stats = fetch_jira_data.jira_limiter().stats()
+    assert stats["overloads"] == 1
+    assert stats["paused_seconds"] > 25
+
+    fetch_jira_data.jira_limiter().paused_until = 0
+    assert fetch_jira_data.count_issues("https://jira", "project = THRPI", "me", "token") == 42
+    assert fetch_jira_data.jira_limiter().stats()["successes"] == 1
+
+
+class FakeLimiter:
+    max_limit = 3
+
+
+def test_summaries_run_on_bounded_pool_and_keep_report_order(monkeypatch):
+    priorities = ["Low", "Critical", "Medium", "High", "Critical", "Low", "High", "Medium"]
+    issues = [jira_issue(f"THRPI-{n}", priority) for n, priority in enumerate(priorities)]
+    monkeypatch.setattr(report_service, "fetch_issues", lambda *args, **kwargs: issues)
+    monkeypatch.setattr(report_service.llm_service, "limiter_for", lambda provider=None: FakeLimiter())
+    monkeypatch.setattr(report_service.llm_service, "plan_batches", lambda items, provider=None: [[i] for i in range(len(items))])
+    lock = threading.Lock()
+    started, running, peak = [], [0], [0]
+
+    def summarize_batch(items, provider=None, on_token=None):
+        key = items[0][0]
+        with lock:
+            started.append(key)
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        # The first issues submitted finish last
+        time.sleep(0.15 if len(started) <= 3 else 0.01)
+        with lock:
+            running[0] -= 1
+        return [f"Summary for {key}"]
+    monkeypatch.setattr(report_service.llm_service, "summarize_batch", summarize_batch)
+
+    updates = list(report_service.generate_realtime_report(jql="project = THRPI"))
+
+    assert peak[0] == 3
+    # Critical/Blocker issues go to the pool first
+    assert set(started[:2]) == {"THRPI-1", "THRPI-4"}
+    finished = [u["issue_key"] for u in updates if u["type"] == "progress" and u["issue_key"]]
+    assert sorted(finished) == sorted(f"THRPI-{n}" for n in range(8))
+    report = updates[-1]["content"]
+    rows = [line for line in report.splitlines() if line.startswith("| [THRPI-")]
+    order = [int(line.split("THRPI-")[1].split("]")[0]) for line in rows]
+    assert [priorities[n] for n in order] == sorted(priorities, key=report_service.PRIORITY_ORDER.get)
+    for n, line in zip(order, rows):
+        assert f"Summary for THRPI-{n}" in line
+
+
+def test_report_streams_tokens_tagged_with_issue_key(monkeypatch):
+    issues = [jira_issue("THRPI-1"), jira_issue("THRPI-2", "Critical")]
+    monkeypatch.setattr(report_service, "fetch_issues", lambda *args, **kwargs: issues)
+    batches = []
+
+    def summarize_batch(items, provider=None, on_token=None):
+        batches.append(len(items))
+        key = items[0][0]
+        for delta in (f"{key} ", "is fixed"):
+            on_token(delta)
+        return [f"{key} is fixed"]
+    monkeypatch.setattr(report_service.llm_service, "summarize_batch", summarize_batch)
+
+    updates = list(report_service.generate_realtime_report(jql="project = THRPI", stream_tokens=True))
+
+    # Token streaming sends every issue on its own
+    assert batches == [1, 1]
+    tokens = [(u["issue_key"], u["delta"]) for u in updates if u["type"] == "token"]
+    assert sorted(tokens) == [("THRPI-1", "THRPI-1 "), ("THRPI-1", "is fixed"), ("THRPI-2", "THRPI-2 "), ("THRPI-2", "is fixed")]
+    for key in ("THRPI-1", "THRPI-2"):
+        types = [u["type"] for u in updates if u.get("issue_key") == key]
+        assert types == ["token", "token", "progress"]
@@ -0,0 +1,134 @@
+import asyncio
+
+import report_service
+from backend import jobs
+from backend.broker import EventBroker, WAKEUP
+from backend.jobs import JobQueue
+from backend.reports import ReportStore
+from test_jobs import wait_for
+
+
+def test_follow_from_zero_starts_at_latest_attempt(connect):
+    queue = JobQueue(connect)
+    store = ReportStore(queue)
+    job, _ = queue.enqueue("report", dedupe_key="report:openai::")
+    job_id = job['job_id']
+    store.append_event(job_id, {"type": "progress", "current": 1, "total": 3, "status": "first attempt"})
+    store.append_event(job_id, {"type": "error", "message": "LLM unavailable"})
+    conn = connect()
+    conn.execute("UPDATE jobs SET status='failed' WHERE job_id=?", (job_id,))
+    conn.commit()
+    conn.close()
+
+    assert store.resume(job_id)['job_id'] == job_id
+    store.append_event(job_id, {"type": "progress", "current": 2, "total": 3, "status": "second attempt"})
+    conn = connect()
+    conn.execute("UPDATE jobs SET status='cancelled' WHERE job_id=?", (job_id,))
+    conn.commit()
+    conn.close()
+
+    async def collect():
+        return [event async for _, event in store.follow(job_id, poll_interval=0.01)]
+
+    events = asyncio.run(collect())
+    assert [e["type"] for e in events] == ["resumed", "progress", "error"]
+    assert events[1]["status"] == "second attempt"
+    assert events[-1]["message"] == "Report job was cancelled"
+    # Reattaching after a seen event still continues from there
+    assert store.events_after(job_id, 1)[0][1]["type"] == "error"
+
+
+def follow_all(store, job_id):
+    async def collect():
+        return [event async for _, event in store.follow(job_id, poll_interval=0.01)]
+    return asyncio.run(collect())
+
+
+def test_job_requeued_after_crash_starts_a_new_attempt(connect, monkeypatch):
+    # A report job whose process died mid-run, leaving its first attempt's events
+    conn = connect()
+    job_id = conn.execute(f'''
+        INSERT INTO jobs (kind, dedupe_key, params, status, started_at, heartbeat_at)
+        VALUES ('report', 'report:openai::', '{{}}', 'running', datetime('now', '-1 hour'),
+                datetime('now', '-{jobs.STALE_AFTER_SECONDS + 60} seconds'))
+    ''').lastrowid
+    conn.commit()
+    conn.close()
+    queue = JobQueue(connect, poll_interval=0.05)
+    store = ReportStore(queue)
+    store.append_event(job_id, {"type": "token", "issue_key": "BUG-1", "delta": "stale"})
+    store.append_event(job_id, {"type": "partial", "tier": "Critical/Blocker", "content": "stale"})
+
+    def report(**kwargs):
+        yield {"type": "progress", "current": 1, "total": 1, "status": "Analyzed BUG-1", "issue_key": "BUG-1"}
+        yield {"type": "complete", "content": "# Report", "filename": "weekly_report.md", "issue_count": 1}
+    monkeypatch.setattr(report_service, "generate_realtime_report", report)
+    queue.register("report", store.run_job)
+    queue.start()
+    try:
+        assert wait_for(queue, job_id)['status'] == 'succeeded'
+    finally:
+        queue.stop()
+
+    events = follow_all(store, job_id)
+    assert [e["type"] for e in events] == ["resumed", "progress", "complete"]
+    assert events[-1]["content"] == "# Report"
+
+
+def test_follow_reads_database_on_wakeups_and_heartbeats_on_schedule(connect):
+    queue = JobQueue(connect)
+    store = ReportStore(queue)
+    job_id = queue.enqueue("report", dedupe_key="report:openai::")[0]['job_id']
+    reads = []
+    events_after = store.events_after
+    store.events_after = lambda *args: reads.append(args) or events_after(*args)
+    broker = EventBroker()
+    topic = f"job:{job_id}"
+
+    async def run():
+        wakeups = broker.subscribe(topic)
+        events, heartbeats = [], []
+
+        async def collect():
+            async for _, event in store.follow(job_id, wakeups=wakeups, poll_interval=0.25):
+                (events if event else heartbeats).append(event)
+
+        task = asyncio.create_task(collect())
+        await asyncio.sleep(0.1)
+        idle_reads = len(reads)
+        # Wakeups without new events neither count as heartbeats nor delay them
+        for _ in range(12):
+            broker.publish(topic)
+            await asyncio.sleep(0.05)
+        woken_reads = len(reads) - idle_reads
+
+        await asyncio.to_thread(store.append_event, job_id, {"type": "progress", "current": 1, "total": 1})
+        broker.publish(topic)
+        conn = connect()
+        conn.execute("UPDATE jobs SET status='cancelled' WHERE job_id=?", (job_id,))
+        conn.commit()
+        conn.close()
+        broker.publish(topic)
+        await asyncio.wait_for(task, 5)
+        wakeups.close()
+        return idle_reads, woken_reads, events, heartbeats
+
+    idle_reads, woken_reads, events, heartbeats = asyncio.run(run())
+    assert idle_reads == 1
+    assert woken_reads >= 10
+    assert 1 <= len(heartbeats) <= 4
+    assert [e["type"] for e in events] == ["progress", "error"]
+    assert events[-1]["message"] == "Report job was cancelled"
+
+
+def test_broker_wakeup_is_not_a_timeout():
+    async def run():
+        broker = EventBroker()
+        subscription = broker.subscribe("job:1")
+        assert await subscription.get(0.01) is None
+        broker.publish("job:1")
+        broker.publish("job:1")
+        assert await subscription.get(1.0) == WAKEUP
+        subscription.clear()
+        assert await subscription.get(0.01) is None
+    asyncio.run(run())
@@ -0,0 +1,70 @@
+from backend.response_cache import ResponseCache
+
+FIRST = (1, "2025-03-01 09:00:00")
+SECOND = (2, "2025-03-08 09:00:00")
+
+
+def counting(payload):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return payload
+    return compute, calls
+
+
+def test_entries_are_keyed_by_snapshot():
+    cache = ResponseCache()
+    compute, calls = counting({"open": 3})
+
+    entry = cache.get_or_compute("breakdown", (), FIRST, compute)
+    assert cache.get_or_compute("breakdown", (), FIRST, compute) is entry
+    assert cache.get_or_compute("breakdown", ("OS_FCS",), FIRST, compute) is not entry
+    assert cache.get_or_compute("breakdown", (), SECOND, compute) is not entry
+    assert len(calls) == 3
+    assert entry.body == b'{"open":3}'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    compute, calls = counting([])
+    for name in ("a", "b", "a", "c", "a"):
+        cache.get_or_compute(name, (), FIRST, compute)
+
+    # b was evicted when c came in; a stayed in use
+    assert len(calls) == 3
+    cache.get_or_compute("b", (), FIRST, compute)
+    assert len(calls) == 4
+
+
+def test_conditional_requests():
+    entry = ResponseCache().get_or_compute("history", (), FIRST, lambda: [1, 2])
+    weak = "W/" + entry.etag
+
+    assert entry.not_modified(entry.etag)
+    assert entry.not_modified(f'"other", {weak}')
+    assert entry.not_modified("*")
+    assert not entry.not_modified('"other"')
+    assert entry.headers()["Last-Modified"] == "Sat, 01 Mar 2025 09:00:00 GMT"
+    assert entry.not_modified(if_modified_since="Sat, 01 Mar 2025 09:00:00 GMT")
+    assert not entry.not_modified(if_modified_since="Sat, 01 Mar 2025 08:59:59 GMT")
+    assert not entry.not_modified(if_modified_since="yesterday")
+    # If-None-Match takes precedence
+    assert not entry.not_modified('"other"', "Sat, 01 Mar 2025 09:00:00 GMT")
+
+
+def test_endpoint_answers_304_until_a_new_snapshot(api, add_snapshot):
+    add_snapshot([{"key": "BUG-1", "priority": "High"}], timestamp="2025-03-01 09:00:00")
+    first = api.get("/api/breakdown")
+    etag = first.headers["etag"]
+
+    repeat = api.get("/api/breakdown", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["etag"] == etag
+
+    add_snapshot([{"key": "BUG-1", "priority": "High"}, {"key": "BUG-2", "priority": "Low"}],
+                 timestamp="2025-03-08 09:00:00")
+    changed = api.get("/api/breakdown", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json() != first.json()
@@ -0,0 +1,25 @@
+import pytest
+
+import rollup
+
+
+def test_empty_snapshot_gets_zero_total_and_is_not_rolled_up_again(connect):
+    conn = connect()
+    snapshot_id = conn.execute("INSERT INTO snapshots (timestamp, total_issues) VALUES ('2025-03-01 09:00:00', 0)").lastrowid
+    rollup.catch_up(conn)
+
+    assert rollup.slice_counts(conn, snapshot_id) == [{"name": rollup.ALL, "open": 0, "total": 0}]
+    assert conn.execute("SELECT COUNT(*) FROM issue_rollups").fetchone()[0] == 1
+    # Nothing left to catch up: the snapshot is not recomputed on every call
+    conn.execute("UPDATE issue_rollups SET total_count = -1")
+    rollup.catch_up(conn)
+    assert rollup.slice_counts(conn, snapshot_id)[0]["total"] == -1
+    conn.close()
+
+
+def test_filter_on_group_by_dimension_is_rejected(connect):
+    conn = connect()
+    with pytest.raises(ValueError):
+        rollup.slice_counts(conn, 1, {"priority": "High"}, group_by="priority")
+    assert rollup.slice_counts(conn, 1, {"priority": "High"}, group_by="assignee") == []
+    conn.close()
@@ -0,0 +1,43 @@
+from backend import search
+
+
+def test_match_query_quotes_words_and_keeps_prefixes():
+    assert search.to_match_query('THRPI-12 "crash* it\'s') == '"THRPI-12" """crash"* "it\'s"'
+    assert search.to_match_query("  * ") == ""
+
+
+def test_search_defaults_to_latest_snapshot(api, add_snapshot):
+    add_snapshot([{"key": "BUG-1", "summary": "Crash on login"}], timestamp="2025-03-01 09:00:00")
+    latest = add_snapshot([{"key": "BUG-1", "summary": "Login fails"},
+                           {"key": "BUG-2", "summary": "Crash in exporter"}], timestamp="2025-03-08 09:00:00")
+
+    results = api.get("/api/search", params={"q": "crash"}).json()
+
+    assert [(r["key"], r["snapshot_id"]) for r in results] == [("BUG-2", latest)]
+    assert "**Crash**" in results[0]["snippet"]
+
+
+def test_history_search_returns_each_issue_once_up_to_limit(api, add_snapshot):
+    for day in range(1, 4):
+        add_snapshot([{"key": f"BUG-{n}", "summary": f"Crash number {n}"} for n in range(5)],
+                     timestamp=f"2025-03-0{day} 09:00:00")
+
+    results = api.get("/api/search", params={"q": "crash", "history": "true", "limit": 3}).json()
+
+    assert len(results) == 3
+    assert len({r["key"] for r in results}) == 3
+    # Unchanged text ranks the same in every snapshot: its latest state is returned
+    assert {r["timestamp"] for r in results} == {"2025-03-03 09:00:00"}
+
+
+def test_search_without_fts5_is_unavailable(api, add_snapshot, connect):
+    add_snapshot([{"key": "BUG-1", "summary": "Crash on login"}])
+    conn = connect()
+    conn.execute("DROP TABLE issues_fts")
+    conn.commit()
+    conn.close()
+
+    response = api.get("/api/search", params={"q": "crash"})
+
+    assert response.status_code == 503
+    assert "FTS5" in response.json()["detail"]
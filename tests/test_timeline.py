@@ -0,0 +1,49 @@
+from backend.timeline import issue_timeline
+
+
+def states(timeline):
+    return [(i["start_snapshot"], i["end_snapshot"], i["snapshots"], i["status"], i["assignee"])
+            for i in timeline["intervals"]]
+
+
+def test_unchanged_snapshots_are_run_length_compressed(connect, add_snapshot):
+    ids = [add_snapshot([{"key": "BUG-1", "summary": f"Crash v{n}", "status": status, "assignee": assignee},
+                         {"key": "BUG-2"}],
+                        timestamp=f"2025-03-0{n + 1} 09:00:00")
+           for n, (status, assignee) in enumerate([("Open", None), ("Open", None), ("Open", "amy"),
+                                                   ("In Progress", "amy"), ("In Progress", "amy")])]
+    conn = connect()
+
+    timeline = issue_timeline(conn, "BUG-1")
+    conn.close()
+
+    assert states(timeline) == [
+        (ids[0], ids[1], 2, "Open", None),
+        (ids[2], ids[2], 1, "Open", "amy"),
+        (ids[3], ids[4], 2, "In Progress", "amy"),
+    ]
+    # Summary edits don't start an interval; the latest one is reported
+    assert timeline["summary"] == "Crash v4"
+    assert (timeline["first_seen"], timeline["last_seen"]) == ("2025-03-01 09:00:00", "2025-03-05 09:00:00")
+    assert timeline["snapshots"] == 5
+
+
+def test_missing_snapshot_ends_an_interval(connect, add_snapshot):
+    # Snapshots saved out of timestamp order still number in time order
+    third = add_snapshot([{"key": "BUG-1"}], timestamp="2025-03-03 09:00:00")
+    first = add_snapshot([{"key": "BUG-1"}], timestamp="2025-03-01 09:00:00")
+    add_snapshot([{"key": "BUG-2"}], timestamp="2025-03-02 09:00:00")
+    conn = connect()
+
+    timeline = issue_timeline(conn, "BUG-1")
+
+    assert states(timeline) == [(first, first, 1, "Open", None), (third, third, 1, "Open", None)]
+    assert issue_timeline(conn, "BUG-404") is None
+    conn.close()
+
+
+def test_timeline_endpoint(api, add_snapshot):
+    add_snapshot([{"key": "BUG-1"}])
+
+    assert api.get("/api/issues/BUG-1/timeline").json()["intervals"][0]["status"] == "Open"
+    assert api.get("/api/issues/BUG-404/timeline").status_code == 404
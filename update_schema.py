@@ -1,5 +1,6 @@
 import sqlite3
 import os
+from init_db import apply_schema
 
 DB_NAME = "dashboard.db"
 
@@ -18,6 +19,10 @@ def add_columns():
         print("Column 'labels' likely already exists.")
 
     conn.commit()
+
+    # Create any tables/indexes added since the database was first initialized
+    apply_schema(conn)
+    print("Schema is up to date.")
     conn.close()
 
 if __name__ == "__main__":